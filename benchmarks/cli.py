@@ -0,0 +1,141 @@
+"""End to end time of kron commands against a stand-in Kronbute
+
+Starts the fake server of fake_kronbute.py with 10, 1000 and 100000 jobs and runs in the history, then runs every
+command in a fresh interpreter as people do and reports the median wall time and the requests it made. The cache
+time to live is 0, so listings are revalidated with the server on every command like after a while without using
+kron. Save a baseline and compare later runs with it to fail on regressions:
+
+    python benchmarks/cli.py --sizes 10 1000 --save baseline.json
+    python benchmarks/cli.py --sizes 10 1000 --baseline baseline.json --tolerance 0.2
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from fake_kronbute import FakeKronbute
+
+# Name and arguments, {snapshot} is replaced with a file in a temporary directory. Pause and resume go in pairs so
+# every repetition finds the server as the first one did
+COMMANDS = [
+    ('info', ['info']),
+    ('job list', ['job', 'list']),
+    ('job list json', ['-o', 'json', 'job', 'list']),
+    ('job view', ['job', 'view', '1']),
+    ('job view alias', ['job', 'view', 'job_1']),
+    ('job explain', ['job', 'explain', '1']),
+    ('job edit', ['job', 'edit', '1', '--tag', 'benchmark']),
+    ('job run', ['job', 'run', '1', '--yes']),
+    ('group list', ['group', 'list']),
+    ('runs list', ['-o', 'jsonl', 'runs', 'list']),
+    ('runs stats', ['runs', 'stats', '--by', 'job', '--by', 'week']),
+    ('schedule forecast', ['schedule', 'forecast', '--days', '1', '--start', '2026-01-01']),
+    ('bulk pause', ['job', 'pause', '--status', 'active', '--yes']),
+    ('bulk resume', ['job', 'resume', '--status', 'paused', '--yes']),
+    ('bulk run group', ['job', 'run', '--group', 'group-1', '--yes']),
+    ('export', ['export', '--all', '{snapshot}']),
+    ('plan', ['job', 'plan', '{snapshot}']),
+    ('import', ['import', '{snapshot}']),
+]
+
+
+def run_command(args, env, repeat):
+    """Median wall time of a command and the exit code of its last run"""
+    samples = []
+    code = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        code = subprocess.run([sys.executable, '-m', 'kron.main'] + args, env=env, stdin=subprocess.DEVNULL,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), code
+
+
+def benchmark(size, options, commands):
+    """Timings by command and size, and the commands that failed, a failing command is not a fast one"""
+    results = {}
+    failures = []
+    with tempfile.TemporaryDirectory() as directory, \
+            FakeKronbute(jobs=size, runs=size, groups=min(size, 10), latency=options.latency_ms / 1000) as fake:
+        env = dict(os.environ, KRONBUTE_SERVER=fake.url, KRONBUTE_CACHE_DIR=os.path.join(directory, 'cache'),
+                   KRONBUTE_CACHE_TTL='0', KRONBUTE_OUTPUT='table')
+        # Run from the repository, the benchmarks directory is first in the path of this script
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [root, env.get('PYTHONPATH')]))
+        snapshot = os.path.join(directory, 'snapshot.jsonl')
+
+        for name, args in commands:
+            args = [arg.replace('{snapshot}', snapshot) for arg in args]
+            before = fake.requests
+            elapsed, code = run_command(args, env, options.repeat)
+            requests = (fake.requests - before) / options.repeat
+            results[f'{name} @ {size}'] = elapsed
+
+            failed = ''
+            if code:
+                failed = f'  exit code {code}'
+                failures.append(f'{name} @ {size}')
+            print(f'{name:<20} {size:>7} {elapsed * 1000:10.1f} ms {requests:9.0f} requests{failed}')
+            sys.stdout.flush()
+    return results, failures
+
+
+def regressions(results, baseline, tolerance, slack):
+    """Benchmarks slower than the baseline by more than the tolerance, small differences are noise"""
+    slower = []
+    for name, elapsed in results.items():
+        expected = baseline.get(name)
+        if expected is not None and elapsed > expected * (1 + tolerance) and elapsed - expected > slack:
+            slower.append(f'{name} {expected * 1000:.1f} ms -> {elapsed * 1000:.1f} ms')
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 100000],
+                        help='number of jobs and runs in the server, one round for each')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per command, the median is reported')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='delay of the server for every request')
+    parser.add_argument('--only', nargs='+', help='only the commands whose name contains any of these')
+    parser.add_argument('--save', metavar='PATH', help='write the timings as a baseline')
+    parser.add_argument('--baseline', metavar='PATH', help='fail if any command is slower than in this baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='slowdown allowed over the baseline, 0.2 is 20%%')
+    parser.add_argument('--slack-ms', type=float, default=50.0, help='slowdown always allowed, start up is noisy')
+    options = parser.parse_args()
+
+    commands = [(name, args) for name, args in COMMANDS
+                if not options.only or any(part in name for part in options.only)]
+
+    print(f'{"command":<20} {"size":>7} {"median":>13} {"per run":>18}')
+    results = {}
+    failures = []
+    for size in options.sizes:
+        timings, failed = benchmark(size, options, commands)
+        results.update(timings)
+        failures.extend(failed)
+
+    if options.save:
+        with open(options.save, 'w') as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+
+    slower = []
+    if options.baseline:
+        with open(options.baseline) as file:
+            slower = regressions(results, json.load(file), options.tolerance, options.slack_ms / 1000)
+        if slower:
+            print('Slower than the baseline:')
+            for line in slower:
+                print(f'    {line}')
+
+    if failures:
+        print(f'Failed: {", ".join(failures)}')
+    if slower or failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,357 @@
+"""Stand-in Kronbute server for benchmarks
+
+Answers the endpoints used by kron, hello, api/jobs with run, pause, resume and explain, api/groups and a paged
+api/runs, from a synthetic dataset of any size kept in memory. Every request waits --latency-ms before being answered,
+to see how kron behaves against a server far away. Listings carry an ETag so the cache of kron is exercised too.
+
+It can be started from the command line and used with KRONBUTE_SERVER:
+
+    python benchmarks/fake_kronbute.py --jobs 1000 --runs 100000 --latency-ms 20 --port 8080
+
+or in the same process, as the CLI benchmark does:
+
+    with FakeKronbute(jobs=1000, runs=100000, latency=0.02) as fake:
+        ...  # fake.url is the server url
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+IMAGES = ['team/etl', 'team/reports', 'team/cleanup', 'billing/invoices', 'billing/reminders', 'ops/backup']
+SCHEDULES = ['0 * * * *', '*/5 * * * *', '0 0 * * *', '0 9-17 * * MON-FRI', '15 */2 * * *']
+TIMEZONES = ['UTC', 'Europe/Madrid', 'America/New_York', 'America/Bogota']
+EPOCH = datetime(2026, 1, 1)
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.strftime('%Y-%m-%dT%H:%M:%S')
+
+
+def synthetic_dataset(jobs, runs, groups, seed):
+    """Jobs, groups and a run history newest first, the same for the same arguments"""
+    generator = random.Random(seed)
+
+    group_list = [{'id': group_id, 'name': f'group-{group_id}', 'variables': 2,
+                   'environment': {'REGION': 'us-east-1', 'GROUP': str(group_id)}}
+                  for group_id in range(1, groups + 1)]
+
+    job_list = []
+    for job_id in range(1, jobs + 1):
+        schedule = generator.choice(SCHEDULES)
+        job_list.append({
+            'id': job_id, 'alias': f'job_{job_id}', 'name': f'Benchmark job {job_id}',
+            'image': IMAGES[job_id % len(IMAGES)], 'tag': 'latest', 'schedule': schedule, 'scheduleText': schedule,
+            'cronType': 'UNIX', 'timeZone': generator.choice(TIMEZONES), 'paused': job_id % 20 == 0,
+            'entryPoint': None, 'environment': {'JOB': str(job_id)},
+            'groups': [group_list[job_id % groups]['name']] if groups else [],
+            'lastStatus': 'FAILED' if generator.random() < 0.1 else 'SUCCESS',
+            'lastRun': '2026-01-01 10:00', 'nextRun': '2026-01-01 11:00',
+            'createdOn': '2025-06-01 10:00', 'statusUpdateOn': '2026-01-01 10:00'})
+
+    run_list = []
+    for run_id in range(runs, 0, -1):
+        job_id = generator.randrange(jobs) + 1 if jobs else 0
+        started_on = EPOCH + timedelta(seconds=run_id * 60)
+        run_list.append({'id': run_id, 'jobId': job_id, 'jobName': f'Benchmark job {job_id}',
+                         'status': 'FAILED' if generator.random() < 0.1 else 'SUCCESS',
+                         'startedOn': _timestamp(started_on),
+                         'on': _timestamp(started_on + timedelta(seconds=generator.lognormvariate(3, 1)))})
+
+    return job_list, group_list, run_list
+
+
+class Store:
+    """Entities of one kind, each with a version used as its ETag, and a version for the whole listing"""
+
+    def __init__(self, entities):
+        self.entities = {entity['id']: entity for entity in entities}
+        self.versions = {entity_id: 1 for entity_id in self.entities}
+        self.version = 1
+        self.next_id = max(self.entities, default=0) + 1
+        self._listing = None
+
+    def find(self, key):
+        """Entity by id or alias, the real server only knows ids but it keeps the fake forgiving"""
+        if key.isdigit() and int(key) in self.entities:
+            return self.entities[int(key)]
+        return next((entity for entity in self.entities.values() if entity.get('alias') == key), None)
+
+    def changed(self, entity_id):
+        self.versions[entity_id] = self.versions.get(entity_id, 0) + 1
+        self.version += 1
+        self._listing = None
+
+    def listing(self):
+        """Serialized once per version, a listing of 100k jobs takes a while to encode"""
+        if self._listing is None:
+            self._listing = json.dumps(list(self.entities.values())).encode()
+        return self._listing
+
+
+class FakeKronbute:
+    def __init__(self, jobs=100, runs=1000, groups=10, latency=0.0, host='127.0.0.1', port=0, seed=1,
+                 version='fake'):
+        job_list, group_list, run_list = synthetic_dataset(jobs, runs, groups, seed)
+        self.jobs = Store(job_list)
+        self.groups = Store(group_list)
+        self.runs = run_list
+        self.latency = latency
+        self.version = version
+        self.requests = 0
+        self.lock = threading.Lock()
+
+        fake = self
+
+        class Handler(KronbuteHandler):
+            server_version = 'FakeKronbute'
+            kronbute = fake
+
+        self.httpd = ThreadingServer((host, port), Handler)
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+class ThreadingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    # Bulk commands open a pool of connections at once
+    request_queue_size = 128
+
+
+class KronbuteHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    kronbute: FakeKronbute = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def answer(self, status, body=None, headers=None):
+        """JSON for anything but text and raw bytes, which are sent as they are"""
+        if body is None or isinstance(body, bytes):
+            content = body or b''
+        elif isinstance(body, str):
+            content = body.encode()
+        else:
+            content = json.dumps(body).encode()
+
+        self.send_response(status)
+        if content and not isinstance(body, str):
+            self.send_header('Content-Type', 'application/json')
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'null')
+
+    def route(self):
+        url = urllib.parse.urlsplit(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        params = dict(urllib.parse.parse_qsl(url.query))
+        return parts, params
+
+    def store(self, parts):
+        if len(parts) >= 2 and parts[0] == 'api':
+            return {'jobs': self.kronbute.jobs, 'groups': self.kronbute.groups}.get(parts[1])
+        return None
+
+    def parse_request(self):
+        # Every request is counted and delayed once it arrives, before it is answered, as a slow network would
+        with self.kronbute.lock:
+            self.kronbute.requests += 1
+        if self.kronbute.latency:
+            time.sleep(self.kronbute.latency)
+        return super().parse_request()
+
+    def do_GET(self):
+        parts, params = self.route()
+        if parts == ['hello']:
+            return self.answer(200, f'hello!, version: {self.kronbute.version}')
+        if parts == ['api', 'runs']:
+            return self.list_runs(params)
+
+        store = self.store(parts)
+        if store is None:
+            return self.answer(404)
+
+        with self.kronbute.lock:
+            if len(parts) == 2:
+                etag = f'"{store.version}"'
+                if self.headers.get('If-None-Match') == etag:
+                    return self.answer(304, headers={'ETag': etag})
+                return self.answer(200, store.listing(), {'ETag': etag})
+
+            entity = store.find(parts[2])
+            if entity is None:
+                return self.answer(404)
+            if len(parts) == 4 and parts[3] == 'explain' and store is self.kronbute.jobs:
+                return self.answer(200, f"Runs at '{entity['schedule']}' ({entity['cronType']}) in "
+                                        f"{entity['timeZone']}")
+            if len(parts) > 3:
+                return self.answer(404)
+
+            etag = f'"{store.versions[entity["id"]]}"'
+            if self.headers.get('If-None-Match') == etag:
+                return self.answer(304, headers={'ETag': etag})
+            return self.answer(200, entity, {'ETag': etag})
+
+    def list_runs(self, params):
+        runs = self.kronbute.runs
+        if 'jobId' in params:
+            runs = [run for run in runs if str(run['jobId']) == params['jobId']]
+        if 'since' in params:
+            since = params['since'][:19]
+            runs = [run for run in runs if run['on'] >= since]
+        if 'limit' in params:
+            runs = runs[:int(params['limit'])]
+
+        if 'page' not in params:
+            return self.answer(200, runs)
+
+        size = int(params.get('size', 500))
+        page = int(params['page'])
+        content = runs[page * size:(page + 1) * size]
+        self.answer(200, {'content': content, 'last': (page + 1) * size >= len(runs)})
+
+    def do_POST(self):
+        parts, _ = self.route()
+        store = self.store(parts)
+        if store is None:
+            return self.answer(404)
+
+        with self.kronbute.lock:
+            if len(parts) == 2:
+                return self.create(store, self.read_json())
+
+            job = store.find(parts[2]) if store is self.kronbute.jobs and len(parts) == 4 else None
+            if job is None:
+                return self.answer(404)
+
+            action = parts[3]
+            if action == 'run':
+                return self.answer(202)
+            if action not in ('pause', 'resume'):
+                return self.answer(404)
+            if job['paused'] == (action == 'pause'):
+                return self.answer(400, 'Job is already paused' if job['paused'] else 'Job is not paused')
+
+            job['paused'] = action == 'pause'
+            store.changed(job['id'])
+            self.answer(200)
+
+    def create(self, store, data):
+        if not isinstance(data, dict) or not data.get('name'):
+            return self.answer(400, 'name is required')
+        if data.get('alias') and store.find(data['alias']) is not None:
+            return self.answer(409, 'alias already exists')
+
+        entity_id = store.next_id
+        store.next_id += 1
+        if store is self.kronbute.jobs:
+            entity = {'scheduleText': data.get('schedule'), 'paused': False, 'lastStatus': None, 'lastRun': None,
+                      'nextRun': None, 'createdOn': _timestamp(datetime.utcnow()), 'statusUpdateOn': None,
+                      'alias': None, 'entryPoint': None, 'groups': [], 'environment': {}}
+        else:
+            entity = {'environment': {}}
+        entity.update(data, id=entity_id)
+        if store is self.kronbute.groups:
+            entity['variables'] = len(entity['environment'] or {})
+
+        store.entities[entity_id] = entity
+        store.changed(entity_id)
+        self.answer(201, entity_id)
+
+    def update(self, partial):
+        parts, _ = self.route()
+        store = self.store(parts)
+        data = self.read_json()
+
+        with self.kronbute.lock:
+            entity = store.find(parts[2]) if store is not None and len(parts) == 3 else None
+            if entity is None:
+                return self.answer(404)
+            if not isinstance(data, dict):
+                return self.answer(400, 'a JSON object is required')
+            if_match = self.headers.get('If-Match')
+            if if_match and if_match != f'"{store.versions[entity["id"]]}"':
+                return self.answer(412)
+
+            entity.update({key: value for key, value in data.items() if key != 'id' and
+                           (not partial or value is not None)})
+            if 'schedule' in data and store is self.kronbute.jobs:
+                entity['scheduleText'] = entity['schedule']
+            if store is self.kronbute.groups:
+                entity['variables'] = len(entity.get('environment') or {})
+            store.changed(entity['id'])
+            self.answer(202)
+
+    def do_PUT(self):
+        self.update(partial=False)
+
+    def do_PATCH(self):
+        self.update(partial=True)
+
+    def do_DELETE(self):
+        parts, _ = self.route()
+        store = self.store(parts)
+
+        with self.kronbute.lock:
+            entity = store.find(parts[2]) if store is not None and len(parts) == 3 else None
+            if entity is None:
+                return self.answer(404)
+            del store.entities[entity['id']]
+            store.changed(entity['id'])
+            self.answer(204)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, default=100, help='number of jobs')
+    parser.add_argument('--runs', type=int, default=1000, help='number of runs in the history')
+    parser.add_argument('--groups', type=int, default=10, help='number of environment groups')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='delay before answering every request')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on')
+    parser.add_argument('--port', type=int, default=8080, help='port to listen on, 0 for any free one')
+    parser.add_argument('--seed', type=int, default=1, help='seed of the synthetic dataset')
+    options = parser.parse_args()
+
+    fake = FakeKronbute(options.jobs, options.runs, options.groups, options.latency_ms / 1000, options.host,
+                        options.port, options.seed)
+    print(f'Fake Kronbute with {options.jobs} jobs, {options.groups} groups and {options.runs} runs at {fake.url}')
+    try:
+        fake.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Schedule forecast of a large server
+
+Builds a synthetic listing with a mix of hourly, daily, business hours and Quartz schedules in several time zones
+and times the forecast and hotspot report. Pass --max-seconds to fail when it goes over budget:
+
+    python benchmarks/forecast.py --jobs 10000 --days 7 --max-seconds 5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+# Run from the repository, the benchmarks directory is first in the path of this script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kron.forecast import Forecast
+
+SCHEDULES = [
+    ('0 * * * *', 'UNIX'),
+    ('*/5 * * * *', 'UNIX'),
+    ('0 0 * * *', 'UNIX'),
+    ('0 9-17 * * MON-FRI', 'UNIX'),
+    ('15 */2 * * *', 'UNIX'),
+    ('0 0/15 * * * ?', 'QUARTZ'),
+    ('0 30 1 ? * SUN#2', 'QUARTZ'),
+    ('0 0 12 L * ?', 'QUARTZ'),
+]
+
+TIMEZONES = ['UTC', 'Europe/Madrid', 'America/New_York', 'America/Bogota', 'Asia/Kolkata', 'Australia/Sydney']
+
+
+def synthetic_jobs(count, seed):
+    generator = random.Random(seed)
+    jobs = []
+    for job_id in range(count):
+        # A third of the jobs get a schedule of their own, as people pick a random time of the day
+        if job_id % 3 == 0:
+            schedule, cron_type = f'{generator.randrange(60)} {generator.randrange(24)} * * *', 'UNIX'
+        else:
+            schedule, cron_type = generator.choice(SCHEDULES)
+        jobs.append({'id': job_id, 'schedule': schedule, 'cronType': cron_type,
+                     'timeZone': generator.choice(TIMEZONES), 'paused': job_id % 50 == 0})
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, default=10000, help='number of jobs in the listing')
+    parser.add_argument('--days', type=int, default=7, help='days to forecast')
+    parser.add_argument('--seed', type=int, default=1, help='seed of the synthetic listing')
+    parser.add_argument('--max-seconds', type=float, help='fail if the forecast takes longer than this')
+    options = parser.parse_args()
+
+    jobs = synthetic_jobs(options.jobs, options.seed)
+
+    start = time.perf_counter()
+    forecast = Forecast(datetime(2026, 3, 25), options.days * 24 * 60)
+    forecast.add_jobs(jobs)
+    expanded = time.perf_counter()
+    counts = forecast.counts()
+    counted = time.perf_counter()
+    hotspots = forecast.hotspots()
+    finished = time.perf_counter()
+
+    print(f'{forecast.jobs} jobs, {len(forecast.schedules)} distinct schedules, {options.days} days')
+    print(f'expand    {(expanded - start) * 1000:8.1f} ms')
+    print(f'count     {(counted - expanded) * 1000:8.1f} ms')
+    print(f'hotspots  {(finished - counted) * 1000:8.1f} ms')
+    print(f'total     {(finished - start) * 1000:8.1f} ms, peak of {max(counts)} starts at '
+          f'{forecast.time(hotspots[0].minute):%Y-%m-%d %H:%M}')
+
+    if options.max_seconds and finished - start > options.max_seconds:
+        print(f'Slower than {options.max_seconds} s')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Start up time of kron commands
+
+Runs every command with --help in a fresh interpreter and reports the median wall time, the time spent importing
+kron and the heaviest imports. Pass --max-ms to fail when any command is slower than the given budget:
+
+    python benchmarks/import_time.py --max-ms 400
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+COMMANDS = [
+    [],
+    ['info'],
+    ['job', 'list'],
+    ['job', 'delete'],
+    ['job', 'create'],
+    ['runs', 'list'],
+    ['group', 'list'],
+]
+
+
+def wall_time(args, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-m', 'kron.main'] + args + ['--help'], stdout=subprocess.DEVNULL, check=True)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def heaviest_imports(args, count):
+    res = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'kron.main'] + args + ['--help'],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+
+    imports = []
+    for line in res.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nested imports are indented, only the top level ones are reported
+        if not name.startswith('  '):
+            imports.append((int(cumulative), name.strip()))
+
+    return sorted(imports, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=7, help='runs per command, the median is reported')
+    parser.add_argument('--top', type=int, default=5, help='number of heaviest imports to show')
+    parser.add_argument('--max-ms', type=float, help='fail if any command takes longer than this')
+    options = parser.parse_args()
+
+    slow = []
+    for args in COMMANDS:
+        elapsed = wall_time(args, options.repeat) * 1000
+        name = ' '.join(['kron'] + args)
+        print(f'{name:<20} {elapsed:8.1f} ms')
+        for cumulative, module in heaviest_imports(args, options.top):
+            print(f'    {module:<30} {cumulative / 1000:8.1f} ms')
+
+        if options.max_ms and elapsed > options.max_ms:
+            slow.append(name)
+
+    if slow:
+        print(f'Slower than {options.max_ms} ms: {", ".join(slow)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
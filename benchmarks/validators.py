@@ -0,0 +1,82 @@
+"""Cost of the parameter and manifest validators
+
+Times every function of kron.validation with valid and invalid values and reports the best time per call in
+microseconds. Compiled cron expressions are cached, so cron validation is measured both with a cold cache (a new
+expression every call) and warm. Pass --max-us to fail when any validator is slower than the given budget:
+
+    python benchmarks/validators.py --max-us 50
+"""
+import argparse
+import os
+import itertools
+import sys
+import timeit
+
+# Run from the repository, the benchmarks directory is first in the path of this script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kron import cron, validation
+
+CASES = [
+    ('cron unix', validation.validate_cron, '*/5 9-17 * * MON-FRI'),
+    ('cron quartz', validation.validate_cron, '0 0/15 8-18 ? * MON-FRI 2024-2030'),
+    ('cron macro', validation.validate_cron, '@daily at 3:45pm'),
+    ('cron invalid', validation.validate_cron, '0 0 12 32 * ?'),
+    ('alias', validation.validate_alias, 'nightly_backup_2'),
+    ('alias invalid', validation.validate_alias, 'nightly-backup'),
+    ('image', validation.validate_image, 'cprieto/kronbute-worker'),
+    ('image invalid', validation.validate_image, 'a' * 1000 + '!'),
+    ('tag', validation.validate_tag, '1.2.3-rc1'),
+    ('timezone', validation.validate_timezone, 'America/Argentina/Buenos_Aires'),
+    ('timezone invalid', validation.validate_timezone, 'Mars/Olympus_Mons'),
+    ('id', validation.parse_id_or_alias, '1234'),
+    ('id alias', validation.parse_id_or_alias, 'nightly_backup'),
+]
+
+
+def call(function, value):
+    try:
+        function(value)
+    except validation.ValidationError:
+        pass
+
+
+def best_us(statement, number, repeat):
+    return min(timeit.repeat(statement, number=number, repeat=repeat)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=2000, help='calls per measure')
+    parser.add_argument('--repeat', type=int, default=5, help='measures per validator, the best is reported')
+    parser.add_argument('--max-us', type=float, help='fail if any validator takes longer than this per call')
+    options = parser.parse_args()
+
+    results = []
+    for name, function, value in CASES:
+        # The first call loads lazy data such as the time zone index
+        call(function, value)
+        results.append((name, best_us(lambda: call(function, value), options.number, options.repeat)))
+
+    minutes = itertools.cycle(range(60))
+    hours = itertools.cycle(range(24))
+
+    def cold():
+        cron.compile_cron.cache_clear()
+        call(validation.validate_cron, f'{next(minutes)} {next(hours)} * * 1-5')
+
+    results.append(('cron cold cache', best_us(cold, options.number, options.repeat)))
+
+    slow = []
+    for name, elapsed in results:
+        print(f'{name:<20} {elapsed:8.2f} us')
+        if options.max_us and elapsed > options.max_us:
+            slow.append(name)
+
+    if slow:
+        print(f'Slower than {options.max_us} us: {", ".join(slow)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
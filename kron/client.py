@@ -0,0 +1,214 @@
+"""Entry point of the kron command, forwarding the command to kron daemon when one is running
+
+The command line, working directory and environment are sent to the daemon through a Unix socket together with the
+standard input, output and error of this process, so the command reads and writes the terminal as if it ran here.
+Only the exit code comes back. Without a daemon, while it runs another command, or with KRONBUTE_NO_DAEMON set, the
+command runs in this process.
+
+Only the variables kron reads are sent, not the rest of the environment, and nothing is sent unless the socket is
+in a directory only this user can use and the process listening on it runs as this user.
+
+Forwarding has to cost little more than starting Python, so this module only imports modules built in the
+interpreter, no json, socket or signal as they import enum and re.
+"""
+import _socket
+import array
+import marshal
+import os
+import sys
+
+# Changed whenever the messages change, a daemon of another kron version makes the command run in this process
+PROTOCOL = 1
+# The daemon commands themselves always run in this process, as do the shell, reading the terminal line by line, and
+# the watch commands, which would keep the daemon busy until stopped
+LOCAL_COMMANDS = frozenset(['daemon', 'shell', 'job watch', 'runs watch'])
+# Global options followed by a value, to find the command after them, as in kron.main
+VALUE_OPTIONS = frozenset(['--server', '--pool-size', '--timeout', '--retries', '--backoff', '--cache-ttl',
+                           '--cache-dir', '--output', '-o', '--trace', '--profile'])
+HEADER_SIZE = 4
+# Variables sent to the daemon, the options of kron, the locale, the terminal and the way to reach the server
+FORWARDED_PREFIXES = ('KRONBUTE_', 'LC_')
+FORWARDED_VARIABLES = frozenset(['LANG', 'LANGUAGE', 'TZ', 'TERM', 'COLUMNS', 'LINES', 'NO_COLOR', 'HOME',
+                                 'XDG_CACHE_HOME', 'HTTP_PROXY', 'HTTPS_PROXY', 'NO_PROXY', 'http_proxy',
+                                 'https_proxy', 'no_proxy', 'REQUESTS_CA_BUNDLE', 'CURL_CA_BUNDLE'])
+# Mask of the file type bits and the type of directories in st_mode, as in the stat module
+FILE_TYPE_MASK = 0o170000
+DIRECTORY_TYPE = 0o040000
+
+
+def socket_path() -> str:
+    configured = os.environ.get('KRONBUTE_DAEMON_SOCKET')
+    if configured:
+        return configured
+    runtime = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime:
+        return os.path.join(runtime, 'kron', 'daemon.sock')
+    return os.path.join('/tmp', f'kron-{os.getuid()}', 'daemon.sock')
+
+
+def command_words(args):
+    """Command and subcommand given after the global options"""
+    index = 0
+    while index < len(args) and args[index].startswith('-'):
+        index += 2 if args[index] in VALUE_OPTIONS else 1
+    return args[index:index + 2]
+
+
+def is_local(args) -> bool:
+    words = command_words(args)
+    return ' '.join(words[:1]) in LOCAL_COMMANDS or ' '.join(words) in LOCAL_COMMANDS
+
+
+def is_forwarded(name: str) -> bool:
+    return name in FORWARDED_VARIABLES or name.startswith(FORWARDED_PREFIXES)
+
+
+def is_private_directory(path: str) -> bool:
+    """Whether path is a directory, not a link to one, owned by this user and closed to everyone else"""
+    try:
+        status = os.lstat(path)
+    except OSError:
+        return False
+    return (status.st_mode & FILE_TYPE_MASK == DIRECTORY_TYPE and status.st_uid == os.getuid() and
+            status.st_mode & 0o777 == 0o700)
+
+
+def peer_uid(connection):
+    """User of the process at the other end of a Unix socket, None where the system does not tell"""
+    if not hasattr(_socket, 'SO_PEERCRED'):
+        return None
+    # struct ucred is pid, uid and gid as C ints
+    credentials = connection.getsockopt(_socket.SOL_SOCKET, _socket.SO_PEERCRED, 12)
+    return int.from_bytes(credentials[4:8], sys.byteorder)
+
+
+class Channel:
+    """Messages over a Unix socket, each one marshalled and prefixed with its size, with file descriptors attached"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.buffer = b''
+
+    def send(self, message: dict, fds=()):
+        data = marshal.dumps(message)
+        data = len(data).to_bytes(HEADER_SIZE, 'big') + data
+        if fds:
+            sent = self.connection.sendmsg([data], [(_socket.SOL_SOCKET, _socket.SCM_RIGHTS, array.array('i', fds))])
+            data = data[sent:]
+        if data:
+            self.connection.sendall(data)
+
+    def receive(self, fd_count: int = 0):
+        """Next message and the file descriptors sent with it, None when the other side closed the connection"""
+        fds = []
+        while True:
+            if len(self.buffer) >= HEADER_SIZE:
+                size = HEADER_SIZE + int.from_bytes(self.buffer[:HEADER_SIZE], 'big')
+                if len(self.buffer) >= size:
+                    message, self.buffer = marshal.loads(self.buffer[HEADER_SIZE:size]), self.buffer[size:]
+                    return message, fds
+
+            if fd_count and not fds:
+                item_size = array.array('i').itemsize
+                data, ancillary, _, _ = self.connection.recvmsg(65536, _socket.CMSG_SPACE(fd_count * item_size))
+                for level, kind, payload in ancillary:
+                    if level == _socket.SOL_SOCKET and kind == _socket.SCM_RIGHTS:
+                        fds.extend(array.array('i', payload[:len(payload) - len(payload) % item_size]))
+            else:
+                data = self.connection.recv(65536)
+
+            if not data:
+                return None, fds
+            self.buffer += data
+
+
+def connect(path: str):
+    """Channel to the daemon listening on path, None when there is none or when it may not be a daemon of this user"""
+    # Anyone could create the directory in a shared place such as /tmp and listen there
+    if not is_private_directory(os.path.dirname(os.path.abspath(path))):
+        return None
+
+    connection = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    try:
+        connection.connect(path)
+        uid = peer_uid(connection)
+    except OSError:
+        connection.close()
+        return None
+    if uid is not None and uid != os.getuid():
+        connection.close()
+        return None
+    return Channel(connection)
+
+
+def request(path: str, message: dict):
+    """Answer of the daemon to a message, None when there is no daemon"""
+    channel = connect(path)
+    if channel is None:
+        return None
+
+    try:
+        channel.send(dict(message, version=PROTOCOL))
+        answer, _ = channel.receive()
+        return answer
+    except OSError:
+        return None
+    finally:
+        channel.connection.close()
+
+
+def forward(path: str, argv):
+    """Exit code of the command run by the daemon, None when it has to run in this process"""
+    channel = connect(path)
+    if channel is None:
+        return None
+
+    try:
+        encoding = getattr(sys.stdout, 'encoding', None) or 'utf-8'
+        environment = {name: value for name, value in os.environ.items() if is_forwarded(name)}
+        try:
+            channel.send({'version': PROTOCOL, 'argv': list(argv), 'cwd': os.getcwd(), 'env': environment,
+                          'encoding': encoding}, [0, 1, 2])
+        except OSError:
+            # Closed standard streams cannot be sent, nothing was run yet
+            return None
+
+        answer = None
+        while True:
+            try:
+                answer, _ = channel.receive()
+                break
+            except KeyboardInterrupt:
+                # The command gets the interrupt in the daemon and finishes as it would here
+                try:
+                    channel.send({'interrupt': True})
+                except OSError:
+                    break
+            except OSError:
+                break
+    finally:
+        channel.connection.close()
+
+    if answer is None:
+        sys.stderr.write('[ERROR] kron daemon stopped while running the command\n')
+        return 1
+    # Errors and a busy daemon make the command run here
+    if 'exit' not in answer:
+        return None
+    return answer['exit']
+
+
+def main():
+    # Unix sockets are not available everywhere, there kron always runs in this process
+    if hasattr(_socket, 'AF_UNIX') and not os.environ.get('KRONBUTE_NO_DAEMON') and \
+            '_KRON_COMPLETE' not in os.environ and not is_local(sys.argv[1:]):
+        code = forward(socket_path(), sys.argv)
+        if code is not None:
+            sys.exit(code)
+
+    from .main import cli
+    cli()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Shell completion for job ids and aliases, group names and time zones
+
+Completions are answered from the job index and group listing kept with the cached server answers, whatever their
+age, so a keystroke never waits for the server. When they are older than the cache time to live a detached process
+refreshes them for the next keystroke. Enable it with `eval "$(_KRON_COMPLETE=source kron)"` for bash or
+`eval "$(_KRON_COMPLETE=source_zsh kron)"` for zsh.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import List, Optional, Tuple, Any
+
+from .kronbute.cache import ResponseCache, default_directory
+from .kronbute.index import JobIndex, INDEX_ENDPOINT
+
+GROUPS_ENDPOINT = 'api/groups'
+DEFAULT_SERVER = 'http://localhost:8080'
+# A refresh taking longer than this is considered dead and another one is started
+REFRESH_SECONDS = 60
+LOCK_FILE = 'completion.lock'
+
+
+def _cache(ctx) -> Optional[Tuple[ResponseCache, str]]:
+    """Cache and server of the command line being completed, the main callback does not run while completing"""
+    params = ctx.find_root().params
+    if params.get('no_cache'):
+        return None
+    ttl = params.get('cache_ttl')
+    return ResponseCache(params.get('cache_dir'), 10.0 if ttl is None else ttl), params.get('server') or DEFAULT_SERVER
+
+
+def _refresh_later(cache: ResponseCache, url: str):
+    """Starts a detached process refreshing the cached listings, unless another one is already doing it"""
+    directory = cache.server_directory(url)
+    lock = os.path.join(directory, LOCK_FILE)
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        if os.path.exists(lock) and time.time() - os.path.getmtime(lock) < REFRESH_SECONDS:
+            return
+        with open(lock, 'w'):
+            pass
+        subprocess.Popen([sys.executable, '-m', 'kron.completion', url, cache.directory, str(cache.ttl)],
+                         stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                         start_new_session=True, close_fds=True)
+    except OSError:
+        pass
+
+
+def _cached(ctx, endpoint: str) -> Optional[str]:
+    found = _cache(ctx)
+    if found is None:
+        return None
+
+    cache, url = found
+    entry = cache.load(url, endpoint)
+    if entry is None or not entry.is_fresh(cache.ttl):
+        _refresh_later(cache, url)
+    return entry.content if entry else None
+
+
+def complete_jobs(ctx, args: List[str], incomplete: str) -> List[Tuple[str, str]]:
+    content = _cached(ctx, INDEX_ENDPOINT)
+    if content is None:
+        return []
+
+    try:
+        index = JobIndex.from_json(content)
+    except (ValueError, TypeError):
+        return []
+
+    keys = index.complete(incomplete)
+    if not keys:
+        return []
+
+    # Ids are described with the alias of the job, aliases with its name
+    names = {str(entry.id): entry.alias or entry.name for entry in index.entries}
+    names.update((entry.alias, entry.name) for entry in index.entries if entry.alias)
+    return [(key, names.get(key, '')) for key in keys]
+
+
+def _groups(ctx) -> List[Any]:
+    content = _cached(ctx, GROUPS_ENDPOINT)
+    try:
+        groups = json.loads(content) if content else []
+    except ValueError:
+        return []
+    return [group for group in groups if isinstance(group, dict) and 'name' in group]
+
+
+def complete_group_names(ctx, args: List[str], incomplete: str) -> List[str]:
+    return sorted(group['name'] for group in _groups(ctx) if group['name'].startswith(incomplete))
+
+
+def complete_groups(ctx, args: List[str], incomplete: str) -> List[Tuple[str, str]]:
+    """Group ids, described with their names, and names"""
+    groups = _groups(ctx)
+    found = [(str(group['id']), group['name']) for group in groups
+             if 'id' in group and str(group['id']).startswith(incomplete)]
+    found.extend((group['name'], '') for group in groups if group['name'].startswith(incomplete))
+    return sorted(found)
+
+
+def complete_timezones(ctx, args: List[str], incomplete: str) -> List[str]:
+    from .validation import timezone_names
+
+    wanted = incomplete.lower()
+    return sorted(name for name in timezone_names() if name.lower().startswith(wanted))
+
+
+def refresh(url: str, directory: str, ttl: float):
+    """Lists jobs, which stores the index, and groups through the cache"""
+    from .kronbute import BaseServer, JobServer, GroupsServer
+
+    cache = ResponseCache(directory, ttl)
+    server = BaseServer(url, retries=0, timeout=30.0, cache=cache)
+    try:
+        JobServer(server).list()
+        GroupsServer(server).list()
+    finally:
+        server.close()
+        try:
+            os.remove(os.path.join(cache.server_directory(url), LOCK_FILE))
+        except OSError:
+            pass
+
+
+if __name__ == '__main__':
+    refresh(sys.argv[1], sys.argv[2] or default_directory(), float(sys.argv[3]))
@@ -0,0 +1,479 @@
+import calendar
+import functools
+import re
+from datetime import datetime, date, timedelta
+from typing import Optional, Dict, List, Tuple, Iterator, FrozenSet, NamedTuple
+
+UNIX = 'UNIX'
+QUARTZ = 'QUARTZ'
+
+MONTH_NAMES = {name.upper(): index for index, name in enumerate(calendar.month_abbr) if name}
+# Days of the week are stored Sunday first, as cron does
+DAY_NAMES = {'SUN': 0, 'MON': 1, 'TUE': 2, 'WED': 3, 'THU': 4, 'FRI': 5, 'SAT': 6}
+
+MACROS = {
+    '@yearly': '0 0 1 1 *',
+    '@annually': '0 0 1 1 *',
+    '@monthly': '0 0 1 * *',
+    '@weekly': '0 0 * * 0',
+    '@daily': '0 0 * * *',
+    '@midnight': '0 0 * * *',
+    '@hourly': '0 * * * *'
+}
+
+macro_regex = re.compile(r'^\s*(?P<macro>@\w+)'
+                         r'(?:\s+at\s+(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<meridiem>am|pm)?)?\s*$', re.IGNORECASE)
+
+# Years without a match for a day expression, such as February 30, make next fire time searches give up
+SEARCH_YEARS = 8
+
+
+class CronSyntaxError(ValueError):
+    def __init__(self, message: str, expression: str, position: int):
+        super().__init__(f'{message} at position {position + 1}')
+        self.message = message
+        self.expression = expression
+        self.position = position
+
+
+def expand_macro(value: str) -> Optional[str]:
+    """UNIX expression for macros such as '@daily', offsets are supported as in '@hourly at 23' or
+    '@daily at 3:45pm', None when the value is not a macro"""
+    match = macro_regex.match(value)
+    if not match or match.group('macro').lower() not in MACROS:
+        return None
+
+    fields = MACROS[match.group('macro').lower()].split(' ')
+    if match.group('hour') is None:
+        return ' '.join(fields)
+
+    hour, minute, meridiem = int(match.group('hour')), match.group('minute'), match.group('meridiem')
+    if match.group('macro').lower() == '@hourly':
+        # '@hourly at 23' means at minute 23 of every hour
+        if minute is not None or meridiem or hour > 59:
+            return None
+        fields[0] = str(hour)
+        return ' '.join(fields)
+
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem.lower() == 'pm' else 0)
+
+    if hour > 23 or (minute is not None and int(minute) > 59):
+        return None
+
+    fields[0], fields[1] = str(int(minute or 0)), str(hour)
+    return ' '.join(fields)
+
+
+class Field(NamedTuple):
+    name: str
+    low: int
+    high: int
+    names: Dict[str, int]
+
+
+SECONDS = Field('second', 0, 59, {})
+MINUTES = Field('minute', 0, 59, {})
+HOURS = Field('hour', 0, 23, {})
+DAYS = Field('day of month', 1, 31, {})
+MONTHS = Field('month', 1, 12, MONTH_NAMES)
+UNIX_WEEKDAYS = Field('day of week', 0, 7, DAY_NAMES)
+QUARTZ_WEEKDAYS = Field('day of week', 1, 7, {name: index + 1 for name, index in DAY_NAMES.items()})
+YEARS = Field('year', 1970, 2199, {})
+
+item_regex = re.compile(r'^(?P<range>\*|\?|(?P<start>\w+)(?:-(?P<end>\w+))?)(?:/(?P<step>\d+))?$')
+
+
+def _bits(start: int, end: int, step: int = 1) -> int:
+    mask = 0
+    for value in range(start, end + 1, step):
+        mask |= 1 << value
+    return mask
+
+
+def _next_bit(mask: int, start: int) -> Optional[int]:
+    """Lowest set bit at or after start"""
+    remaining = mask >> start
+    if not remaining:
+        return None
+    return start + (remaining & -remaining).bit_length() - 1
+
+
+def _first_bit(mask: int) -> int:
+    return (mask & -mask).bit_length() - 1
+
+
+def _bit_values(mask: int) -> List[int]:
+    values = []
+    while mask:
+        lowest = mask & -mask
+        values.append(lowest.bit_length() - 1)
+        mask ^= lowest
+    return values
+
+
+class CronSchedule:
+    """Compiled cron expression, every field is a bitset so matching a date is a handful of bit operations"""
+
+    def __init__(self, expression: str, cron_type: str):
+        self.expression = expression
+        self.cron_type = cron_type
+
+        self.seconds = 1
+        self.minutes = 0
+        self.hours = 0
+        self.days = 0
+        self.months = 0
+        self.weekdays = 0
+        self.years: Optional[FrozenSet[int]] = None
+
+        self.any_day = True
+        self.any_weekday = True
+        # Quartz extensions, 'L' and 'L-n' days before the end of the month, 'nW' and 'LW' weekdays, 'nL' and 'n#m'
+        self.last_day_offsets: FrozenSet[int] = frozenset()
+        self.nearest_weekdays: FrozenSet[int] = frozenset()
+        self.last_weekday_of_month = False
+        self.last_weekdays = 0
+        self.nth_weekdays: FrozenSet[Tuple[int, int]] = frozenset()
+
+    def __repr__(self):
+        return f'CronSchedule({self.expression!r}, {self.cron_type!r})'
+
+    @property
+    def fires_per_minute(self) -> int:
+        return bin(self.seconds).count('1')
+
+    def _matches_day_of_month(self, day: date, month_length: int) -> bool:
+        if (self.days >> day.day) & 1:
+            return True
+
+        if self.last_day_offsets and month_length - day.day in self.last_day_offsets:
+            return True
+
+        if day.weekday() < 5:
+            if self.last_weekday_of_month and _last_weekday(day.year, day.month, month_length) == day.day:
+                return True
+
+            return any(_nearest_weekday(day.year, day.month, month_length, target) == day.day
+                       for target in self.nearest_weekdays)
+
+        return False
+
+    def _matches_day_of_week(self, day: date, month_length: int) -> bool:
+        weekday = (day.weekday() + 1) % 7
+        if (self.weekdays >> weekday) & 1:
+            return True
+
+        if (self.last_weekdays >> weekday) & 1 and day.day + 7 > month_length:
+            return True
+
+        return (weekday, (day.day - 1) // 7 + 1) in self.nth_weekdays
+
+    def matches_day(self, day: date) -> bool:
+        if not (self.months >> day.month) & 1:
+            return False
+
+        if self.years is not None and day.year not in self.years:
+            return False
+
+        if self.any_day and self.any_weekday:
+            return True
+
+        month_length = calendar.monthrange(day.year, day.month)[1]
+        if self.any_day:
+            return self._matches_day_of_week(day, month_length)
+        if self.any_weekday:
+            return self._matches_day_of_month(day, month_length)
+
+        # As in vixie cron, when both are restricted either of them is enough
+        return self._matches_day_of_month(day, month_length) or self._matches_day_of_week(day, month_length)
+
+    def _time_of_day(self, hour: int, minute: int, second: int) -> Optional[Tuple[int, int, int]]:
+        """First fire time in a matching day at or after the given time"""
+        next_hour = _next_bit(self.hours, hour)
+        if next_hour is None:
+            return None
+        if next_hour != hour:
+            return next_hour, _first_bit(self.minutes), _first_bit(self.seconds)
+
+        next_minute = _next_bit(self.minutes, minute)
+        if next_minute is not None and next_minute != minute:
+            return hour, next_minute, _first_bit(self.seconds)
+
+        if next_minute is not None:
+            next_second = _next_bit(self.seconds, second)
+            if next_second is not None:
+                return hour, minute, next_second
+
+            next_minute = _next_bit(self.minutes, minute + 1)
+            if next_minute is not None:
+                return hour, next_minute, _first_bit(self.seconds)
+
+        next_hour = _next_bit(self.hours, hour + 1)
+        if next_hour is None:
+            return None
+        return next_hour, _first_bit(self.minutes), _first_bit(self.seconds)
+
+    def next_local(self, after: datetime) -> Optional[datetime]:
+        """Next fire time strictly after a naive local time"""
+        current = after.replace(microsecond=0) + timedelta(seconds=1)
+        day = current.date()
+        time_of_day: Optional[Tuple[int, int, int]] = (current.hour, current.minute, current.second)
+        last_year = min(day.year + SEARCH_YEARS, max(self.years) if self.years else YEARS.high)
+
+        while day.year <= last_year:
+            if not (self.months >> day.month) & 1:
+                # Jump straight to the first day of the next month
+                day = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+                time_of_day = (0, 0, 0)
+                continue
+
+            if self.matches_day(day):
+                found = self._time_of_day(*time_of_day)
+                if found is not None:
+                    return datetime(day.year, day.month, day.day, *found)
+
+            day += timedelta(days=1)
+            time_of_day = (0, 0, 0)
+
+        return None
+
+    def iterate(self, start: Optional[datetime] = None, timezone: str = 'UTC') -> Iterator[datetime]:
+        """Timezone aware fire times after start (now by default), as Quartz does times skipped by a daylight
+        saving change do not fire and repeated ones fire once"""
+        import pytz
+
+        zone = pytz.timezone(timezone)
+        start = start or datetime.now(pytz.utc)
+        if start.tzinfo is None:
+            start = pytz.utc.localize(start)
+
+        local = start.astimezone(zone).replace(tzinfo=None)
+        while True:
+            local = self.next_local(local)
+            if local is None:
+                return
+
+            try:
+                yield zone.localize(local, is_dst=None)
+            except pytz.NonExistentTimeError:
+                continue
+            except pytz.AmbiguousTimeError:
+                yield zone.localize(local, is_dst=True)
+
+    def next_times(self, count: int, start: Optional[datetime] = None, timezone: str = 'UTC') -> List[datetime]:
+        times = []
+        for fire_time in self.iterate(start, timezone):
+            times.append(fire_time)
+            if len(times) >= count:
+                break
+        return times
+
+
+def _last_weekday(year: int, month: int, month_length: int) -> int:
+    last = date(year, month, month_length)
+    return month_length - max(0, last.weekday() - 4)
+
+
+def _nearest_weekday(year: int, month: int, month_length: int, target: int) -> Optional[int]:
+    """Weekday closest to a day of the month without leaving the month, the 'W' of Quartz"""
+    if target > month_length:
+        return None
+
+    weekday = date(year, month, target).weekday()
+    if weekday == 5:
+        return target - 1 if target > 1 else target + 2
+    if weekday == 6:
+        return target + 1 if target < month_length else target - 2
+    return target
+
+
+class _Parser:
+    def __init__(self, expression: str, cron_type: str):
+        self.expression = expression
+        self.cron_type = cron_type
+
+    def fail(self, message: str, position: int):
+        raise CronSyntaxError(message, self.expression, position)
+
+    def value(self, text: str, field: Field, position: int) -> int:
+        if text.isdigit():
+            value = int(text)
+        elif text.upper() in field.names:
+            value = field.names[text.upper()]
+        else:
+            self.fail(f"'{text}' is not a valid {field.name}", position)
+
+        if not field.low <= value <= field.high:
+            self.fail(f"{field.name} {value} out of range {field.low}-{field.high}", position)
+
+        return value
+
+    def field(self, text: str, field: Field, position: int) -> int:
+        """Bitset for a field made of comma separated items, ranges and steps"""
+        mask = 0
+        offset = 0
+        for item in text.split(','):
+            item_position = position + offset
+            offset += len(item) + 1
+            if not item:
+                self.fail(f'empty item in {field.name}', item_position)
+
+            match = item_regex.match(item)
+            if not match:
+                self.fail(f"'{item}' is not a valid {field.name}", item_position)
+
+            step = int(match.group('step')) if match.group('step') else 1
+            if step == 0:
+                self.fail('step cannot be zero', item_position + item.index('/') + 1)
+
+            if match.group('range') in ('*', '?'):
+                start, end = field.low, field.high
+            else:
+                start = self.value(match.group('start'), field, item_position)
+                end_position = item_position + len(match.group('start')) + 1
+                if match.group('end'):
+                    end = self.value(match.group('end'), field, end_position)
+                else:
+                    end = field.high if match.group('step') else start
+
+            if start <= end:
+                mask |= _bits(start, end, step)
+            else:
+                # Ranges such as FRI-MON or 22-2 wrap around
+                values = list(range(start, field.high + 1)) + list(range(field.low, end + 1))
+                for value in values[::step]:
+                    mask |= 1 << value
+
+        return mask
+
+    def days(self, schedule: CronSchedule, text: str, position: int):
+        if text in ('*', '?'):
+            return
+
+        schedule.any_day = False
+        plain = []
+        offsets, nearest = set(), set()
+        offset = 0
+        for item in text.split(','):
+            item_position = position + offset
+            offset += len(item) + 1
+            upper = item.upper()
+
+            if upper == 'LW':
+                schedule.last_weekday_of_month = True
+            elif upper == 'L' or upper.startswith('L-'):
+                days_before = upper[2:] or '0'
+                if not days_before.isdigit() or int(days_before) > 30:
+                    self.fail(f"'{item}' is not a valid offset from the last day of the month", item_position)
+                offsets.add(int(days_before))
+            elif upper.endswith('W'):
+                nearest.add(self.value(item[:-1], DAYS, item_position))
+            else:
+                plain.append((item, item_position))
+
+        for item, item_position in plain:
+            schedule.days |= self.field(item, DAYS, item_position)
+        schedule.last_day_offsets = frozenset(offsets)
+        schedule.nearest_weekdays = frozenset(nearest)
+
+    def weekdays(self, schedule: CronSchedule, text: str, position: int):
+        if text in ('*', '?'):
+            return
+
+        field = QUARTZ_WEEKDAYS if self.cron_type == QUARTZ else UNIX_WEEKDAYS
+
+        def normalize(value: int) -> int:
+            return value - 1 if self.cron_type == QUARTZ else value % 7
+
+        schedule.any_weekday = False
+        nth = set()
+        offset = 0
+        for item in text.split(','):
+            item_position = position + offset
+            offset += len(item) + 1
+            upper = item.upper()
+
+            if '#' in item:
+                weekday, _, occurrence = item.partition('#')
+                if not occurrence.isdigit() or not 1 <= int(occurrence) <= 5:
+                    self.fail(f"'{occurrence}' is not a valid occurrence, it goes from 1 to 5",
+                              item_position + len(weekday) + 1)
+                nth.add((normalize(self.value(weekday, field, item_position)), int(occurrence)))
+            elif upper == 'L':
+                # A lone L is the last day of the week, Saturday
+                schedule.weekdays |= 1 << 6
+            elif upper.endswith('L'):
+                schedule.last_weekdays |= 1 << normalize(self.value(item[:-1], field, item_position))
+            else:
+                for value in _bit_values(self.field(item, field, item_position)):
+                    schedule.weekdays |= 1 << normalize(value)
+
+        schedule.nth_weekdays = frozenset(nth)
+
+
+def to_quartz(expression: str) -> str:
+    """Quartz version of a plain UNIX expression, seconds added and one of the day fields set to '?'"""
+    minutes, hours, days, months, weekdays = expression.split()
+    if weekdays == '*':
+        weekdays = '?'
+    else:
+        days = '?'
+        weekdays = ','.join(str(int(value) % 7 + 1) if value.isdigit() else value for value in weekdays.split(','))
+
+    return ' '.join(['0', minutes, hours, days, months, weekdays])
+
+
+def tokenize(expression: str) -> List[Tuple[str, int]]:
+    return [(match.group(), match.start()) for match in re.finditer(r'\S+', expression)]
+
+
+def detect_type(expression: str) -> str:
+    """Expressions with seconds, six or seven fields, are Quartz ones"""
+    return QUARTZ if len(tokenize(expression)) in (6, 7) else UNIX
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_cron(expression: str, cron_type: Optional[str] = None) -> CronSchedule:
+    """Compiles a UNIX (minute hour day month weekday) or Quartz (second minute hour day month weekday [year])
+    expression, macros such as '@daily at 3:45pm' are accepted as well"""
+    expanded = expand_macro(expression) if expression.lstrip().startswith('@') else None
+    if expression.lstrip().startswith('@') and expanded is None:
+        raise CronSyntaxError(f"'{expression.strip()}' is not a known macro", expression, expression.index('@'))
+
+    cron_type = (cron_type or (UNIX if expanded else detect_type(expression))).upper()
+    source = expression
+    if expanded:
+        source = expanded if cron_type == UNIX else to_quartz(expanded)
+        expression = source
+
+    tokens = tokenize(source)
+    expected = (5,) if cron_type == UNIX else (6, 7)
+    if len(tokens) not in expected:
+        position = tokens[expected[-1]][1] if len(tokens) > expected[-1] else len(source)
+        names = 'minute hour day month weekday' if cron_type == UNIX else 'second minute hour day month weekday [year]'
+        raise CronSyntaxError(f'{cron_type} expressions have {" or ".join(map(str, expected))} fields ({names}), '
+                              f'found {len(tokens)}', source, position)
+
+    parser = _Parser(source, cron_type)
+    schedule = CronSchedule(expression, cron_type)
+
+    if cron_type == QUARTZ:
+        (seconds, seconds_at), *tokens = tokens
+        schedule.seconds = parser.field(seconds, SECONDS, seconds_at)
+
+    (minutes, minutes_at), (hours, hours_at), (days, days_at), (months, months_at), (weekdays, weekdays_at) = tokens[:5]
+    schedule.minutes = parser.field(minutes, MINUTES, minutes_at)
+    schedule.hours = parser.field(hours, HOURS, hours_at)
+    parser.days(schedule, days, days_at)
+    schedule.months = parser.field(months, MONTHS, months_at)
+    parser.weekdays(schedule, weekdays, weekdays_at)
+
+    if len(tokens) == 6:
+        years, years_at = tokens[5]
+        if years not in ('*', '?'):
+            schedule.years = frozenset(_bit_values(parser.field(years, YEARS, years_at)))
+
+    return schedule
@@ -0,0 +1,3 @@
+from .command_group import daemon as daemon_group
+
+__all__ = ['daemon_group']
@@ -0,0 +1,116 @@
+import os
+import subprocess
+import sys
+import time
+
+import click
+
+from .. import util, output, client
+
+STATUS_FIELDS = ['pid', 'socket', 'uptime', 'commands', 'idle_timeout']
+# Seconds to wait for a new daemon to answer
+START_SECONDS = 10
+
+
+def _unsafe_directory(ctx, path: str):
+    click.secho(f'\n[ERROR] {os.path.dirname(os.path.abspath(path))} has to be a directory owned by you with mode 700, '
+                f'kron does not use a daemon in a directory other users can reach', err=True, fg='red')
+    ctx.exit(1)
+
+
+def _check_directory(ctx, path: str):
+    directory = os.path.dirname(os.path.abspath(path))
+    if os.path.lexists(directory) and not client.is_private_directory(directory):
+        _unsafe_directory(ctx, path)
+
+
+def _socket_option(function):
+    return click.option('--socket', 'path', envvar='KRONBUTE_DAEMON_SOCKET', default=client.socket_path,
+                        type=click.Path(dir_okay=False), help='Unix socket of the daemon')(function)
+
+
+@click.group(help='Keep kron running in the background, so commands skip the start up of Python and kron')
+def daemon():
+    pass
+
+
+@daemon.command('start', help='Start the daemon, kron commands are sent to it from then on')
+@_socket_option
+@click.option('--idle-timeout', help='Stop after this number of seconds without commands, 0 to never stop',
+              default=3600.0, type=click.FloatRange(min=0))
+@click.option('--foreground', is_flag=True, help='Run in this terminal instead of in the background')
+@click.pass_context
+def start(ctx, path: str, idle_timeout: float, foreground: bool):
+    answer = client.request(path, {'status': True})
+    if answer and 'status' in answer:
+        click.echo(util.success(f"kron daemon is already running with pid {answer['status']['pid']}"))
+        return
+
+    from .server import Daemon, UnsafeDirectoryError, check_directory, warm_up
+
+    try:
+        check_directory(path)
+    except (OSError, UnsafeDirectoryError):
+        _unsafe_directory(ctx, path)
+
+    if foreground:
+        warm_up()
+        click.echo(util.success(f'kron daemon listening on {path}, stop it with Ctrl+C'))
+        Daemon(path, idle_timeout or None).serve()
+        return
+
+    subprocess.Popen([sys.executable, '-m', 'kron.daemon.server', path, str(idle_timeout)],
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                     start_new_session=True, close_fds=True, cwd=os.path.abspath(os.sep))
+
+    deadline = time.monotonic() + START_SECONDS
+    while time.monotonic() < deadline:
+        answer = client.request(path, {'status': True})
+        if answer and 'status' in answer:
+            click.echo(util.success(f"kron daemon started with pid {answer['status']['pid']} on {path}"))
+            return
+        time.sleep(0.05)
+
+    click.secho(f'\n[ERROR] kron daemon did not start in {START_SECONDS} seconds, try kron daemon start --foreground',
+                err=True, fg='red')
+    ctx.exit(1)
+
+
+@daemon.command('stop', help='Stop the daemon, kron commands run on their own from then on')
+@_socket_option
+@click.pass_context
+def stop(ctx, path: str):
+    _check_directory(ctx, path)
+    answer = client.request(path, {'stop': True})
+    if not answer or 'stopping' not in answer:
+        click.secho('\n[ERROR] kron daemon is not running', err=True, fg='red')
+        ctx.exit(1)
+
+    click.echo(util.success(f"kron daemon with pid {answer['stopping']['pid']} stopped after "
+                            f"{answer['stopping']['commands']} commands"))
+
+
+@daemon.command('status', help='Show whether the daemon is running and how many commands it ran')
+@_socket_option
+@click.pass_context
+def status(ctx, path: str):
+    _check_directory(ctx, path)
+    answer = client.request(path, {'status': True})
+    if not answer or 'status' not in answer:
+        click.secho('\n[ERROR] kron daemon is not running', err=True, fg='red')
+        ctx.exit(1)
+
+    record = answer['status']
+    if not output.is_table():
+        output.write_record(record, STATUS_FIELDS)
+        return
+
+    from terminaltables import SingleTable
+
+    click.echo(SingleTable([
+        ['Pid', record['pid']],
+        ['Socket', record['socket']],
+        ['Uptime', f"{record['uptime']:.0f} s"],
+        ['Commands', record['commands']],
+        ['Idle timeout', f"{record['idle_timeout']:.0f} s" if record['idle_timeout'] else 'never']
+    ]).table)
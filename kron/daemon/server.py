@@ -0,0 +1,293 @@
+"""Long running kron process answering the commands forwarded by kron.client
+
+Every command module is imported once at start, and connections to Kronbute and cached answers are kept between
+commands, so a command costs its own work only. Commands run one at a time in the main thread, with the standard
+streams, arguments, environment and working directory of the client swapped in, a second client runs its command
+itself while the daemon is busy. Only the user running the daemon can use it.
+"""
+import os
+import queue
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+from typing import List, Dict, Any, Optional
+
+from ..client import Channel, PROTOCOL, is_forwarded, is_private_directory, peer_uid
+
+
+# Seconds a client has to send its request
+RECEIVE_SECONDS = 5
+
+
+class DaemonRunningError(Exception):
+    pass
+
+
+class UnsafeDirectoryError(Exception):
+    """The directory of the socket is not a directory of this user closed to everyone else"""
+    pass
+
+
+def _same_user(connection: socket.socket) -> bool:
+    """Whether the client runs as the same user, the socket directory already keeps the rest out where the
+    credentials of the peer are not available"""
+    uid = peer_uid(connection)
+    return uid is None or uid == os.getuid()
+
+
+def check_directory(path: str):
+    """Raises UnsafeDirectoryError unless the directory of the socket can only be used by this user, clients do not
+    connect to sockets in other directories"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if not is_private_directory(directory):
+        raise UnsafeDirectoryError(directory)
+
+
+def warm_up():
+    """Imports every command and keeps server sessions and cached answers from one command to the next"""
+    from .. import main
+    from ..util import LazyGroup
+
+    groups = [main.cli]
+    while groups:
+        group = groups.pop()
+        for name in list(group.lazy_commands):
+            command = group.get_command(None, name)
+            if isinstance(command, LazyGroup):
+                groups.append(command)
+
+    import requests
+    import terminaltables
+    import yaml
+
+    main.daemon_sessions = {}
+    main.daemon_caches = {}
+
+
+class Daemon:
+    def __init__(self, path: str, idle_timeout: Optional[float] = None):
+        self.path = path
+        self.idle_timeout = idle_timeout
+        self.started = time.time()
+        self.commands = 0
+        self.stopping = False
+        # Commands handed from the thread accepting connections to the main thread, None wakes it up to stop
+        self.pending: queue.Queue = queue.Queue()
+        # Interrupts from the client only reach a command still running, and a command only waits for none
+        self.lock = threading.Lock()
+        self.running = False
+        self.busy = False
+
+    def listen(self) -> socket.socket:
+        check_directory(self.path)
+
+        if os.path.exists(self.path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.path)
+                raise DaemonRunningError(self.path)
+            except OSError:
+                # Left behind by a daemon that did not stop cleanly
+                os.remove(self.path)
+            finally:
+                probe.close()
+
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o177)
+        try:
+            listener.bind(self.path)
+        finally:
+            os.umask(umask)
+        listener.listen(16)
+        return listener
+
+    def serve(self):
+        listener = self.listen()
+        signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+        threading.Thread(target=self.accept, args=(listener,), daemon=True).start()
+        try:
+            while not self.stopping:
+                try:
+                    command = self.pending.get(timeout=self.idle_timeout or None)
+                except queue.Empty:
+                    return
+                if command is None:
+                    continue
+
+                connection, channel, request, fds = command
+                with connection:
+                    try:
+                        self.handle(connection, channel, request, fds)
+                    except KeyboardInterrupt:
+                        # An interrupt sent by a client just as its command finished
+                        pass
+                    except Exception:
+                        # The client is told the daemon stopped, the daemon keeps going for the next one
+                        traceback.print_exc()
+                    finally:
+                        for fd in fds:
+                            os.close(fd)
+                        with self.lock:
+                            self.busy = False
+        finally:
+            listener.close()
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def status(self) -> Dict[str, Any]:
+        return {'pid': os.getpid(), 'socket': self.path, 'uptime': round(time.time() - self.started, 1),
+                'commands': self.commands, 'idle_timeout': self.idle_timeout}
+
+    def accept(self, listener: socket.socket):
+        """Answers status and stop requests at any time, commands arriving while another one runs are sent back to
+        run in their client, so a long command such as a watch never blocks the others"""
+        while True:
+            try:
+                connection, _ = listener.accept()
+            except OSError:
+                return
+
+            try:
+                handed = self.receive(connection)
+            except Exception:
+                traceback.print_exc()
+                handed = False
+            if not handed:
+                connection.close()
+
+    def receive(self, connection: socket.socket) -> bool:
+        """Whether the connection was handed to the main thread to run a command"""
+        if not _same_user(connection):
+            return False
+
+        # A client that never sends its request cannot hold the other ones
+        connection.settimeout(RECEIVE_SECONDS)
+        channel = Channel(connection)
+        request, fds = channel.receive(3)
+        handed = False
+        try:
+            if request is None:
+                return False
+            if request.get('version') != PROTOCOL:
+                channel.send({'error': f"kron daemon speaks protocol {PROTOCOL}, not {request.get('version')}"})
+                return False
+            if request.get('stop'):
+                self.stopping = True
+                channel.send({'stopping': self.status()})
+                self.pending.put(None)
+                return False
+            if request.get('status'):
+                channel.send({'status': self.status()})
+                return False
+            if len(fds) != 3 or 'argv' not in request:
+                channel.send({'error': 'a command needs the arguments and the standard streams of the client'})
+                return False
+
+            with self.lock:
+                busy, self.busy = self.busy, True
+            if busy:
+                channel.send({'busy': True})
+                return False
+
+            connection.settimeout(None)
+            self.pending.put((connection, channel, request, fds))
+            handed = True
+            return True
+        finally:
+            if not handed:
+                for fd in fds:
+                    os.close(fd)
+
+    def handle(self, connection: socket.socket, channel: Channel, request: Dict[str, Any], fds: List[int]):
+        watcher = threading.Thread(target=self.watch, args=(channel,), daemon=True)
+        with self.lock:
+            self.running = True
+        watcher.start()
+        try:
+            code = self.run(request, fds)
+        finally:
+            with self.lock:
+                self.running = False
+
+        self.commands += 1
+        channel.send({'exit': code})
+        connection.shutdown(socket.SHUT_RDWR)
+        watcher.join()
+
+    def watch(self, channel: Channel):
+        """Interrupts the command when the client asks for it or goes away, as Ctrl+C would in the client"""
+        while True:
+            try:
+                message, _ = channel.receive()
+            except OSError:
+                message = None
+            if message is None or message.get('interrupt'):
+                break
+
+        with self.lock:
+            if self.running:
+                os.kill(os.getpid(), signal.SIGINT)
+
+    def run(self, request: Dict[str, Any], fds: List[int]) -> int:
+        """Runs a command with the streams, arguments, environment and working directory of the client"""
+        from ..main import cli
+
+        streams = sys.stdin, sys.stdout, sys.stderr
+        argv = sys.argv
+        environment = dict(os.environ)
+        directory = os.getcwd()
+        # The descriptors are replaced too, for anything writing to them directly or asking for the terminal size
+        originals = [os.dup(fd) for fd in range(3)]
+        try:
+            for fd, client_fd in enumerate(fds):
+                os.dup2(client_fd, fd)
+            encoding = request.get('encoding') or 'utf-8'
+            sys.stdin = open(0, 'r', encoding=encoding, closefd=False)
+            sys.stdout = open(1, 'w', buffering=1 if os.isatty(1) else -1, encoding=encoding, closefd=False)
+            sys.stderr = open(2, 'w', buffering=1, encoding=encoding, errors='backslashreplace', closefd=False)
+
+            # Clients only send the variables kron reads, the rest stay as the daemon got them
+            os.environ.clear()
+            os.environ.update((name, value) for name, value in environment.items() if not is_forwarded(name))
+            os.environ.update(request.get('env') or {})
+            sys.argv = list(request['argv'])
+
+            try:
+                os.chdir(request.get('cwd') or directory)
+                cli(args=sys.argv[1:], prog_name='kron')
+                return 0
+            except SystemExit as ex:
+                if ex.code is None or isinstance(ex.code, int):
+                    return ex.code or 0
+                print(ex.code, file=sys.stderr)
+                return 1
+            except KeyboardInterrupt:
+                return 130
+            except Exception:
+                traceback.print_exc()
+                return 1
+        finally:
+            for stream in (sys.stdout, sys.stderr):
+                try:
+                    stream.flush()
+                except (OSError, ValueError):
+                    pass
+            sys.stdin, sys.stdout, sys.stderr = streams
+            sys.argv = argv
+            os.environ.clear()
+            os.environ.update(environment)
+            os.chdir(directory)
+            for fd, original in enumerate(originals):
+                os.dup2(original, fd)
+                os.close(original)
+
+
+if __name__ == '__main__':
+    warm_up()
+    Daemon(sys.argv[1], float(sys.argv[2]) or None).serve()
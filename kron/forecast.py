@@ -0,0 +1,213 @@
+import functools
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, Iterable, List, Tuple, Optional, NamedTuple
+
+from .cron import CronSchedule, CronSyntaxError, compile_cron
+
+
+class ScheduleKey(NamedTuple):
+    expression: str
+    cron_type: Optional[str]
+    timezone: str
+
+
+class Hotspot(NamedTuple):
+    minute: int
+    starts: int
+    contributors: List[Tuple[ScheduleKey, int]]
+
+
+def day_mask(schedule: CronSchedule) -> int:
+    """Minutes of a matching day with fire times, bit h * 60 + m is set when the schedule fires at h:m"""
+    mask = 0
+    hours = schedule.hours
+    while hours:
+        lowest = hours & -hours
+        mask |= schedule.minutes << (60 * (lowest.bit_length() - 1))
+        hours ^= lowest
+    return mask
+
+
+class WindowDay(NamedTuple):
+    day: date
+    midnight: datetime
+    offset: Optional[timedelta]
+
+
+@functools.lru_cache(maxsize=64)
+def window_days(timezone: str, start: datetime, minutes: int) -> Tuple[WindowDay, ...]:
+    """Local days touching a window with their UTC offset, None for the days with a daylight saving change"""
+    import pytz
+
+    zone = pytz.timezone(timezone)
+    end = start + timedelta(minutes=minutes)
+    day = pytz.utc.localize(start).astimezone(zone).date() - timedelta(days=1)
+    last_day = pytz.utc.localize(end).astimezone(zone).date() + timedelta(days=1)
+
+    days = []
+    midnight = datetime(day.year, day.month, day.day)
+    offset = zone.localize(midnight, is_dst=False).utcoffset()
+    while day <= last_day:
+        next_midnight = midnight + timedelta(days=1)
+        next_offset = zone.localize(next_midnight, is_dst=False).utcoffset()
+        days.append(WindowDay(day, midnight, offset if offset == next_offset else None))
+        day, midnight, offset = day + timedelta(days=1), next_midnight, next_offset
+
+    return tuple(days)
+
+
+def minute_mask(schedule: CronSchedule, timezone: str, start: datetime, minutes: int) -> int:
+    """Minutes of the window with fire times, bit 0 is the (naive UTC) start minute
+
+    Whole days are shifted into place at once, only the days with a daylight saving change are placed fire time by
+    fire time.
+    """
+    pattern = day_mask(schedule)
+    if not pattern:
+        return 0
+
+    mask = 0
+    for day, midnight, offset in window_days(timezone, start, minutes):
+        if not schedule.matches_day(day):
+            continue
+
+        if offset is None:
+            mask |= _transition_day_mask(schedule, timezone, midnight, start)
+        else:
+            position = int((midnight - offset - start).total_seconds()) // 60
+            mask |= pattern << position if position >= 0 else pattern >> -position
+
+    return mask & ((1 << minutes) - 1)
+
+
+def _transition_day_mask(schedule: CronSchedule, timezone: str, midnight: datetime, start: datetime) -> int:
+    import pytz
+
+    zone = pytz.timezone(timezone)
+    mask = 0
+    for fire_time in schedule.iterate(zone.localize(midnight - timedelta(seconds=1)), timezone):
+        if fire_time.replace(tzinfo=None) >= midnight + timedelta(days=1):
+            break
+        position = int((fire_time.astimezone(pytz.utc).replace(tzinfo=None) - start).total_seconds()) // 60
+        if position >= 0:
+            mask |= 1 << position
+    return mask
+
+
+class MinuteCounter:
+    """Counters for every minute of a window stored bit-sliced, plane i holds bit i of all the counters, so adding a
+    set of minutes is a handful of operations on big integers instead of one addition per minute"""
+
+    def __init__(self, minutes: int):
+        self.minutes = minutes
+        self.planes: List[int] = []
+
+    def add(self, mask: int, weight: int = 1):
+        plane = 0
+        while weight:
+            if weight & 1:
+                self._add_at(mask, plane)
+            weight >>= 1
+            plane += 1
+
+    def _add_at(self, carry: int, plane: int):
+        while carry:
+            while plane >= len(self.planes):
+                self.planes.append(0)
+            current = self.planes[plane]
+            self.planes[plane] = current ^ carry
+            carry &= current
+            plane += 1
+
+    def counts(self) -> List[int]:
+        counts = [0] * self.minutes
+        for index, plane in enumerate(self.planes):
+            value = 1 << index
+            # Least significant bit first, so the position in the string is the minute
+            bits = format(plane, f'0{self.minutes}b')[::-1]
+            minute = bits.find('1')
+            while minute != -1:
+                counts[minute] += value
+                minute = bits.find('1', minute + 1)
+        return counts
+
+
+class Forecast:
+    """Starts per minute of all the jobs of a server over a window"""
+
+    def __init__(self, start: datetime, minutes: int):
+        self.start = start.replace(second=0, microsecond=0)
+        self.minutes = minutes
+        self.jobs = 0
+        self.paused = 0
+        self.invalid: List[Tuple[Dict[str, Any], str]] = []
+        # Jobs sharing an expression, type and time zone are expanded once
+        self.schedules: Dict[ScheduleKey, Tuple[int, int]] = {}
+        self.job_counts: Dict[ScheduleKey, int] = {}
+        self.errors: Dict[ScheduleKey, str] = {}
+        self._counts: Optional[List[int]] = None
+
+    def add_jobs(self, jobs: Iterable[Dict[str, Any]], include_paused: bool = False):
+        for job in jobs:
+            if job.get('paused') and not include_paused:
+                self.paused += 1
+                continue
+
+            key = ScheduleKey(job.get('schedule') or '', job.get('cronType'), job.get('timeZone') or 'UTC')
+            if key not in self.job_counts and key not in self.errors:
+                self._expand(key)
+
+            if key in self.errors:
+                self.invalid.append((job, self.errors[key]))
+                continue
+
+            self.job_counts[key] += 1
+            self.jobs += 1
+            self._counts = None
+
+    def _expand(self, key: ScheduleKey):
+        import pytz
+
+        try:
+            schedule = compile_cron(key.expression, key.cron_type)
+            mask = minute_mask(schedule, key.timezone, self.start, self.minutes)
+        except CronSyntaxError as err:
+            self.errors[key] = str(err)
+            return
+        except pytz.UnknownTimeZoneError:
+            self.errors[key] = f"unknown time zone '{key.timezone}'"
+            return
+
+        self.schedules[key] = (mask, schedule.fires_per_minute)
+        self.job_counts[key] = 0
+
+    def counts(self) -> List[int]:
+        if self._counts is None:
+            counter = MinuteCounter(self.minutes)
+            for key, (mask, fires) in self.schedules.items():
+                counter.add(mask, fires * self.job_counts[key])
+            self._counts = counter.counts()
+        return self._counts
+
+    def time(self, minute: int) -> datetime:
+        return self.start + timedelta(minutes=minute)
+
+    def histogram(self) -> Dict[int, int]:
+        """Number of minutes of the window with every number of concurrent starts"""
+        histogram: Dict[int, int] = {}
+        for starts in self.counts():
+            histogram[starts] = histogram.get(starts, 0) + 1
+        return dict(sorted(histogram.items()))
+
+    def hotspots(self, top: int = 10, contributors: int = 3) -> List[Hotspot]:
+        counts = self.counts()
+        minutes = sorted((minute for minute in range(self.minutes) if counts[minute]),
+                         key=lambda minute: (-counts[minute], minute))[:top]
+
+        hotspots = []
+        for minute in minutes:
+            found = [(key, fires * self.job_counts[key]) for key, (mask, fires) in self.schedules.items()
+                     if (mask >> minute) & 1]
+            found.sort(key=lambda item: -item[1])
+            hotspots.append(Hotspot(minute, counts[minute], found[:contributors]))
+        return hotspots
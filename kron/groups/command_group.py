@@ -1,12 +1,15 @@
 from typing import Union, Tuple, Dict, Optional, TextIO, Any
 
 import click
-from terminaltables import AsciiTable, SingleTable
 
-from .. import util
+from .. import util, output, completion
 from ..kronbute import GroupsServer
 
 
+LIST_FIELDS = ['id', 'name', 'variables']
+VIEW_FIELDS = ['id', 'name', 'environment']
+
+
 @click.group(help='Environment group commands')
 @click.pass_context
 def group(ctx):
@@ -16,6 +19,12 @@ def group(ctx):
 @group.command('list', help='List all environment groups')
 @click.pass_obj
 def list_groups(server: GroupsServer):
+    if not output.is_table():
+        output.write_records(server.list(), LIST_FIELDS)
+        return
+
+    from terminaltables import AsciiTable
+
     data = [['Id', 'Name', 'Variables']]
     for group in server.list():
         data.append([group['id'], group['name'], group['variables']])
@@ -36,10 +45,15 @@ def create(server: GroupsServer, name: str, environment: Union[Tuple[str], Dict[
 
 
 @group.command(help='View details of environment group')
-@click.argument('group_id', type=util.INT_ALIAS, required=True)
+@click.argument('group_id', type=util.INT_ALIAS, required=True, autocompletion=completion.complete_groups)
 @click.pass_obj
 def view(server: GroupsServer, group_id: Union[str, int]):
     group = server.view(group_id)
+    if not output.is_table():
+        output.write_record(group, VIEW_FIELDS)
+        return
+
+    from terminaltables import SingleTable
 
     data = [
         ['Id', group['id']],
@@ -58,7 +72,7 @@ def view(server: GroupsServer, group_id: Union[str, int]):
 
 
 @group.command(help='Edit an existing environment group')
-@click.argument('group_id', type=util.INT_ALIAS, required=True)
+@click.argument('group_id', type=util.INT_ALIAS, required=True, autocompletion=completion.complete_groups)
 @click.option('--name', type=str, help='Name for the environment group, it must not previously exist')
 @click.option('--environment', '-e', help='Environment variable in form key=value', multiple=True)
 @click.option('--env-file', help='env file with environment variables to set', type=click.File('r'))
@@ -75,7 +89,7 @@ def edit(server: GroupsServer, group_id: Union[str, int], name: Optional[str],
 
 
 @group.command(help='Delete an existing environment group')
-@click.argument('group_id', type=util.INT_ALIAS, required=True)
+@click.argument('group_id', type=util.INT_ALIAS, required=True, autocompletion=completion.complete_groups)
 @click.pass_obj
 def delete(server: GroupsServer, group_id: Union[str, int]):
     if click.confirm(f"Do you really want to delete environment group {group_id}?"):
@@ -1,6 +1,4 @@
 import click
-from pyfiglet import Figlet
-from terminaltables import SingleTable
 
 from ..kronbute import BaseServer
 
@@ -10,6 +8,9 @@ __version__ = "1.13"
 @click.command(help='Show information about Kron and Kronbute')
 @click.pass_obj
 def info(server: BaseServer):
+    from pyfiglet import Figlet
+    from terminaltables import SingleTable
+
     name = Figlet(font='slant')
     click.echo(click.style(name.renderText('Kron'), fg='white', bold=True))
 
@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Dict, Any, Optional, List
+
+import click
+from terminaltables import AsciiTable
+
+from .. import util, manifest
+from ..kronbute import JobServer, ServerError, NotFoundError, ArgumentValidationError, AliasAlreadyExistsError, \
+    ConflictError, AmbiguousAliasError
+from .plan import FIELD_NAMES, plan_jobs, read_job_entries
+
+
+def apply_job(server: JobServer, data: Dict[str, Any], current: Optional[Dict[str, Any]]) -> str:
+    if current is None:
+        job_id = server.create(data['name'], data['image'], data['tag'], data['schedule'], data['environment'],
+                               data['entryPoint'], data['alias'], data['groups'], data['timeZone'], data['cronType'])
+        return f'created with id {job_id}'
+
+    edited = server.edit(current['id'], data['name'], data['image'], data['tag'], data['schedule'], data['alias'],
+                         data['environment'], data['entryPoint'], data['groups'], data['timeZone'],
+                         data['cronType'], current_job=current)
+    return 'updated' if edited else 'unchanged'
+
+
+@click.command(help='Create or update jobs from directories, globs or snapshots of YAML manifests')
+@click.argument('paths', nargs=-1, required=True)
+@click.option('--workers', help='Number of concurrent requests to the server', default=8,
+              type=click.IntRange(min=1))
+@click.option('--dry-run', help='Only report what would change', is_flag=True)
+@click.pass_context
+def apply(ctx, paths: Tuple[str], workers: int, dry_run: bool):
+    server: JobServer = ctx.obj
+
+    entries = read_job_entries(paths, manifest.current_cache())
+    if not entries:
+        raise click.UsageError('No job manifests found')
+
+    report: List[List[str]] = []
+    pending = []
+    for item in plan_jobs(server, entries, workers):
+        if item.action == 'invalid':
+            report.append([item.source, '', click.style('invalid', fg='red'), item.problem])
+        elif item.action == 'unchanged':
+            report.append([item.source, item.name, 'unchanged', ''])
+        else:
+            detail = ', '.join(sorted({FIELD_NAMES[field] for field in item.changes}))
+            pending.append((item.source, item.data, item.current, item.action, detail))
+
+    def run(item) -> List[str]:
+        path, data, current, action, detail = item
+        name = data['alias'] or data['name']
+        if dry_run:
+            return [path, name, action, detail]
+        try:
+            detail = apply_job(server, data, current)
+            # The server already had the manifest, the plan was made from an outdated listing
+            if detail == 'unchanged':
+                return [path, name, 'unchanged', '']
+            return [path, name, click.style(action, fg='green'), detail]
+        except (ServerError, NotFoundError, ArgumentValidationError, AliasAlreadyExistsError, ConflictError,
+                AmbiguousAliasError) as ex:
+            # The job changed since it was planned, the other manifests are still applied
+            if isinstance(ex, ConflictError):
+                message = 'modified by someone else, try again'
+            elif isinstance(ex, AmbiguousAliasError):
+                message = f"alias '{ex.query}' is used by jobs {', '.join(str(job_id) for job_id in ex.ids)}"
+            else:
+                message = getattr(ex, 'message', None) or getattr(ex, 'body', None) or type(ex).__name__
+            return [path, name, click.style('failed', fg='red'), message]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        report.extend(executor.map(run, pending))
+    report.sort(key=lambda row: row[0])
+
+    table = AsciiTable([['File', 'Job', 'Action', 'Details']] + report)
+    click.echo(table.table)
+
+    actions = [click.unstyle(row[2]) for row in report]
+    failed = actions.count('failed') + actions.count('invalid')
+    summary = f"{len(report)} manifests: {actions.count('create')} created, {actions.count('update')} updated, " \
+              f"{actions.count('unchanged')} unchanged, {failed} failed"
+    if dry_run:
+        summary = f"{summary} (dry run)"
+
+    if failed:
+        click.secho(f'\n[ERROR] {summary}', err=True, fg='red')
+        ctx.exit(1)
+
+    click.echo(util.success(summary))
@@ -0,0 +1,174 @@
+import fnmatch
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Dict, Any, Optional, List, NamedTuple, Union, Callable, Pattern
+
+import click
+
+from .. import util, output, completion
+from ..kronbute import JobServer, JobIndex, ServerError, NotFoundError, ConflictError
+from ..kronbute.errors import JobAlreadyPausedError, JobIsNotPausedError
+
+RESULT_FIELDS = ['id', 'job', 'result', 'message']
+STATUSES = ['paused', 'active', 'success', 'failed', 'running']
+SERVER_ERRORS = (ServerError, NotFoundError, JobAlreadyPausedError, JobIsNotPausedError, ConflictError)
+
+# Names shown in the confirmation before the rest are counted
+CONFIRM_NAMES = 10
+
+
+class JobSelector(NamedTuple):
+    groups: Tuple[str, ...]
+    image: Optional[str]
+    status: Optional[str]
+    name: Optional[Pattern]
+
+    def empty(self) -> bool:
+        return not self.groups and self.image is None and self.status is None and self.name is None
+
+    def matches(self, job: Dict[str, Any]) -> bool:
+        """Every given selector has to match, groups match when the job has any of them"""
+        if self.groups and not set(self.groups).intersection(job.get('groups') or []):
+            return False
+        if self.image is not None and not (fnmatch.fnmatchcase(job.get('image') or '', self.image) or
+                                           fnmatch.fnmatchcase(f"{job.get('image')}:{job.get('tag')}", self.image)):
+            return False
+        if self.status == 'paused' and not job.get('paused'):
+            return False
+        if self.status == 'active' and job.get('paused'):
+            return False
+        if self.status in ('success', 'failed', 'running') and str(job.get('lastStatus')).lower() != self.status:
+            return False
+        if self.name is not None and not (self.name.search(job.get('name') or '') or
+                                          self.name.search(job.get('alias') or '')):
+            return False
+        return True
+
+
+def _name_pattern(ctx, param, value: Optional[str]) -> Optional[Pattern]:
+    if value is None:
+        return None
+    try:
+        return re.compile(value)
+    except re.error as err:
+        raise click.BadParameter(f"'{value}' is not a regular expression, {err}")
+
+
+def selection_options(function: Callable) -> Callable:
+    """Job ids or aliases and the selectors matched against a single listing, shared by the batch commands"""
+    decorators = [
+        click.argument('job_ids', type=util.INT_ALIAS, nargs=-1, autocompletion=completion.complete_jobs),
+        click.option('--group', 'groups', multiple=True, help='Select the jobs using this group, can be repeated',
+                     autocompletion=completion.complete_group_names),
+        click.option('--image', help='Select the jobs with this image, image:tag or glob such as "team/*"'),
+        click.option('--status', type=click.Choice(STATUSES),
+                     help='Select paused or active jobs, or the jobs whose last run had this status'),
+        click.option('--name', 'name_pattern', callback=_name_pattern,
+                     help='Select the jobs whose name or alias matches this regular expression'),
+        click.option('--yes', '-y', is_flag=True, help='Do not ask for confirmation'),
+        click.option('--workers', help='Number of concurrent requests to the server', default=8,
+                     type=click.IntRange(min=1)),
+    ]
+    for decorator in reversed(decorators):
+        function = decorator(function)
+    return function
+
+
+def select_jobs(server: JobServer, job_ids: Tuple[Union[int, str], ...],
+                selector: JobSelector) -> Tuple[List[Dict[str, Any]], Dict[Union[int, str], str]]:
+    """Jobs given by id or alias plus the ones matched by the selectors, in listing order, and why the ids or
+    aliases that cannot be used were left out"""
+    jobs = server.list()
+    index = JobIndex.from_jobs(jobs)
+
+    wanted = set()
+    unknown: Dict[Union[int, str], str] = {}
+    for job_id in job_ids:
+        found = index.find(job_id)
+        if len(found) == 1:
+            wanted.add(found[0].id)
+        elif found:
+            unknown[job_id] = f"alias used by {', '.join(str(entry.id) for entry in found)}, use the id instead"
+        else:
+            unknown[job_id] = 'not found'
+
+    if not selector.empty():
+        wanted.update(job['id'] for job in jobs if selector.matches(job))
+
+    return [job for job in jobs if job['id'] in wanted], unknown
+
+
+def single_job(job_ids: Tuple[Union[int, str], ...], selector: JobSelector) -> Optional[Union[int, str]]:
+    """The job id or alias when a single job is given without selectors, which needs no listing"""
+    if not job_ids and selector.empty():
+        raise click.UsageError('Give the jobs by id or alias, or select them with --group, --image, --status or '
+                               '--name')
+    return job_ids[0] if len(job_ids) == 1 and selector.empty() else None
+
+
+def _message(ex: Exception) -> str:
+    if isinstance(ex, NotFoundError):
+        return 'not found'
+    if isinstance(ex, JobAlreadyPausedError):
+        return 'already paused'
+    if isinstance(ex, JobIsNotPausedError):
+        return 'not paused'
+    return getattr(ex, 'message', None) or getattr(ex, 'body', None) or str(ex) or type(ex).__name__
+
+
+def _job_name(job: Dict[str, Any]) -> str:
+    return job.get('alias') or job.get('name') or str(job['id'])
+
+
+def run_batch(ctx, server: JobServer, job_ids: Tuple[Union[int, str], ...], selector: JobSelector, yes: bool,
+              workers: int, question: str, done: str, action: Callable[[Union[int, str]], None],
+              skip: Optional[Callable[[Dict[str, Any]], Optional[str]]] = None):
+    """Runs an action on every selected job concurrently after a single confirmation and reports the result of
+    each one, jobs for which skip gives a reason are reported without any request"""
+    jobs, unknown = select_jobs(server, job_ids, selector)
+    if not jobs and not unknown:
+        click.secho('\n[ERROR] No jobs match the selection', err=True, fg='red')
+        ctx.exit(1)
+
+    names = [_job_name(job) for job in jobs]
+    if jobs:
+        shown = ', '.join(names[:CONFIRM_NAMES]) + (f' and {len(names) - CONFIRM_NAMES} more'
+                                                    if len(names) > CONFIRM_NAMES else '')
+        count = f'{len(jobs)} job' if len(jobs) == 1 else f'{len(jobs)} jobs'
+        if not yes and not click.confirm(f'Do you really want to {question} {count} ({shown})?', err=True):
+            return
+
+    def execute(job: Dict[str, Any]) -> Dict[str, Any]:
+        record = {'id': job['id'], 'job': _job_name(job), 'result': done, 'message': ''}
+        reason = skip(job) if skip else None
+        if reason is not None:
+            return {**record, 'result': 'skipped', 'message': reason}
+        try:
+            action(job['id'])
+        except SERVER_ERRORS as ex:
+            return {**record, 'result': 'failed', 'message': _message(ex)}
+        return record
+
+    results = [{'id': job_id, 'job': str(job_id), 'result': 'failed', 'message': message}
+               for job_id, message in unknown.items()]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results.extend(executor.map(execute, jobs))
+
+    if not output.is_table():
+        output.write_records(results, RESULT_FIELDS)
+    else:
+        from terminaltables import AsciiTable
+
+        colors = {done: 'green', 'failed': 'red'}
+        rows = [[str(result['id']), result['job'], click.style(result['result'], fg=colors.get(result['result'])),
+                 result['message']] for result in results]
+        click.echo(AsciiTable([['Id', 'Job', 'Result', 'Details']] + rows).table)
+
+    outcomes = [result['result'] for result in results]
+    summary = f"{len(results)} jobs: {outcomes.count(done)} {done}, {outcomes.count('skipped')} skipped, " \
+              f"{outcomes.count('failed')} failed"
+    if outcomes.count('failed'):
+        click.secho(f'\n[ERROR] {summary}', err=True, fg='red')
+        ctx.exit(1)
+
+    click.echo(util.success(summary), err=not output.is_table())
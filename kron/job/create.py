@@ -2,7 +2,7 @@ from typing import Union, Tuple, Dict, TextIO, Optional, List
 
 import click
 
-from .. import util
+from .. import util, completion
 from ..kronbute import JobServer
 
 
@@ -17,14 +17,14 @@ from ..kronbute import JobServer
 @click.option('--schedule', help='Cron schedule for the job, in UNIX cron format', required=True, type=util.CRON,
               cls=util.CanBeImported)
 @click.option('--timezone', help='TimeZone to run the job, default is UTC', default='UTC', cls=util.CanBeImported,
-              type=util.TIMEZONE)
+              type=util.TIMEZONE, autocompletion=completion.complete_timezones)
 @click.option('--crontype', help='The crontype of the schedule for the job, default is UNIXCRON', default=util.CRONTYPE.default,
               cls=util.CanBeImported, type=util.CRONTYPE)
 @click.option('--entrypoint', help='Entrypoint for the docker command', required=False, cls=util.CanBeImported)
 @click.option('--environment', '-e', help='Environment variable to set in form key=value', multiple=True,
               cls=util.CanBeImported)
 @click.option('--group', '-g', help='Environment group for the job', type=str,
-              multiple=True, cls=util.can_be_imported('groups'))
+              multiple=True, cls=util.can_be_imported('groups'), autocompletion=completion.complete_group_names)
 @click.option('--env-file', help='env file with environment variables to set', type=click.File('r'))
 @click.option('--alias', help='Optional alias for the job', type=util.ALIAS, cls=util.CanBeImported)
 @click.pass_obj
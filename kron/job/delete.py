@@ -1,15 +1,26 @@
-from typing import Union
+from typing import Union, Tuple, Optional, Pattern
 
 import click
+from . import batch
 from .. import util
 from ..kronbute import JobServer
 
 
-@click.command(help='Delete a job in the server, this operation has no undo.')
-@click.argument('job_id', type=util.INT_ALIAS, required=True)
-@click.pass_obj
-def delete(server: JobServer, job_id: Union[int, str]):
-    if click.confirm(f"Do you really want to delete job {job_id}?"):
-        server.delete(job_id)
-        message = click.style(f'{job_id}', fg='white', bold=True)
-        click.echo(util.success(f"Job {message} was deleted."))
+@click.command(help='Delete jobs given by id or alias, or selected by group, image, status or name, this operation '
+                    'has no undo.')
+@batch.selection_options
+@click.pass_context
+def delete(ctx, job_ids: Tuple[Union[int, str]], groups: Tuple[str], image: Optional[str], status: Optional[str],
+           name_pattern: Optional[Pattern], yes: bool, workers: int):
+    server: JobServer = ctx.obj
+    selector = batch.JobSelector(groups, image, status, name_pattern)
+
+    job_id = batch.single_job(job_ids, selector)
+    if job_id is not None:
+        if yes or click.confirm(f"Do you really want to delete job {job_id}?"):
+            server.delete(job_id)
+            message = click.style(f'{job_id}', fg='white', bold=True)
+            click.echo(util.success(f"Job {message} was deleted."))
+        return
+
+    batch.run_batch(ctx, server, job_ids, selector, yes, workers, 'delete', 'deleted', server.delete)
@@ -1,12 +1,12 @@
 from typing import Union, Tuple, TextIO, Optional
 
 import click
-from .. import util
+from .. import util, completion
 from ..kronbute import JobServer
 
 
 @click.command(help="Edit a job with a given job id")
-@click.argument('job_id', type=util.INT_ALIAS, required=True)
+@click.argument('job_id', type=util.INT_ALIAS, required=True, autocompletion=completion.complete_jobs)
 @click.option('--import', help='Import file for job', cls=util.SetImportFile, type=click.Path(exists=True),
               expose_value=False)
 @click.option('--name', help='Name or description for the job', cls=util.CanBeImported)
@@ -19,11 +19,11 @@ from ..kronbute import JobServer
 @click.option('--crontype', help='The crontype of the schedule for the job, default is UNIXCRON', default=util.CRONTYPE.default,
               cls=util.CanBeImported, type=util.CRONTYPE)
 @click.option('--timezone', help='TimeZone to run the job, default is UTC', default='UTC', cls=util.CanBeImported,
-              type=util.TIMEZONE)
+              type=util.TIMEZONE, autocompletion=completion.complete_timezones)
 @click.option('--environment', '-e', help='Environment variable to set in form key=value', multiple=True,
               cls=util.CanBeImported)
 @click.option('--group', '-g', help='Environment group for the job', type=str, multiple=True,
-              cls=util.can_be_imported('groups'))
+              cls=util.can_be_imported('groups'), autocompletion=completion.complete_group_names)
 @click.option('--env-file', help='env file with environment variables to set', type=click.File('r'))
 @click.option('--entrypoint', help='Entrypoint for the docker command',
               cls=util.CanBeImported)
@@ -36,7 +36,7 @@ def edit(server: JobServer, job_id: Union[int, str], name: str, image: str, tag:
     if not util.at_least_one(name, image, tag, schedule, environment, env_file, entrypoint, alias, group, timezone):
         raise util.AtLeastOneParameterError()
 
-    server.edit(job_id, name, image, tag, schedule, alias, util.parse_env(environment, env_file),
-                entrypoint, group, timezone, crontype)
+    edited = server.edit(job_id, name, image, tag, schedule, alias, util.parse_env(environment, env_file),
+                         entrypoint, group, timezone, crontype)
     message = click.style(f'{job_id}', fg='white', bold=True)
-    click.echo(util.success(f"Job with id {message} edited."))
+    click.echo(util.success(f"Job with id {message} {'edited' if edited else 'unchanged, nothing was sent'}."))
@@ -1,20 +1,38 @@
+from datetime import timezone as tz
 from typing import Union
 
 import click
-import requests
 
-from kron.kronbute import NotFoundError, ServerError
-from .. import util
+from .. import util, completion
+from ..cron import compile_cron, CronSyntaxError
 from ..kronbute import JobServer
 
 
-@click.command(help="Edit a job with a given job id")
-@click.argument('job_id', type=util.INT_ALIAS, required=True)
+@click.command(help="Explain the schedule of a job with a given job id")
+@click.argument('job_id', type=util.INT_ALIAS, required=True, autocompletion=completion.complete_jobs)
+@click.option('--local', is_flag=True, default=False,
+              help='Compute the next fire times in kron instead of asking the server')
+@click.option('--count', type=click.IntRange(1, 1000), default=5, show_default=True,
+              help='Number of fire times to show with --local')
 @click.pass_obj
-def explain(server: JobServer, job_id: Union[str, int]):
-    reason = requests.get(f'{server.server.url}/api/jobs/{job_id}/explain')
-    if reason.status_code == 400:
-        raise NotFoundError(job_id)
-    if reason.status_code != 200:
-        raise ServerError("Problem with the server", reason.status_code, reason.text)
-    click.echo(reason.text)
+def explain(server: JobServer, job_id: Union[str, int], local: bool, count: int):
+    if not local:
+        click.echo(server.explain(job_id))
+        return
+
+    job = server.view(job_id)
+    timezone = job.get('timeZone') or 'UTC'
+    try:
+        schedule = compile_cron(job['schedule'], job.get('cronType'))
+    except CronSyntaxError as err:
+        raise click.ClickException(f"Job schedule '{job['schedule']}' cannot be evaluated: {err}")
+
+    fire_times = schedule.next_times(count, timezone=timezone)
+    if not fire_times:
+        click.echo(f"'{job['schedule']}' never fires again")
+        return
+
+    click.echo(f"Next {len(fire_times)} fire times of '{job['schedule']}' ({timezone})")
+    for fire_time in fire_times:
+        utc = fire_time.astimezone(tz.utc)
+        click.echo(f"  {fire_time:%Y-%m-%d %H:%M:%S %Z}  ({utc:%Y-%m-%d %H:%M:%S} UTC)")
@@ -1,32 +1,18 @@
-from typing import Union
+from typing import Union, Tuple
 
 import click
-import yaml
 
-from .. import util
+from .. import util, manifest, completion
 from ..kronbute import JobServer
 
 
-@click.command(help="Export a job as a YAML file")
-@click.argument('job_id', type=util.INT_ALIAS, required=True)
+@click.command(help="Export jobs as YAML, many jobs are written as one document each")
+@click.argument('job_ids', type=util.INT_ALIAS, nargs=-1, required=True,
+                autocompletion=completion.complete_jobs)
 @click.pass_obj
-def export(server: JobServer, job_id: Union[str, int]):
-    current_job = server.view(job_id)
-    data = {
-        'name': current_job['name'],
-        'image': f"{current_job['image']}:{current_job['tag']}",
-        'schedule': current_job['schedule'],
-        'timezone': current_job['timeZone']
-    }
-    if 'alias' in current_job:
-        data['alias'] = current_job['alias']
-    if 'entryPoint' in current_job and current_job['entryPoint']:
-        data['entrypoint'] = current_job['entryPoint']
+def export(server: JobServer, job_ids: Tuple[Union[str, int]]):
+    if len(job_ids) == 1:
+        click.echo(manifest.dump(manifest.from_job(server.view(job_ids[0]))))
+        return
 
-    if 'environment' in current_job:
-        data['environment'] = current_job['environment']
-
-    if 'groups' in current_job:
-        data['groups'] = current_job['groups']
-
-    click.echo(yaml.dump(data, default_flow_style=False))
+    click.echo(manifest.dump_all(manifest.from_job(server.view(job_id)) for job_id in job_ids), nl=False)
@@ -1,14 +1,22 @@
 import click
 from terminaltables import AsciiTable
 
-from .. import util
+from .. import util, output
 from ..kronbute import JobServer
 
 
+LIST_FIELDS = ['id', 'alias', 'name', 'scheduleText', 'cronType', 'lastStatus', 'lastRun', 'nextRun', 'timeZone',
+               'paused']
+
+
 @click.command('list', help='List all the jobs in the server')
 @click.pass_obj
 def list_jobs(server: JobServer):
     jobs = server.list()
+    if not output.is_table():
+        output.write_records(jobs, LIST_FIELDS)
+        return
+
     data = [['Id', 'Alias', 'Name/Description', 'Schedule', 'Cron Type', 'Last Status', 'Last run', 'Next run', 'Time Zone', 'Paused']]
     for job in jobs:
         data.append(
@@ -1,14 +1,24 @@
-from typing import Union
+from typing import Union, Tuple, Optional, Pattern
 
 import click
 
-from .. import util
+from . import batch
 from ..kronbute import JobServer
 
-@click.command('pause', help='Pause a job')
-@click.argument('job_id', type=util.INT_ALIAS, required=True)
-@click.pass_obj
-def pause(server: JobServer, job_id: Union[int, str]):
-    if click.confirm(f"Do you really want to pause automatic execution of the job {job_id}?"):
-        server.pause(job_id)
-        click.secho(f"Job {job_id} was paused for automatic execution", fg='white')
\ No newline at end of file
+@click.command('pause', help='Pause jobs given by id or alias, or selected by group, image, status or name')
+@batch.selection_options
+@click.pass_context
+def pause(ctx, job_ids: Tuple[Union[int, str]], groups: Tuple[str], image: Optional[str], status: Optional[str],
+          name_pattern: Optional[Pattern], yes: bool, workers: int):
+    server: JobServer = ctx.obj
+    selector = batch.JobSelector(groups, image, status, name_pattern)
+
+    job_id = batch.single_job(job_ids, selector)
+    if job_id is not None:
+        if yes or click.confirm(f"Do you really want to pause automatic execution of the job {job_id}?"):
+            server.pause(job_id)
+            click.secho(f"Job {job_id} was paused for automatic execution", fg='white')
+        return
+
+    batch.run_batch(ctx, server, job_ids, selector, yes, workers, 'pause automatic execution of', 'paused',
+                    server.pause, skip=lambda job: 'already paused' if job.get('paused') else None)
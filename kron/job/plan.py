@@ -0,0 +1,200 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Dict, Any, Optional, List, NamedTuple, Iterable
+
+import click
+
+from .. import util, output, manifest
+from ..kronbute import JobServer, JobIndex
+from ..kronbute.job_server import EDIT_FIELDS, edit_data
+from ..snapshot.archive import SnapshotEntry, read_snapshot
+
+PLAN_FIELDS = ['source', 'job', 'id', 'action', 'changes']
+
+# Manifest names of the job fields, image and tag are a single manifest field
+FIELD_NAMES = {'name': 'name', 'alias': 'alias', 'image': 'image', 'tag': 'image', 'schedule': 'schedule',
+               'cronType': 'crontype', 'timeZone': 'timezone', 'entryPoint': 'entrypoint', 'groups': 'groups',
+               'environment': 'environment'}
+
+SYMBOLS = {'create': ('+', 'green'), 'update': ('~', 'yellow'), 'delete': ('-', 'red')}
+
+
+class JobPlan(NamedTuple):
+    source: str
+    data: Optional[Dict[str, Any]]
+    current: Optional[Dict[str, Any]]
+    changes: Dict[str, Tuple[Any, Any]]
+    problem: Optional[str] = None
+
+    @property
+    def action(self) -> str:
+        if self.problem is not None:
+            return 'invalid'
+        if self.current is None:
+            return 'create'
+        return 'update' if self.changes else 'unchanged'
+
+    @property
+    def name(self) -> str:
+        return (self.data['alias'] or self.data['name']) if self.data else ''
+
+
+def read_entries(paths: Iterable[str], cache: Optional[manifest.ManifestCache] = None) -> List[SnapshotEntry]:
+    """Manifests in directories, globs, multi-document files or snapshots made with kron export"""
+    return [entry for path in paths for entry in read_snapshot(path, cache)]
+
+
+def read_job_entries(paths: Iterable[str], cache: Optional[manifest.ManifestCache] = None) -> List[SnapshotEntry]:
+    """Job manifests read by kron job plan and kron job apply, group manifests are left to kron import"""
+    return [entry for entry in read_entries(paths, cache) if entry.data is None or manifest.kind(entry.data) != 'group']
+
+
+def desired_job(data: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Job the server ends up with, edits keep the current value of the fields left empty in the manifest"""
+    return edit_data(current, data['name'], data['image'], data['tag'], data['schedule'], data['alias'],
+                     data['environment'], data['entryPoint'], data['groups'], data['timeZone'], data['cronType'])
+
+
+def plan_jobs(server: JobServer, entries: List[SnapshotEntry], workers: int = 8) -> List[JobPlan]:
+    """Compares manifests with the server with a single listing, only the matched jobs the listing leaves details
+    out of are fetched again, concurrently"""
+    jobs = server.list()
+    by_id = {str(job['id']): job for job in jobs}
+    index = JobIndex.from_jobs(jobs)
+
+    plans: List[JobPlan] = []
+    matched: List[Tuple[SnapshotEntry, Dict[str, Any], Optional[Dict[str, Any]]]] = []
+    for entry in entries:
+        if entry.data is None:
+            plans.append(JobPlan(entry.source, None, None, {}, entry.problems[0]))
+            continue
+        try:
+            data = manifest.to_job(entry.source, entry.data, entry.problems)
+        except manifest.ManifestError as ex:
+            plans.append(JobPlan(entry.source, None, None, {}, ex.message))
+            continue
+        # Same matching as manifest.find_job, by alias when the manifest has one, otherwise by name
+        key, found = ('alias', index.aliased(data['alias'])) if data['alias'] else ('name', index.named(data['name']))
+        if len(found) > 1:
+            ids = ', '.join(str(item.id) for item in found)
+            plans.append(JobPlan(entry.source, data, None, {}, f"{key} '{data[key]}' is used by jobs {ids}"))
+            continue
+        matched.append((entry, data, by_id[str(found[0].id)] if found else None))
+
+    incomplete = {current['id'] for _, _, current in matched
+                  if current is not None and not EDIT_FIELDS.issubset(current)}
+    complete: Dict[Any, Dict[str, Any]] = {}
+    if incomplete:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            complete = dict(zip(incomplete, executor.map(server.view, incomplete)))
+
+    for entry, data, current in matched:
+        if current is None:
+            plans.append(JobPlan(entry.source, data, None, {}))
+            continue
+        current = complete.get(current['id'], current)
+        plans.append(JobPlan(entry.source, data, current, manifest.job_changes(desired_job(data, current), current)))
+
+    return plans
+
+
+def _value(value: Any) -> str:
+    return json.dumps(value) if value is not None else 'null'
+
+
+def _image(job: Dict[str, Any]) -> str:
+    return f"{job['image']}:{job['tag']}"
+
+
+def _line(symbol: str, text: str, indent: int) -> str:
+    return ' ' * indent + click.style(SYMBOLS[symbol][0], fg=SYMBOLS[symbol][1]) + f' {text}'
+
+
+def _environment_lines(old: Dict[str, Any], new: Dict[str, Any], indent: int) -> List[str]:
+    lines = []
+    for key in sorted(set(old) | set(new)):
+        if key not in old:
+            lines.append(_line('create', f'{key} = {_value(str(new[key]))}', indent))
+        elif key not in new:
+            lines.append(_line('delete', f'{key} = {_value(str(old[key]))}', indent))
+        elif str(old[key]) != str(new[key]):
+            lines.append(_line('update', f'{key} = {_value(str(old[key]))} -> {_value(str(new[key]))}', indent))
+    return lines
+
+
+def describe(plan: JobPlan) -> List[str]:
+    """Terraform like description of a create or an update, one line per changed field"""
+    if plan.action == 'create':
+        data = plan.data
+        lines = [_line('create', f'job {plan.name} ({plan.source})', 2)]
+        fields = [('name', data['name']), ('alias', data['alias']), ('image', _image(data)),
+                  ('schedule', data['schedule']), ('crontype', data['cronType']), ('timezone', data['timeZone']),
+                  ('entrypoint', data['entryPoint']), ('groups', data['groups'])]
+        lines.extend(_line('create', f'{field:<12} = {_value(value)}', 6) for field, value in fields if value)
+        if data['environment']:
+            lines.append(_line('create', 'environment', 6))
+            lines.extend(_environment_lines({}, data['environment'], 10))
+        return lines
+
+    current, changes = plan.current, plan.changes
+    lines = [_line('update', f"job {plan.name} (id {current['id']}, {plan.source})", 2)]
+    for field in sorted({FIELD_NAMES[field] for field in changes}):
+        if field == 'image':
+            desired = {**current, **{key: new for key, (_, new) in changes.items()}}
+            lines.append(_line('update', f'{field:<12} = {_value(_image(current))} -> {_value(_image(desired))}', 6))
+        elif field == 'environment':
+            old, new = changes['environment']
+            lines.append(_line('update', 'environment', 6))
+            lines.extend(_environment_lines(old or {}, new, 10))
+        else:
+            key = next(key for key, name in FIELD_NAMES.items() if name == field)
+            old, new = changes[key]
+            lines.append(_line('update', f'{field:<12} = {_value(old)} -> {_value(new)}', 6))
+    return lines
+
+
+def plan_record(plan: JobPlan) -> Dict[str, Any]:
+    changes = {field: [old, new] for field, (old, new) in plan.changes.items()}
+    if plan.problem is not None:
+        changes = {'problem': plan.problem}
+    return {'source': plan.source, 'job': plan.name, 'id': plan.current['id'] if plan.current else None,
+            'action': plan.action, 'changes': changes}
+
+
+@click.command(help='Show what kron job apply would change in the server for directories, globs or snapshots of '
+                    'job manifests, without changing anything')
+@click.argument('paths', nargs=-1, required=True)
+@click.option('--workers', help='Number of concurrent requests to the server', default=8,
+              type=click.IntRange(min=1))
+@click.option('--detailed-exitcode', is_flag=True,
+              help='Exit with 2 when there are changes, 0 when everything is up to date')
+@click.pass_context
+def plan(ctx, paths: Tuple[str], workers: int, detailed_exitcode: bool):
+    server: JobServer = ctx.obj
+
+    entries = read_job_entries(paths, manifest.current_cache())
+    if not entries:
+        raise click.UsageError('No job manifests found')
+
+    plans = sorted(plan_jobs(server, entries, workers), key=lambda item: item.source)
+    actions = [item.action for item in plans]
+
+    if not output.is_table():
+        output.write_records((plan_record(item) for item in plans), PLAN_FIELDS)
+    else:
+        for item in plans:
+            if item.action in ('create', 'update'):
+                click.echo('\n'.join(describe(item)) + '\n')
+
+    invalid = [item for item in plans if item.action == 'invalid']
+    summary = f"Plan: {actions.count('create')} to create, {actions.count('update')} to update, " \
+              f"{actions.count('unchanged')} unchanged"
+    if invalid:
+        for item in invalid:
+            click.secho(f'{item.source}: {item.problem}', err=True, fg='red')
+        click.secho(f'\n[ERROR] {summary}, {len(invalid)} invalid manifests', err=True, fg='red')
+        ctx.exit(1)
+
+    click.echo(util.success(summary), err=not output.is_table())
+    if detailed_exitcode and (actions.count('create') or actions.count('update')):
+        ctx.exit(2)
@@ -1,15 +1,25 @@
-from typing import Union
+from typing import Union, Tuple, Optional, Pattern
 
 import click
 
-from .. import util
+from . import batch
 from ..kronbute import JobServer
 
 
-@click.command('run', help='Immediate execution of job')
-@click.argument('job_id', type=util.INT_ALIAS, required=True)
-@click.pass_obj
-def run(server: JobServer, job_id: Union[int, str]):
-    if click.confirm(f"Do you really want to immediate execute job {job_id}?"):
-        server.run_now(job_id)
-        click.secho(f"Scheduled job {job_id} for immediate execution", fg='white')
+@click.command('run', help='Immediate execution of jobs given by id or alias, or selected by group, image, status or '
+                           'name')
+@batch.selection_options
+@click.pass_context
+def run(ctx, job_ids: Tuple[Union[int, str]], groups: Tuple[str], image: Optional[str], status: Optional[str],
+        name_pattern: Optional[Pattern], yes: bool, workers: int):
+    server: JobServer = ctx.obj
+    selector = batch.JobSelector(groups, image, status, name_pattern)
+
+    job_id = batch.single_job(job_ids, selector)
+    if job_id is not None:
+        if yes or click.confirm(f"Do you really want to immediate execute job {job_id}?"):
+            server.run_now(job_id)
+            click.secho(f"Scheduled job {job_id} for immediate execution", fg='white')
+        return
+
+    batch.run_batch(ctx, server, job_ids, selector, yes, workers, 'immediately execute', 'scheduled', server.run_now)
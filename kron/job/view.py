@@ -3,15 +3,22 @@ from typing import Union
 import click
 from terminaltables import SingleTable
 
-from .. import util
+from .. import util, output, completion
 from ..kronbute import JobServer
 
 
+VIEW_FIELDS = ['id', 'name', 'alias', 'image', 'tag', 'scheduleText', 'timeZone', 'paused', 'schedule', 'cronType',
+               'entryPoint', 'groups', 'createdOn', 'lastStatus', 'statusUpdateOn', 'lastRun', 'nextRun', 'environment']
+
+
 @click.command(help='View information about a job with given id')
-@click.argument('job_id', type=util.INT_ALIAS, required=True)
+@click.argument('job_id', type=util.INT_ALIAS, required=True, autocompletion=completion.complete_jobs)
 @click.pass_obj
 def view(server: JobServer, job_id: Union[int, str]):
     current_job = server.view(job_id)
+    if not output.is_table():
+        output.write_record(current_job, VIEW_FIELDS)
+        return
 
     data = [['Id', current_job['id']], ['Name/Description', current_job['name']],
             ['Alias', util.format_none(current_job['alias'] if 'alias' in current_job else '')],
@@ -0,0 +1,31 @@
+import time
+from typing import Tuple, Union
+
+import click
+
+from .. import util, completion
+from ..kronbute import JobServer
+
+
+@click.command(help='Watch the status of jobs, only the rows that change are redrawn')
+@click.argument('job_ids', type=util.INT_ALIAS, nargs=-1, autocompletion=completion.complete_jobs)
+@click.option('--interval', help='Seconds between checks with the server', default=2.0,
+              type=click.FloatRange(min=0.1))
+@click.pass_obj
+def watch(server: JobServer, job_ids: Tuple[Union[int, str]], interval: float):
+    table = util.LiveTable(['Id', 'Alias', 'Name/Description', 'Last Status', 'Last run', 'Next run', 'Paused'],
+                           [6, 20, 30, 11, 20, 20, 6])
+    wanted = {str(job_id) for job_id in job_ids}
+
+    try:
+        while True:
+            # Conditional requests, nothing is downloaded or redrawn while the listing does not change
+            jobs = server.poll()
+            if jobs is not None:
+                table.update({job['id']: ([job['id'], job.get('alias'), job['name'], job['lastStatus'], job['lastRun'],
+                                           job['nextRun'], job['paused']], {3: util.format_status})
+                              for job in jobs
+                              if not wanted or str(job['id']) in wanted or job.get('alias') in wanted})
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
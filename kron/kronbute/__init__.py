@@ -1,9 +1,18 @@
-from .errors import ServerError, AliasAlreadyExistsError, NotFoundError, ArgumentValidationError
+from .errors import ServerError, AliasAlreadyExistsError, NotFoundError, ArgumentValidationError, ConflictError, \
+    AmbiguousAliasError
+from .cache import ResponseCache, MemoryResponseCache
 from .base_server import BaseServer
+from .index import JobIndex
 from .job_server import JobServer
 from .runs_server import RunsServer
 from .groups_server import GroupsServer
+from .async_base_server import AsyncBaseServer
+from .async_job_server import AsyncJobServer
+from .async_runs_server import AsyncRunsServer
+from .async_groups_server import AsyncGroupsServer
 
 
-__all__ = ['BaseServer', 'JobServer', 'RunsServer', 'GroupsServer',
-           'ServerError', 'NotFoundError', 'AliasAlreadyExistsError', 'ArgumentValidationError']
+__all__ = ['BaseServer', 'ResponseCache', 'MemoryResponseCache', 'JobIndex', 'JobServer', 'RunsServer', 'GroupsServer',
+           'AsyncBaseServer', 'AsyncJobServer', 'AsyncRunsServer', 'AsyncGroupsServer',
+           'ServerError', 'NotFoundError', 'AliasAlreadyExistsError', 'ArgumentValidationError', 'ConflictError',
+           'AmbiguousAliasError']
@@ -0,0 +1,175 @@
+import json
+import urllib.parse
+from typing import Optional, Dict, List, Union, Any, Mapping, AsyncIterator, TYPE_CHECKING
+
+from .base_server import RETRY_STATUSES, IDEMPOTENT_METHODS, UNSUPPORTED_STATUSES, PAGE_ITEMS, PAGE_CURSORS, \
+    check_version, check_list, check_get, check_create, check_edit, check_delete
+
+if TYPE_CHECKING:
+    import aiohttp
+
+
+def _aiohttp():
+    # aiohttp is optional and, as asyncio, slow to import, so both are only loaded once the asyncio client is used
+    try:
+        import aiohttp
+    except ImportError:
+        raise ImportError("The asyncio client requires aiohttp, install it with 'pip install kron[async]'")
+
+    return aiohttp
+
+
+class AsyncResponse:
+    def __init__(self, status_code: int, content: bytes, headers: Mapping[str, str]):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class AsyncBaseServer:
+    """asyncio counterpart of BaseServer, use it as an async context manager so the connection pool gets closed"""
+
+    def __init__(self, url: str, pool_size: int = 100, timeout: Optional[float] = 30.0, retries: int = 3,
+                 backoff: float = 0.3, partial_updates: bool = False):
+        _aiohttp()
+
+        self.url = url
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.partial_updates = partial_updates
+        self.etags: Dict[str, str] = {}
+        self.session: Optional['aiohttp.ClientSession'] = None
+
+    async def __aenter__(self) -> 'AsyncBaseServer':
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def _session(self) -> 'aiohttp.ClientSession':
+        # The session is bound to the running loop, so it cannot be created in __init__
+        if self.session is None or self.session.closed:
+            aiohttp = _aiohttp()
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.pool_size),
+                                                 timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self.session
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
+    async def request(self, method: str, endpoint: str, **kwargs) -> AsyncResponse:
+        import asyncio
+
+        aiohttp = _aiohttp()
+        url = urllib.parse.urljoin(self.url, endpoint)
+        attempts = self.retries + 1 if method in IDEMPOTENT_METHODS else 1
+
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            try:
+                async with self._session().request(method, url, **kwargs) as res:
+                    content = await res.read()
+
+                if res.status not in RETRY_STATUSES or last_attempt:
+                    return AsyncResponse(res.status, content, res.headers)
+
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if last_attempt:
+                    raise
+
+            await asyncio.sleep(self.backoff * (2 ** attempt))
+
+    @property
+    async def version(self) -> str:
+        res = await self.request('GET', 'hello')
+        return check_version(res.status_code, res.text)
+
+    async def list(self, endpoint: str) -> List[Any]:
+        res = await self.request('GET', endpoint)
+        check_list(res.status_code, res.text)
+
+        return res.json()
+
+    async def iterate(self, endpoint: str, params: Optional[Dict[str, Any]] = None,
+                      page_size: int = 500) -> AsyncIterator[Any]:
+        """Iterates over a listing page by page, as BaseServer.iterate, servers answering the whole array at once are
+        read in one go"""
+        params = dict(params or {}, size=page_size)
+        page = 0
+        previous: Optional[List[Any]] = None
+
+        while True:
+            res = await self.request('GET', endpoint, params=dict(params, page=page))
+            check_list(res.status_code, res.text)
+
+            answer = json.loads(res.content or b'[]')
+            if isinstance(answer, list):
+                for item in answer:
+                    yield item
+                return
+
+            items = next((answer[key] for key in PAGE_ITEMS if key in answer), [])
+            if not items:
+                return
+
+            # A server ignoring page and size answers the same full page every time, it already sent everything
+            ids = [item.get('id') if isinstance(item, dict) else item for item in items]
+            if ids == previous:
+                return
+            previous = ids
+
+            for item in items:
+                yield item
+
+            cursor = next((answer[key] for key in PAGE_CURSORS if answer.get(key)), None)
+            if cursor:
+                params['cursor'] = cursor
+            elif answer.get('last', False) or len(items) < page_size:
+                return
+
+            page += 1
+
+    async def get(self, endpoint: str, entity_id: Union[int, str]) -> Dict[str, Any]:
+        res = await self.request('GET', f'{endpoint}/{entity_id}')
+        check_get(res.status_code, res.text, entity_id)
+
+        if 'ETag' in res.headers:
+            self.etags[f'{endpoint}/{entity_id}'] = res.headers['ETag']
+
+        return res.json()
+
+    async def create(self, endpoint: str, data: Dict[Any, Optional[Any]]) -> Optional[int]:
+        res = await self.request('POST', endpoint, json=data)
+        check_create(res.status_code, res.text)
+
+        return res.json()
+
+    async def edit(self, endpoint: str, entity_id: Union[int, str], data: Dict[Any, Optional[Any]]):
+        etag = self.etags.pop(f'{endpoint}/{entity_id}', None)
+        headers = {'If-Match': etag} if etag else {}
+
+        res = await self.request('PUT', f'{endpoint}/{entity_id}', json=data, headers=headers)
+        check_edit(res.status_code, res.text, entity_id)
+
+    async def patch(self, endpoint: str, entity_id: Union[int, str], data: Dict[Any, Optional[Any]]) -> bool:
+        res = await self.request('PATCH', f'{endpoint}/{entity_id}', json=data)
+        if res.status_code in UNSUPPORTED_STATUSES:
+            self.partial_updates = False
+            return False
+
+        check_edit(res.status_code, res.text, entity_id)
+        return True
+
+    async def delete(self, endpoint: str, entity_id: Union[str, int]):
+        res = await self.request('DELETE', f'{endpoint}/{entity_id}')
+        check_delete(res.status_code, res.text, entity_id)
@@ -0,0 +1,34 @@
+from typing import Optional, Dict, List, Union, Any
+
+from .async_base_server import AsyncBaseServer
+from .groups_server import create_data, partial_data, edit_data
+
+
+class AsyncGroupsServer:
+    def __init__(self, server: AsyncBaseServer):
+        self.server = server
+
+    async def list(self) -> List[Dict[str, Optional[Any]]]:
+        return await self.server.list('api/groups')
+
+    async def view(self, group_id: Union[str, int]) -> Dict[str, Optional[Any]]:
+        return await self.server.get('api/groups', group_id)
+
+    async def delete(self, group_id: Union[str, int]) -> None:
+        await self.server.delete('api/groups', group_id)
+
+    async def create(self, name: str, environment: Dict[str, Optional[Any]]) -> Optional[int]:
+        data = create_data(name, environment)
+        return await self.server.create('api/groups', data)
+
+    async def edit(self, group_id: Union[str, int], name: Optional[str], environment: Optional[Dict[str, Any]],
+                   existing_group: Optional[Dict[str, Any]] = None):
+        if self.server.partial_updates and existing_group is None:
+            if await self.server.patch('api/groups', group_id, partial_data(name, environment)):
+                return
+
+        if existing_group is None or 'environment' not in existing_group:
+            existing_group = await self.server.get('api/groups', group_id)
+
+        data = edit_data(existing_group, name, environment)
+        return await self.server.edit('api/groups', group_id, data)
@@ -0,0 +1,65 @@
+from typing import Optional, Dict, List, Union, Any, Tuple, AsyncIterator
+
+from .async_base_server import AsyncBaseServer
+from .job_server import EDIT_FIELDS, create_data, partial_data, edit_data, same_job, check_run, check_explain, check_pause, check_resume
+
+
+class AsyncJobServer:
+    def __init__(self, server: AsyncBaseServer):
+        self.server = server
+
+    async def list(self) -> List[Dict[str, Any]]:
+        return await self.server.list('api/jobs')
+
+    def iterate(self, page_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+        return self.server.iterate('api/jobs', page_size=page_size)
+
+    async def view(self, job_id: Union[int, str]) -> Dict[str, Any]:
+        return await self.server.get('api/jobs', job_id)
+
+    async def create(self, name: str, image: str, tag: str, schedule: str, env: Dict[str, str], entrypoint: str,
+                     alias: Optional[str], groups: Tuple[str], timezone: str, crontype: str) -> Optional[int]:
+
+        data = create_data(name, image, tag, schedule, env, entrypoint, alias, groups, timezone, crontype)
+        return await self.server.create('api/jobs', data)
+
+    async def edit(self, job_id: Union[int, str], name: Optional[str], image: Optional[str], tag: Optional[str],
+                   schedule: Optional[str], alias: Optional[str], env: Optional[Dict[str, str]],
+                   entrypoint: Optional[str], groups: Tuple[str], timezone: str, crontype: Optional[str],
+                   current_job: Optional[Dict[str, Any]] = None) -> bool:
+
+        if self.server.partial_updates and current_job is None:
+            changes = partial_data(name, image, tag, schedule, alias, env, entrypoint, groups, timezone, crontype)
+            if await self.server.patch('api/jobs', job_id, changes):
+                return True
+
+        if current_job is None or not EDIT_FIELDS.issubset(current_job):
+            current_job = await self.server.get('api/jobs', job_id)
+
+        data = edit_data(current_job, name, image, tag, schedule, alias, env, entrypoint, groups, timezone, crontype)
+        if same_job(current_job, data):
+            return False
+
+        await self.server.edit('api/jobs', job_id, data)
+        return True
+
+    async def delete(self, job_id: Union[str, int]):
+        await self.server.delete('api/jobs', job_id)
+
+    async def run_now(self, job_id: Union[str, int]):
+        response = await self.server.request('POST', f'api/jobs/{job_id}/run')
+        check_run(response.status_code, job_id)
+
+    async def explain(self, job_id: Union[str, int]) -> str:
+        response = await self.server.request('GET', f'api/jobs/{job_id}/explain')
+        check_explain(response.status_code, response.text, job_id)
+
+        return response.text
+
+    async def pause(self, job_id):
+        response = await self.server.request('POST', f'api/jobs/{job_id}/pause')
+        check_pause(response.status_code, response.content, job_id)
+
+    async def resume(self, job_id):
+        response = await self.server.request('POST', f'api/jobs/{job_id}/resume')
+        check_resume(response.status_code, response.content, job_id)
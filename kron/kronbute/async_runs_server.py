@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import Optional, Union, Dict, Any, AsyncIterator
+
+from .async_base_server import AsyncBaseServer
+from .timestamps import parse_timestamp
+
+
+class AsyncRunsServer:
+    def __init__(self, server: AsyncBaseServer):
+        self.server = server
+
+    async def list(self):
+        return await self.server.list('api/runs')
+
+    async def iterate(self, limit: Optional[int] = None, since: Optional[datetime] = None,
+                      job_id: Optional[int] = None, page_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+        """Run history page by page, filtered as RunsServer.iterate does"""
+        params: Dict[str, Union[str, int]] = {}
+        if limit:
+            params['limit'] = limit
+            page_size = min(page_size, limit)
+        if since:
+            params['since'] = since.isoformat()
+        if job_id is not None:
+            params['jobId'] = job_id
+
+        count = 0
+        async for run in self.server.iterate('api/runs', params, page_size=page_size):
+            if job_id is not None and run.get('jobId') != job_id:
+                continue
+
+            if since:
+                updated_on = parse_timestamp(run.get('on'))
+                if updated_on is not None and updated_on < since:
+                    continue
+
+            yield run
+
+            count += 1
+            if limit and count >= limit:
+                return
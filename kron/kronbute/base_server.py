@@ -1,78 +1,304 @@
+import codecs
+import json
 import re
 import urllib.parse
-from typing import Optional, Dict, List, Union, Any, Any
+from typing import Optional, Dict, List, Union, Any, Any, Callable, Iterable, Iterator, TYPE_CHECKING
 
-import requests
+if TYPE_CHECKING:
+    import requests
 
-from .errors import ServerError, ArgumentValidationError, NotFoundError, AliasAlreadyExistsError
+from .cache import ResponseCache
+from .errors import ServerError, ArgumentValidationError, NotFoundError, AliasAlreadyExistsError, ConflictError
 
 version_regex = re.compile(r"hello!, version: (?P<version>.*)")
 
+# Only gateway style failures are worth retrying, anything else is an answer from Kronbute itself
+RETRY_STATUSES = (502, 503, 504)
+IDEMPOTENT_METHODS = frozenset(['GET', 'PUT', 'DELETE', 'HEAD', 'OPTIONS'])
+# Answers from a server without support for partial updates
+UNSUPPORTED_STATUSES = (405, 501)
+
+
+# Mapping from Kronbute answers to errors, shared with the asyncio client
+def check_version(status_code: int, text: str) -> str:
+    if status_code != 200:
+        raise ServerError(f'Server returned an invalid version or answer', status_code, text)
+
+    match = version_regex.match(text)
+    return match.group('version')
+
+
+def check_list(status_code: int, text: str):
+    if status_code != 200:
+        raise ServerError(f'Error when requesting info to server', status_code, text)
+
+
+def check_get(status_code: int, text: str, entity_id: Union[int, str]):
+    if status_code == 404:
+        raise NotFoundError(entity_id)
+
+    if status_code != 200:
+        raise ServerError("Error when retrieving entity from server", status_code, text)
+
+
+def check_create(status_code: int, text: str):
+    if status_code == 400:
+        raise ArgumentValidationError(text)
+
+    if status_code == 409:
+        raise AliasAlreadyExistsError()
+
+    if status_code == 404:
+        raise NotFoundError("")
+
+    if status_code != 201:
+        raise ServerError(f'Error when creating entity', status_code, text)
+
+
+def check_edit(status_code: int, text: str, entity_id: Union[int, str]):
+    if status_code == 400:
+        raise ArgumentValidationError(text)
+
+    if status_code == 412:
+        raise ConflictError(entity_id)
+
+    if status_code != 202:
+        raise ServerError(f"Error while processing update for job:", status_code, text)
+
+
+def check_delete(status_code: int, text: str, entity_id: Union[int, str]):
+    if status_code == 404:
+        raise NotFoundError(entity_id)
+
+    if status_code != 204:
+        raise ServerError(f'Error when requesting info to server, {status_code}', status_code, text)
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Yields the items of a JSON array as its bytes arrive, without holding the whole document in memory"""
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    started = False
+
+    for chunk in chunks:
+        buffer += text.decode(chunk)
+        position = 0
+
+        while True:
+            while position < len(buffer) and (buffer[position].isspace() or (started and buffer[position] == ',')):
+                position += 1
+
+            if position == len(buffer):
+                break
+
+            if not started:
+                if buffer[position] != '[':
+                    raise ValueError('Expected a JSON array')
+                started = True
+                position += 1
+                continue
+
+            if buffer[position] == ']':
+                return
+
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except ValueError:
+                break
+
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(buffer) and not isinstance(item, (dict, list, str)):
+                break
+
+            yield item
+            position = end
+
+        buffer = buffer[position:]
+
+
+def _prepend(first: bytes, chunks: Iterable[bytes]) -> Iterator[bytes]:
+    yield first
+    yield from chunks
+
+
+# Keys used by paged answers for the items and the cursor to the next page
+PAGE_ITEMS = ('content', 'items', 'data')
+PAGE_CURSORS = ('next', 'nextCursor', 'cursor')
+
 
 class BaseServer:
-    def __init__(self, url: str):
+    def __init__(self, url: str, pool_size: int = 10, timeout: Optional[float] = 30.0, retries: int = 3,
+                 backoff: float = 0.3, partial_updates: bool = False, cache: Optional[ResponseCache] = None,
+                 session: Optional['requests.Session'] = None):
         self.url = url
+        self.cache = cache
+        self.timeout = timeout
+        self.partial_updates = partial_updates
+        self.etags: Dict[str, str] = {}
+        self.last_modified: Dict[str, str] = {}
+
+        # A session shared with other servers keeps its pool of connections, retries are the ones it was made with
+        if session is not None:
+            self.session = session
+            return
+
+        # requests takes a good part of the start up time, it is only imported once a server is really needed
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        # urllib3 default allowed methods are the idempotent verbs, so POST is never replayed on a read error
+        retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=RETRY_STATUSES, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method: str, endpoint: str, **kwargs) -> 'requests.Response':
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, urllib.parse.urljoin(self.url, endpoint), **kwargs)
+
+    def close(self):
+        self.session.close()
 
     @property
     def version(self) -> str:
-        res = requests.get(urllib.parse.urljoin(self.url, 'hello'))
-        if res.status_code != 200:
-            raise ServerError(f'Server returned an invalid version or answer', res.status_code, res.text)
+        res = self.request('GET', 'hello')
+        return check_version(res.status_code, res.text)
 
-        match = version_regex.match(res.text)
-        version = match.group('version')
+    def cached_get(self, endpoint: str, check: Callable[['requests.Response'], None], revalidate: bool = False) -> Any:
+        """GET through the response cache, stale entries are revalidated with a conditional request"""
+        entry = self.cache.load(self.url, endpoint) if self.cache else None
+        if entry and not revalidate and entry.is_fresh(self.cache.ttl):
+            if entry.etag:
+                self.etags[endpoint] = entry.etag
+            return json.loads(entry.content)
 
-        return version
+        headers = {}
+        if entry and entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry and entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
 
-    def list(self, endpoint: str) -> List[Any]:
-        res = requests.get(urllib.parse.urljoin(self.url, endpoint))
-        if res.status_code != 200:
-            raise ServerError(f'Error when requesting info to server', res.status_code, res.text)
-        data = res.json()
+        res = self.request('GET', endpoint, headers=headers)
+        if res.status_code == 304 and entry:
+            self.cache.touch(self.url, endpoint, entry)
+            if entry.etag:
+                self.etags[endpoint] = entry.etag
+            return json.loads(entry.content)
 
-        return data
+        check(res)
 
-    def get(self, endpoint: str, entity_id: Union[int, str]) -> Dict[str, Any]:
-        res = requests.get(urllib.parse.urljoin(self.url, f'{endpoint}/{entity_id}'))
-        if res.status_code == 404:
-            raise NotFoundError(entity_id)
-
-        if res.status_code != 200:
-            raise ServerError("Error when retrieving entity from server", res.status_code, res.text)
+        if 'ETag' in res.headers:
+            self.etags[endpoint] = res.headers['ETag']
+        if self.cache:
+            self.cache.store(self.url, endpoint, res.text, res.headers.get('ETag'), res.headers.get('Last-Modified'))
 
         return res.json()
 
-    def create(self, endpoint: str, data: Dict[Any, Optional[Any]]) -> Optional[int]:
-        res = requests.post(urllib.parse.urljoin(self.url, endpoint), json=data)
-        if res.status_code == 400:
-            raise ArgumentValidationError(res.text)
+    def iterate(self, endpoint: str, params: Optional[Dict[str, Any]] = None, page_size: int = 500) -> Iterator[Any]:
+        """Iterates over a listing page by page, servers answering the whole array at once are parsed as it arrives"""
+        params = dict(params or {}, size=page_size)
+        page = 0
+        previous: Optional[List[Any]] = None
+
+        while True:
+            with self.request('GET', endpoint, params=dict(params, page=page), stream=True) as res:
+                if res.status_code != 200:
+                    check_list(res.status_code, res.text)
+
+                chunks = iter(res.iter_content(chunk_size=64 * 1024))
+                first = next((chunk for chunk in chunks if chunk.strip()), b'')
+                if first.lstrip().startswith(b'['):
+                    yield from iter_json_array(_prepend(first, chunks))
+                    return
+
+                answer = json.loads(b''.join(_prepend(first, chunks)) or b'[]')
+
+            items = next((answer[key] for key in PAGE_ITEMS if key in answer), [])
+            if not items:
+                return
 
-        if res.status_code == 409:
-            raise AliasAlreadyExistsError()
+            # A server ignoring page and size answers the same full page every time, it already sent everything
+            ids = [item.get('id') if isinstance(item, dict) else item for item in items]
+            if ids == previous:
+                return
+            previous = ids
 
-        if res.status_code == 404:
-            raise NotFoundError("")
+            yield from items
 
-        if res.status_code != 201:
-            raise ServerError(f'Error when creating entity', res.status_code, res.text)
+            cursor = next((answer[key] for key in PAGE_CURSORS if answer.get(key)), None)
+            if cursor:
+                params['cursor'] = cursor
+            elif answer.get('last', False) or len(items) < page_size:
+                return
 
-        data = res.json()
+            page += 1
 
-        return data
+    def poll(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        """Listing for an endpoint if it changed since the previous poll in this session, None otherwise"""
+        key = f'{endpoint}?{urllib.parse.urlencode(sorted(params.items()))}' if params else endpoint
+
+        headers = {}
+        if key in self.etags:
+            headers['If-None-Match'] = self.etags[key]
+        if key in self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified[key]
+
+        res = self.request('GET', endpoint, params=params, headers=headers)
+        if res.status_code == 304:
+            return None
+
+        check_list(res.status_code, res.text)
+
+        if 'ETag' in res.headers:
+            self.etags[key] = res.headers['ETag']
+        if 'Last-Modified' in res.headers:
+            self.last_modified[key] = res.headers['Last-Modified']
+
+        return res.json()
+
+    def invalidate(self, endpoint: str, keep: Iterable[str] = ()):
+        if self.cache:
+            self.cache.invalidate(self.url, endpoint, keep)
+
+    def list(self, endpoint: str, revalidate: bool = False) -> List[Any]:
+        return self.cached_get(endpoint, lambda res: check_list(res.status_code, res.text), revalidate=revalidate)
+
+    def get(self, endpoint: str, entity_id: Union[int, str], revalidate: bool = False) -> Dict[str, Any]:
+        return self.cached_get(f'{endpoint}/{entity_id}', lambda res: check_get(res.status_code, res.text, entity_id),
+                               revalidate=revalidate)
+
+    def create(self, endpoint: str, data: Dict[Any, Optional[Any]]) -> Optional[int]:
+        res = self.request('POST', endpoint, json=data)
+        self.invalidate(endpoint)
+        check_create(res.status_code, res.text)
+
+        return res.json()
 
     def edit(self, endpoint: str, entity_id: Union[int, str], data: Dict[Any, Optional[Any]]):
-        res = requests.put(urllib.parse.urljoin(self.url, f'{endpoint}/{entity_id}'), json=data)
-        if res.status_code == 400:
-            raise ArgumentValidationError(res.text)
+        # Only overwrite the version we read, if somebody changed it in between the server answers 412
+        etag = self.etags.pop(f'{endpoint}/{entity_id}', None)
+        headers = {'If-Match': etag} if etag else {}
 
-        if res.status_code != 202:
-            raise ServerError(f"Error while processing update for job:", res.status_code, res.text)
+        res = self.request('PUT', f'{endpoint}/{entity_id}', json=data, headers=headers)
+        self.invalidate(endpoint)
+        check_edit(res.status_code, res.text, entity_id)
 
-    def delete(self, endpoint: str, entity_id: Union[str, int]):
-        res = requests.delete(urllib.parse.urljoin(self.url, f'{endpoint}/{entity_id}'))
+    def patch(self, endpoint: str, entity_id: Union[int, str], data: Dict[Any, Optional[Any]]) -> bool:
+        """Sends only the changed fields, returns False when the server does not support partial updates"""
+        res = self.request('PATCH', f'{endpoint}/{entity_id}', json=data)
+        self.invalidate(endpoint)
+        if res.status_code in UNSUPPORTED_STATUSES:
+            self.partial_updates = False
+            return False
 
-        if res.status_code == 404:
-            raise NotFoundError(entity_id)
+        check_edit(res.status_code, res.text, entity_id)
+        return True
 
-        if res.status_code != 204:
-            raise ServerError(f'Error when requesting info to server, {res.status_code}', res.status_code, res.text)
+    def delete(self, endpoint: str, entity_id: Union[str, int]):
+        res = self.request('DELETE', f'{endpoint}/{entity_id}')
+        self.invalidate(endpoint)
+        check_delete(res.status_code, res.text, entity_id)
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+import urllib.parse
+from typing import Optional, NamedTuple, Iterable, Dict, Tuple
+
+
+def default_directory() -> str:
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'kron')
+
+
+class CacheEntry(NamedTuple):
+    stored_at: float
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content: str
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.stored_at < ttl
+
+
+class ResponseCache:
+    """On-disk cache of server answers, one directory per server and one file per endpoint"""
+
+    def __init__(self, directory: Optional[str] = None, ttl: float = 10.0):
+        self.directory = directory or default_directory()
+        self.ttl = ttl
+
+    def server_directory(self, server_url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(server_url.encode('utf-8')).hexdigest()[:16])
+
+    def path(self, server_url: str, endpoint: str) -> str:
+        return os.path.join(self.server_directory(server_url), urllib.parse.quote(endpoint, safe='') + '.json')
+
+    def load(self, server_url: str, endpoint: str) -> Optional[CacheEntry]:
+        try:
+            with open(self.path(server_url, endpoint), 'r') as document:
+                return CacheEntry(**json.load(document))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def store(self, server_url: str, endpoint: str, content: str, etag: Optional[str] = None,
+              last_modified: Optional[str] = None):
+        entry = CacheEntry(time.time(), etag, last_modified, content)
+
+        # Answers may carry job environments, so only the current user can read them
+        directory = self.server_directory(server_url)
+        temporary = None
+        try:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            # Write to a temporary file first so concurrent kron processes never read half an entry
+            handle, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(handle, 'w') as document:
+                json.dump(entry._asdict(), document)
+            os.replace(temporary, self.path(server_url, endpoint))
+        except OSError:
+            # A cache that cannot be written only makes kron ask the server again
+            if temporary is not None and os.path.exists(temporary):
+                os.remove(temporary)
+
+    def touch(self, server_url: str, endpoint: str, entry: CacheEntry):
+        self.store(server_url, endpoint, entry.content, entry.etag, entry.last_modified)
+
+    def invalidate(self, server_url: str, endpoint: str, keep: Iterable[str] = ()):
+        """Removes the entries for an endpoint and every entity under it, but the kept endpoints"""
+        listing = urllib.parse.quote(endpoint, safe='') + '.json'
+        kept = {urllib.parse.quote(kept_endpoint, safe='') + '.json' for kept_endpoint in keep}
+        entities = urllib.parse.quote(f'{endpoint}/', safe='')
+        directory = self.server_directory(server_url)
+
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return
+
+        for name in names:
+            if (name == listing or name.startswith(entities)) and name not in kept:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+
+
+class MemoryResponseCache(ResponseCache):
+    """Response cache also kept in memory by long running processes, an entry is read again from disk only when
+    another process stored or removed it"""
+
+    def __init__(self, directory: Optional[str] = None, ttl: float = 10.0):
+        super().__init__(directory, ttl)
+        self.entries: Dict[str, Tuple[Tuple[int, int, int], CacheEntry]] = {}
+
+    def load(self, server_url: str, endpoint: str) -> Optional[CacheEntry]:
+        path = self.path(server_url, endpoint)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.entries.pop(path, None)
+            return None
+
+        # Entries are replaced, never written in place, so a new file is a new inode or modification time
+        version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        known = self.entries.get(path)
+        if known is not None and known[0] == version:
+            return known[1]
+
+        entry = super().load(server_url, endpoint)
+        if entry is not None:
+            self.entries[path] = (version, entry)
+        return entry
@@ -1,4 +1,4 @@
-from typing import Optional, Union
+from typing import Optional, Union, List
 
 
 class ServerError(Exception):
@@ -32,3 +32,16 @@ class ArgumentValidationError(Exception):
 class AliasAlreadyExistsError(Exception):
     def __init__(self, alias: Optional[str] = None):
         self.alias = alias
+
+
+class ConflictError(Exception):
+    def __init__(self, query: Union[str, int], entity: str = 'job'):
+        self.query = query
+        self.entity = entity
+
+
+class AmbiguousAliasError(Exception):
+    def __init__(self, query: Union[str, int], ids: List[Union[str, int]], entity: str = 'job'):
+        self.query = query
+        self.ids = ids
+        self.entity = entity
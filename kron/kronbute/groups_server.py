@@ -2,6 +2,26 @@ from .base_server import BaseServer
 from typing import Optional, Dict, List, Union, Any
 
 
+def create_data(name: str, environment: Dict[str, Optional[Any]]) -> Dict[str, Any]:
+    return {
+        'name': name,
+        'environment': environment or {}
+    }
+
+
+def partial_data(name: Optional[str], environment: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    data = {'name': name, 'environment': environment}
+    return {key: value for key, value in data.items() if value}
+
+
+def edit_data(existing_group: Dict[str, Any], name: Optional[str],
+              environment: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        'name': name or existing_group['name'],
+        'environment': environment or existing_group['environment'] or {}
+    }
+
+
 class GroupsServer:
     def __init__(self, server: BaseServer):
         self.server = server
@@ -16,17 +36,18 @@ class GroupsServer:
         self.server.delete('api/groups', group_id)
 
     def create(self, name: str, environment: Dict[str, Optional[Any]]) -> Optional[int]:
-        data = {
-            'name': name,
-            'environment': environment or {}
-        }
+        data = create_data(name, environment)
         return self.server.create('api/groups', data)
 
-    def edit(self, group_id: Union[str, int], name: Optional[str], environment: Optional[Dict[str, Any]]):
-        existing_group = self.server.get('api/groups', group_id)
+    def edit(self, group_id: Union[str, int], name: Optional[str], environment: Optional[Dict[str, Any]],
+             existing_group: Optional[Dict[str, Any]] = None):
+        if self.server.partial_updates and existing_group is None:
+            if self.server.patch('api/groups', group_id, partial_data(name, environment)):
+                return
+
+        # Group listings only carry the number of variables, not the environment itself
+        if existing_group is None or 'environment' not in existing_group:
+            existing_group = self.server.get('api/groups', group_id, revalidate=True)
 
-        data = {
-            'name': name or existing_group['name'],
-            'environment': environment or existing_group['environment'] or {}
-        }
+        data = edit_data(existing_group, name, environment)
         return self.server.edit('api/groups', group_id, data)
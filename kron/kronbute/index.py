@@ -0,0 +1,101 @@
+import bisect
+import itertools
+import json
+import re
+from typing import Optional, Dict, List, Union, Any, Iterable, NamedTuple, Tuple
+
+from .errors import NotFoundError, AmbiguousAliasError
+
+# Stored in the response cache under the jobs endpoint, so every create, edit or delete removes it with the listing
+INDEX_ENDPOINT = 'api/jobs/.index'
+
+
+class IndexEntry(NamedTuple):
+    id: Union[int, str]
+    alias: Optional[str]
+    name: str
+
+
+class JobIndex:
+    """Ids, aliases and names of the jobs in a server from a single listing, to resolve them without asking the
+    server"""
+
+    def __init__(self, entries: Iterable[IndexEntry], keys: Optional[List[str]] = None):
+        self.entries = list(entries)
+        # Sorted once when the index is built, prefixes are then found with a binary search
+        self.keys = keys if keys is not None else sorted({entry.alias for entry in self.entries if entry.alias} |
+                                                         {str(entry.id) for entry in self.entries})
+        # Completion only needs the keys, lookups are built the first time they are used
+        self._lookups: Optional[Tuple[Dict[str, IndexEntry], Dict[str, List[IndexEntry]],
+                                      Dict[str, List[IndexEntry]]]] = None
+
+    def lookups(self) -> Tuple[Dict[str, IndexEntry], Dict[str, List[IndexEntry]], Dict[str, List[IndexEntry]]]:
+        if self._lookups is None:
+            by_id: Dict[str, IndexEntry] = {}
+            by_alias: Dict[str, List[IndexEntry]] = {}
+            by_name: Dict[str, List[IndexEntry]] = {}
+            for entry in self.entries:
+                by_id[str(entry.id)] = entry
+                if entry.alias:
+                    by_alias.setdefault(entry.alias, []).append(entry)
+                by_name.setdefault(entry.name, []).append(entry)
+            self._lookups = by_id, by_alias, by_name
+        return self._lookups
+
+    @classmethod
+    def from_jobs(cls, jobs: Iterable[Dict[str, Any]]) -> 'JobIndex':
+        return cls(IndexEntry(job['id'], job.get('alias'), job.get('name') or '') for job in jobs)
+
+    @classmethod
+    def from_json(cls, content: str) -> 'JobIndex':
+        data = json.loads(content)
+        return cls([IndexEntry(*entry) for entry in data['entries']], data['keys'])
+
+    def to_json(self) -> str:
+        return json.dumps({'entries': [list(entry) for entry in self.entries], 'keys': self.keys})
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def find(self, value: Union[int, str]) -> List[IndexEntry]:
+        """Jobs with an id or alias, more than one only when an alias is ambiguous"""
+        by_id, by_alias, _ = self.lookups()
+        entry = by_id.get(str(value))
+        if entry is not None:
+            return [entry]
+        return by_alias.get(value, []) if isinstance(value, str) else []
+
+    def aliased(self, alias: str) -> List[IndexEntry]:
+        return self.lookups()[1].get(alias, [])
+
+    def named(self, name: str) -> List[IndexEntry]:
+        return self.lookups()[2].get(name, [])
+
+    def resolve(self, value: Union[int, str]) -> Union[int, str]:
+        found = self.find(value)
+        if not found:
+            raise NotFoundError(value)
+        if len(found) > 1:
+            raise AmbiguousAliasError(value, [entry.id for entry in found])
+        return found[0].id
+
+    def complete(self, prefix: str, limit: int = 100) -> List[str]:
+        """Aliases and ids starting with a prefix, or containing its characters in order when none does"""
+        start = bisect.bisect_left(self.keys, prefix)
+        matches = []
+        for key in itertools.islice(self.keys, start, None):
+            if not key.startswith(prefix) or len(matches) == limit:
+                break
+            matches.append(key)
+        if matches or not prefix:
+            return matches
+
+        # Characters in order anywhere in the alias or name, every class stops at the character that follows it
+        # so the expression never backtracks
+        subsequence = ''.join(f'[^\\n{re.escape(character)}]*{re.escape(character)}' for character in prefix)
+        lines = '\n'.join(f'{entry.alias or entry.id}\t{entry.name}' for entry in self.entries)
+        for match in re.finditer(f'^(?={subsequence})([^\\t\\n]*)', lines, re.IGNORECASE | re.MULTILINE):
+            matches.append(match.group(1))
+            if len(matches) == limit:
+                break
+        return matches
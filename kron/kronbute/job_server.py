@@ -1,84 +1,218 @@
-from typing import Optional, Dict, List, Union, Any, Tuple
+from typing import Optional, Dict, List, Union, Any, Tuple, Iterator
 
-import requests
-
-from kron.kronbute import NotFoundError
-from kron.kronbute.errors import JobAlreadyPausedError, JobIsNotPausedError
+from .errors import NotFoundError, ServerError, JobAlreadyPausedError, JobIsNotPausedError, AmbiguousAliasError
 from .base_server import BaseServer
+from .index import JobIndex, INDEX_ENDPOINT
+
+
+def check_run(status_code: int, job_id: Union[str, int]):
+    if status_code == 404:
+        raise NotFoundError(job_id)
+
+
+def check_explain(status_code: int, text: str, job_id: Union[str, int]):
+    if status_code in (400, 404):
+        raise NotFoundError(job_id)
+    if status_code != 200:
+        raise ServerError("Problem with the server", status_code, text)
+
+
+def check_pause(status_code: int, content: bytes, job_id: Union[str, int]):
+    if status_code == 404:
+        raise NotFoundError(job_id)
+
+    if status_code == 400:
+        raise JobAlreadyPausedError(content)
+
+
+def check_resume(status_code: int, content: bytes, job_id: Union[str, int]):
+    if status_code == 404:
+        raise NotFoundError(job_id)
+
+    if status_code == 400:
+        raise JobIsNotPausedError(content)
+
+
+def create_data(name: str, image: str, tag: str, schedule: str, env: Dict[str, str], entrypoint: str,
+                alias: Optional[str], groups: Tuple[str], timezone: str, crontype: str) -> Dict[str, Any]:
+    data = {'name': name, 'image': image, 'tag': tag, 'schedule': schedule, 'entryPoint': entrypoint,
+            'environment': env, 'timeZone': timezone, 'cronType': crontype}
+
+    if alias:
+        data['alias'] = alias
+
+    data['groups'] = groups
+
+    return data
+
+
+EDIT_FIELDS = frozenset(['name', 'image', 'tag', 'schedule', 'alias', 'entryPoint', 'groups', 'timeZone',
+                         'environment', 'cronType'])
+
+
+def partial_data(name: Optional[str], image: Optional[str], tag: Optional[str], schedule: Optional[str],
+                 alias: Optional[str], env: Optional[Dict[str, str]], entrypoint: Optional[str], groups: Tuple[str],
+                 timezone: Optional[str], crontype: Optional[str]) -> Dict[str, Any]:
+    data = {'name': name, 'image': image, 'tag': tag, 'schedule': schedule, 'alias': alias, 'entryPoint': entrypoint,
+            'groups': list(groups), 'timeZone': timezone, 'environment': env, 'cronType': crontype}
+
+    return {key: value for key, value in data.items() if value}
+
+
+def edit_data(current_job: Dict[str, Any], name: Optional[str], image: Optional[str], tag: Optional[str],
+              schedule: Optional[str], alias: Optional[str], env: Optional[Dict[str, str]],
+              entrypoint: Optional[str], groups: Tuple[str], timezone: str, crontype: Optional[str]) -> Dict[str, Any]:
+    return {'name': name or current_job['name'],
+            'image': image or current_job['image'],
+            'tag': tag or current_job['tag'],
+            'schedule': schedule or current_job['schedule'],
+            'alias': alias or current_job['alias'],
+            'entryPoint': entrypoint or current_job['entryPoint'],
+            'groups': list(groups) or current_job['groups'],
+            'timeZone': timezone or current_job['timeZone'],
+            'environment': env or current_job['environment'],
+            'cronType': crontype or current_job['cronType']
+            }
+
+
+def same_job(current_job: Dict[str, Any], data: Dict[str, Any]) -> bool:
+    """Whether saving data would leave the job as it is, group order is not kept by the server"""
+    for field, value in data.items():
+        existing = current_job.get(field)
+        if field == 'groups':
+            existing, value = sorted(existing or []), sorted(value or [])
+        if existing != value:
+            return False
+    return True
 
 
 class JobServer:
     def __init__(self, server: BaseServer):
         self.server = server
 
-    def list(self) -> List[Dict[str, Any]]:
-        return self.server.list('api/jobs')
+    def current(self, job_id: Union[int, str], current_job: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        # Listings may come without some of the job details, only full entities can be used to edit
+        if current_job is None or not EDIT_FIELDS.issubset(current_job):
+            current_job = self.server.get('api/jobs', job_id, revalidate=True)
+
+        return current_job
+
+    def list(self, revalidate: bool = False) -> List[Dict[str, Any]]:
+        jobs = self.server.list('api/jobs', revalidate=revalidate)
+        if self.server.cache:
+            self.server.cache.store(self.server.url, INDEX_ENDPOINT, JobIndex.from_jobs(jobs).to_json())
+        return jobs
+
+    def known_index(self, max_age: Optional[float] = None) -> Optional[JobIndex]:
+        """Index kept with the cached answers without asking the server, None when there is none younger than
+        max_age seconds, the cache time to live by default"""
+        cache = self.server.cache
+        entry = cache.load(self.server.url, INDEX_ENDPOINT) if cache else None
+        if entry is None or not entry.is_fresh(cache.ttl if max_age is None else max_age):
+            return None
+
+        try:
+            return JobIndex.from_json(entry.content)
+        except (ValueError, TypeError):
+            return None
+
+    def index(self, max_age: Optional[float] = None) -> JobIndex:
+        index = self.known_index(max_age)
+        return index if index is not None else JobIndex.from_jobs(self.list())
+
+    def resolve(self, job_id: Union[int, str]) -> Union[int, str]:
+        """Id of an alias from a recent index, the server resolves aliases the index does not know"""
+        if isinstance(job_id, int):
+            return job_id
+
+        index = self.known_index()
+        found = index.find(job_id) if index is not None else []
+        if len(found) > 1:
+            raise AmbiguousAliasError(job_id, [entry.id for entry in found])
+        return found[0].id if found else job_id
+
+    def resolve_current(self, job_id: Union[int, str]) -> Tuple[Union[int, str], Optional[Dict[str, Any]]]:
+        """Id of a job about to be changed or deleted and the job when it had to be fetched, an id found for an alias
+        in the index is only used once the server confirms the job still has that alias, another machine may have
+        moved it since the index was made"""
+        resolved = self.resolve(job_id)
+        if resolved == job_id:
+            return job_id, None
+
+        try:
+            current_job = self.server.get('api/jobs', resolved, revalidate=True)
+            if current_job.get('alias') == job_id:
+                return resolved, current_job
+        except NotFoundError:
+            pass
+
+        # The index is out of date, a new listing replaces it
+        self.list(revalidate=True)
+        return self.resolve(job_id), None
+
+    def poll(self) -> Optional[List[Dict[str, Any]]]:
+        return self.server.poll('api/jobs')
+
+    def iterate(self, page_size: int = 500) -> Iterator[Dict[str, Any]]:
+        return self.server.iterate('api/jobs', page_size=page_size)
 
     def view(self, job_id: Union[int, str]) -> Dict[str, Any]:
-        return self.server.get('api/jobs', job_id)
+        return self.server.get('api/jobs', self.resolve(job_id))
 
     def create(self, name: str, image: str, tag: str, schedule: str, env: Dict[str, str], entrypoint: str,
                alias: Optional[str], groups: Tuple[str], timezone: str, crontype: str) -> Optional[int]:
 
-        data = {'name': name, 'image': image, 'tag': tag, 'schedule': schedule, 'entryPoint': entrypoint,
-                'environment': env, 'timeZone': timezone, 'cronType': crontype}
-
-        if alias:
-            data['alias'] = alias
-
-        data['groups'] = groups
-
+        data = create_data(name, image, tag, schedule, env, entrypoint, alias, groups, timezone, crontype)
         created_job = self.server.create('api/jobs', data)
 
         return created_job
 
     def edit(self, job_id: Union[int, str], name: Optional[str], image: Optional[str], tag: Optional[str],
              schedule: Optional[str], alias: Optional[str], env: Optional[Dict[str, str]],
-             entrypoint: Optional[str], groups: Tuple[str], timezone: str, crontype: Optional[str]):
-
-        current_job = self.server.get('api/jobs', job_id)
-
-        data = {'name': name or current_job['name'],
-                'image': image or current_job['image'],
-                'tag': tag or current_job['tag'],
-                'schedule': schedule or current_job['schedule'],
-                'alias': alias or current_job['alias'],
-                'entryPoint': entrypoint or current_job['entryPoint'],
-                'groups': list(groups) or current_job['groups'],
-                'timeZone': timezone or current_job['timeZone'],
-                'environment': env or current_job['environment'],
-                'cronType': crontype or current_job['cronType']
-                }
+             entrypoint: Optional[str], groups: Tuple[str], timezone: str, crontype: Optional[str],
+             current_job: Optional[Dict[str, Any]] = None) -> bool:
+        """Saves the job, returns False when nothing would change so no request was made"""
+        job_id, fetched_job = self.resolve_current(job_id)
+        if self.server.partial_updates and current_job is None:
+            changes = partial_data(name, image, tag, schedule, alias, env, entrypoint, groups, timezone, crontype)
+            if self.server.patch('api/jobs', job_id, changes):
+                return True
+
+        current_job = self.current(job_id, current_job or fetched_job)
+
+        data = edit_data(current_job, name, image, tag, schedule, alias, env, entrypoint, groups, timezone, crontype)
+        if same_job(current_job, data):
+            return False
 
         self.server.edit('api/jobs', job_id, data)
+        return True
 
     def delete(self, job_id: Union[str, int]):
-        self.server.delete('api/jobs', job_id)
+        self.server.delete('api/jobs', self.resolve_current(job_id)[0])
 
     def run_now(self, job_id: Union[str, int]):
-        response = requests.post(f'{self.server.url}/api/jobs/{job_id}/run')
-        if response.status_code == 404:
-            raise NotFoundError(job_id)
+        job_id, _ = self.resolve_current(job_id)
+        response = self.server.request('POST', f'api/jobs/{job_id}/run')
+        # Only the status changed, ids and aliases in the index are still right, and there is a new run
+        self.server.invalidate('api/jobs', keep=[INDEX_ENDPOINT])
+        self.server.invalidate('api/runs')
+        check_run(response.status_code, job_id)
 
-    def explain(self, job_id: Union[str, int]):
-        response = requests.get(f'{self.server.url}/api/jobs/{job_id}/explain')
-        if response.status_code == 404:
-            raise NotFoundError(job_id)
-        if response.status_code != 200:
-            raise Server
+    def explain(self, job_id: Union[str, int]) -> str:
+        job_id = self.resolve(job_id)
+        response = self.server.request('GET', f'api/jobs/{job_id}/explain')
+        check_explain(response.status_code, response.text, job_id)
 
-    def pause(self, job_id):
-        response = requests.post(f'{self.server.url}/api/jobs/{job_id}/pause')
-        if response.status_code == 404:
-            raise NotFoundError(job_id)
+        return response.text
 
-        if response.status_code == 400:
-            raise JobAlreadyPausedError(response.content)
+    def pause(self, job_id):
+        job_id, _ = self.resolve_current(job_id)
+        response = self.server.request('POST', f'api/jobs/{job_id}/pause')
+        self.server.invalidate('api/jobs', keep=[INDEX_ENDPOINT])
+        check_pause(response.status_code, response.content, job_id)
 
     def resume(self, job_id):
-        response = requests.post(f'{self.server.url}/api/jobs/{job_id}/resume')
-        if response.status_code == 404:
-            raise NotFoundError(job_id)
-
-        if response.status_code == 400:
-            raise JobIsNotPausedError(response.content)
\ No newline at end of file
+        job_id, _ = self.resolve_current(job_id)
+        response = self.server.request('POST', f'api/jobs/{job_id}/resume')
+        self.server.invalidate('api/jobs', keep=[INDEX_ENDPOINT])
+        check_resume(response.status_code, response.content, job_id)
@@ -1,4 +1,8 @@
+from datetime import datetime
+from typing import Optional, Union, Dict, Any, Iterator, List
+
 from .base_server import BaseServer
+from .timestamps import parse_timestamp
 
 
 class RunsServer:
@@ -7,3 +11,45 @@ class RunsServer:
 
     def list(self):
         return self.server.list('api/runs')
+
+    def poll(self, limit: Optional[int] = None, job_id: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        params: Dict[str, Union[str, int]] = {}
+        if limit:
+            params['limit'] = limit
+        if job_id is not None:
+            params['jobId'] = job_id
+
+        job_runs = self.server.poll('api/runs', params)
+        if job_runs is None:
+            return None
+
+        job_runs = [run for run in job_runs if job_id is None or run.get('jobId') == job_id]
+        return job_runs[:limit] if limit else job_runs
+
+    def iterate(self, limit: Optional[int] = None, since: Optional[datetime] = None,
+                job_id: Optional[int] = None, page_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Streams the run history, filters are sent to the server and applied again for servers ignoring them"""
+        params: Dict[str, Union[str, int]] = {}
+        if limit:
+            params['limit'] = limit
+            page_size = min(page_size, limit)
+        if since:
+            params['since'] = since.isoformat()
+        if job_id is not None:
+            params['jobId'] = job_id
+
+        count = 0
+        for run in self.server.iterate('api/runs', params, page_size=page_size):
+            if job_id is not None and run.get('jobId') != job_id:
+                continue
+
+            if since:
+                updated_on = parse_timestamp(run.get('on'))
+                if updated_on is not None and updated_on < since:
+                    continue
+
+            yield run
+
+            count += 1
+            if limit and count >= limit:
+                return
@@ -0,0 +1,46 @@
+import re
+from datetime import datetime, timedelta
+from typing import Optional, Union
+
+offset_regex = re.compile(r'(?<=\d)(Z|(?P<sign>[+-])(?P<hours>\d{2}):?(?P<minutes>\d{2}))$')
+# The usual ISO forms are read without strptime, several times faster when going through the whole run history
+iso_regex = re.compile(r'(\d{4})-(\d{2})-(\d{2})(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:\.(\d{1,6})\d*)?)?)?')
+timestamp_formats = ['%Y-%m-%dT%H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M', '%Y-%m-%d %H:%M:%S.%f',
+                     '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d']
+
+
+def parse_timestamp(value: Optional[Union[str, int, float]]) -> Optional[datetime]:
+    """Naive UTC datetime for the timestamps sent by Kronbute, either ISO like strings or epoch milliseconds"""
+    if value is None or value == '':
+        return None
+
+    if isinstance(value, (int, float)):
+        return datetime.utcfromtimestamp(value / 1000)
+
+    text = str(value).strip()
+    offset = timedelta()
+
+    tail = text[-6:]
+    match = offset_regex.search(text) if len(text) > 10 and ('Z' in tail or '+' in tail or '-' in tail) else None
+    if match:
+        text = text[:match.start()]
+        if match.group('sign'):
+            offset = timedelta(hours=int(match.group('hours')), minutes=int(match.group('minutes')))
+            offset = -offset if match.group('sign') == '-' else offset
+
+    iso = iso_regex.fullmatch(text)
+    if iso:
+        year, month, day, hour, minute, second, fraction = iso.groups()
+        try:
+            return datetime(int(year), int(month), int(day), int(hour or 0), int(minute or 0), int(second or 0),
+                            int(fraction.ljust(6, '0')) if fraction else 0) - offset
+        except ValueError:
+            return None
+
+    for timestamp_format in timestamp_formats:
+        try:
+            return datetime.strptime(text, timestamp_format) - offset
+        except ValueError:
+            pass
+
+    return None
@@ -0,0 +1,3 @@
+from .command import lint
+
+__all__ = ['lint']
@@ -0,0 +1,110 @@
+import functools
+from typing import Any, Dict, List, Optional, NamedTuple, Iterable, Set
+
+import yaml
+
+from .. import manifest
+
+# Under this number of files starting worker processes costs more than checking the files
+SERIAL_LIMIT = 32
+
+
+class FileReport(NamedTuple):
+    path: str
+    kind: Optional[str]
+    name: Optional[str]
+    alias: Optional[str]
+    groups: List[str]
+    problems: List[str]
+
+
+class Problem(NamedTuple):
+    path: str
+    message: str
+
+
+def _yaml_problem(err: yaml.YAMLError) -> str:
+    mark = getattr(err, 'problem_mark', None)
+    problem = getattr(err, 'problem', None) or str(err)
+    return f'invalid YAML at line {mark.line + 1}, {problem}' if mark else f'invalid YAML, {problem}'
+
+
+def _text(data: Dict[str, Any], field: str) -> Optional[str]:
+    return data[field] if isinstance(data.get(field), str) else None
+
+
+def lint_file(path: str, cache_directory: Optional[str] = None) -> List[FileReport]:
+    """Problems of every document in a manifest file, run in worker processes so everything in it must be
+    picklable"""
+    cache = manifest.ManifestCache(cache_directory) if cache_directory else None
+    try:
+        documents = manifest.parse_documents(path, cache)
+    except yaml.YAMLError as err:
+        return [FileReport(path, None, None, None, [], [_yaml_problem(err)])]
+    except manifest.ManifestError as err:
+        return [FileReport(path, None, None, None, [], [err.message])]
+    except OSError as err:
+        return [FileReport(path, None, None, None, [], [f'cannot be read, {err.strerror}'])]
+
+    reports = []
+    for index, (data, problems) in enumerate(documents):
+        groups = data.get('groups') if isinstance(data.get('groups'), list) else []
+        reports.append(FileReport(path if len(documents) == 1 else f'{path}#{index + 1}', manifest.kind(data),
+                                  _text(data, 'name'), _text(data, 'alias'),
+                                  [group for group in groups if isinstance(group, str)], problems))
+    return reports
+
+
+def lint_files(files: List[str], workers: int, cache_directory: Optional[str] = None) -> List[FileReport]:
+    check = functools.partial(lint_file, cache_directory=cache_directory)
+    if workers <= 1 or len(files) < SERIAL_LIMIT:
+        return [report for path in files for report in check(path)]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Big chunks, a manifest takes much less to check than to send to a worker and back
+    chunk_size = max(1, len(files) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return [report for reports in executor.map(check, files, chunksize=chunk_size) for report in reports]
+
+
+def _duplicates(reports: Iterable[FileReport], key, description: str) -> List[Problem]:
+    first: Dict[str, str] = {}
+    problems = []
+    for report in reports:
+        value = key(report)
+        if value is None:
+            continue
+        if value in first:
+            problems.append(Problem(report.path, f"{description} '{value}' is also used by {first[value]}"))
+        else:
+            first[value] = report.path
+    return problems
+
+
+def cross_file_problems(reports: List[FileReport], known_groups: Optional[Set[str]] = None) -> List[Problem]:
+    """Problems between manifests, such as two jobs with the same alias, groups are only checked when some are
+    known, from group manifests or given"""
+    jobs = [report for report in reports if report.kind == 'job']
+    groups = [report for report in reports if report.kind == 'group']
+
+    problems = _duplicates(jobs, lambda report: report.alias, 'alias')
+    # Jobs without an alias are matched with the server ones by name
+    problems.extend(_duplicates(jobs, lambda report: None if report.alias else report.name, 'name'))
+    problems.extend(_duplicates(groups, lambda report: report.name, 'group name'))
+
+    defined = {report.name for report in groups if report.name} | set(known_groups or ())
+    if defined:
+        for report in jobs:
+            problems.extend(Problem(report.path, f"unknown group '{group}'")
+                            for group in report.groups if group not in defined)
+
+    return problems
+
+
+def lint(files: List[str], workers: int = 1, known_groups: Optional[Set[str]] = None,
+         cache_directory: Optional[str] = None) -> List[Problem]:
+    reports = lint_files(files, workers, cache_directory)
+    problems = [Problem(report.path, message) for report in reports for message in report.problems]
+    problems.extend(cross_file_problems(reports, known_groups))
+    return sorted(problems, key=lambda problem: problem.path)
@@ -0,0 +1,40 @@
+import os
+from typing import Tuple
+
+import click
+
+from .. import util, output, manifest, completion
+from .checks import lint as lint_manifests
+
+PROBLEM_FIELDS = ['path', 'message']
+
+
+@click.command(help='Check job and group manifests in directories or globs without contacting the server')
+@click.argument('paths', nargs=-1, required=True)
+@click.option('--workers', help='Number of processes checking files', default=os.cpu_count() or 1,
+              type=click.IntRange(min=1))
+@click.option('--group', 'groups', multiple=True,
+              help='Group known to exist in the server, jobs using other groups are reported',
+              autocompletion=completion.complete_group_names)
+@click.pass_context
+def lint(ctx, paths: Tuple[str], workers: int, groups: Tuple[str]):
+    files = manifest.find_manifests(paths)
+    if not files:
+        raise click.UsageError('No YAML manifests found')
+
+    problems = lint_manifests(files, workers, set(groups), ctx.meta.get('kron.manifest_cache_dir'))
+
+    if not output.is_table():
+        output.write_records((problem._asdict() for problem in problems), PROBLEM_FIELDS)
+    elif problems:
+        from terminaltables import AsciiTable
+
+        click.echo(AsciiTable([['File', 'Problem']] + [list(problem) for problem in problems]).table)
+
+    summary = f'{len(files)} manifests checked'
+    if problems:
+        click.secho(f'\n[ERROR] {summary}, {len(problems)} problems in {len({problem.path for problem in problems})} '
+                    f'files', err=True, fg='red')
+        ctx.exit(1)
+
+    click.echo(util.success(f'{summary}, no problems found'), err=not output.is_table())
@@ -1,25 +1,94 @@
+from typing import Optional, Dict, Tuple, Any
+
 import click
 
+from . import trace
 from .util import KronbuteExceptionHandler
-from .kronbute import BaseServer
-from .job import job_group
-from .info import info as info_command
-from .runs import runs_group
-from .groups import group as groups_group
+from .output import OUTPUT_FORMATS
+from .kronbute import BaseServer, ResponseCache, MemoryResponseCache
+from .kronbute.cache import default_directory
+
+# Server sessions and cached answers kept from one command to the next by kron daemon, None for a single command
+daemon_sessions: Optional[Dict[Tuple[Any, ...], Any]] = None
+daemon_caches: Optional[Dict[Tuple[Any, ...], ResponseCache]] = None
+
+
+# Both start while parsing the options, before the command is imported, so its import is traced and profiled too
+def start_trace(ctx, param, path: Optional[str]):
+    if path and not ctx.resilient_parsing:
+        # The start up of a daemon happened long before the command
+        trace.start(path, startup=daemon_sessions is None)
+        ctx.call_on_close(trace.finish)
+
 
+def start_profile(ctx, param, path: Optional[str]):
+    if path and not ctx.resilient_parsing:
+        trace.start_profile()
+        ctx.call_on_close(lambda: trace.finish_profile(path))
 
-@click.group(cls=KronbuteExceptionHandler)
+
+@click.group(cls=KronbuteExceptionHandler, lazy_commands={
+    'job': 'kron.job:job_group',
+    'info': 'kron.info:info',
+    'runs': 'kron.runs:runs_group',
+    'group': 'kron.groups:group',
+    'schedule': 'kron.schedule:schedule_group',
+    'lint': 'kron.lint:lint',
+    'export': 'kron.snapshot:export_snapshot',
+    'import': 'kron.snapshot:import_snapshot',
+    'daemon': 'kron.daemon:daemon_group',
+    'shell': 'kron.shell:shell'
+})
 @click.option("--server", envvar="KRONBUTE_SERVER", default='http://localhost:8080', help='Kronbute server url')
+@click.option("--pool-size", envvar="KRONBUTE_POOL_SIZE", default=10, type=click.IntRange(min=1),
+              help='Maximum number of keep-alive connections to the server')
+@click.option("--timeout", envvar="KRONBUTE_TIMEOUT", default=30.0, type=click.FloatRange(min=0),
+              help='Timeout in seconds for every request to the server, 0 to wait forever')
+@click.option("--retries", envvar="KRONBUTE_RETRIES", default=3, type=click.IntRange(min=0),
+              help='Number of retries for idempotent requests on connection errors or gateway failures')
+@click.option("--backoff", envvar="KRONBUTE_BACKOFF", default=0.3, type=click.FloatRange(min=0),
+              help='Backoff factor in seconds between retries')
+@click.option("--partial-updates/--full-updates", envvar="KRONBUTE_PARTIAL_UPDATES", default=False,
+              help='Send only the changed fields on edit, for Kronbute servers supporting PATCH')
+@click.option("--cache-ttl", envvar="KRONBUTE_CACHE_TTL", default=10.0, type=click.FloatRange(min=0),
+              help='Seconds a cached listing is used before asking the server if it changed')
+@click.option("--cache-dir", envvar="KRONBUTE_CACHE_DIR", type=click.Path(file_okay=False),
+              help='Directory for cached server answers and parsed manifests, by default ~/.cache/kron')
+@click.option("--no-cache", envvar="KRONBUTE_NO_CACHE", is_flag=True, help='Always ask the server and parse manifests, do not cache answers')
+@click.option("--output", "-o", envvar="KRONBUTE_OUTPUT", default='table', type=click.Choice(OUTPUT_FORMATS),
+              help='Output format for listings and details, json, jsonl and csv are written as records arrive')
+@click.option("--trace", envvar="KRONBUTE_TRACE", type=click.Path(dir_okay=False, writable=True), is_eager=True,
+              expose_value=False, callback=start_trace,
+              help='Write the time of start up, imports, requests, manifest parsing and rendering to this file, in '
+                   'Chrome trace format')
+@click.option("--profile", envvar="KRONBUTE_PROFILE", type=click.Path(dir_okay=False, writable=True), is_eager=True,
+              expose_value=False, callback=start_profile, help='Write cProfile statistics of the command to this file')
 @click.pass_context
-def cli(ctx, server: str):
-    server = BaseServer(server)
-    ctx.obj = server
+def cli(ctx, server: str, pool_size: int, timeout: float, retries: int, backoff: float, partial_updates: bool,
+        cache_ttl: float, cache_dir: Optional[str], no_cache: bool, output: str):
+    ctx.meta['kron.output'] = output
+    ctx.meta['kron.manifest_cache_dir'] = None if no_cache else cache_dir or default_directory()
+    cache = None if no_cache else ResponseCache(cache_dir, cache_ttl)
+    session = None
+    if daemon_sessions is not None:
+        session = daemon_sessions.get((pool_size, retries, backoff))
+        if cache is not None:
+            key = (cache.directory, cache_ttl)
+            cache = daemon_caches.setdefault(key, MemoryResponseCache(cache.directory, cache_ttl))
 
+    # Most of the time creating a server goes to importing requests
+    with trace.span('server session', 'import'):
+        server = BaseServer(server, pool_size=pool_size, timeout=timeout or None, retries=retries, backoff=backoff,
+                            partial_updates=partial_updates, cache=cache, session=session)
+    if trace.tracing():
+        trace.instrument_session(server.session)
+
+    if daemon_sessions is not None:
+        daemon_sessions[(pool_size, retries, backoff)] = server.session
+    else:
+        ctx.call_on_close(server.close)
+    ctx.obj = server
 
-cli.add_command(job_group)
-cli.add_command(info_command)
-cli.add_command(runs_group)
-cli.add_command(groups_group)
 
 if __name__ == '__main__':
     cli()
@@ -0,0 +1,298 @@
+import glob
+import hashlib
+import json
+import os
+from typing import Dict, Any, List, Optional, Iterable, Tuple, Callable, NamedTuple
+
+import click
+import yaml
+
+from . import validation, trace
+
+MANIFEST_EXTENSIONS = ('.yml', '.yaml')
+KINDS = ('job', 'group')
+CRON_TYPES = ('UNIX', 'QUARTZ')
+
+# Fields of the manifests and the YAML type of their values
+JOB_FIELDS = {'kind': str, 'name': str, 'alias': str, 'image': str, 'schedule': str, 'timezone': str, 'crontype': str,
+              'entrypoint': str, 'groups': list, 'environment': dict}
+GROUP_FIELDS = {'kind': str, 'name': str, 'environment': dict}
+TYPE_NAMES = {str: 'a string', list: 'a list', dict: 'a mapping'}
+
+# libyaml bindings are several times faster, the pure Python classes are used when PyYAML was built without them
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+SafeDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+# Part of the key of cached manifests, bump it when the checks change so cached problems are checked again
+CACHE_VERSION = b'kron-manifest-1\n'
+
+
+class ManifestError(Exception):
+    def __init__(self, path: str, message: str):
+        super().__init__(f'{path}: {message}')
+        self.path = path
+        self.message = message
+
+
+def find_manifests(paths: Iterable[str]) -> List[str]:
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            candidates = [os.path.join(root, name) for root, _, names in os.walk(path) for name in names]
+        else:
+            candidates = glob.glob(path, recursive=True) or [path]
+
+        found.extend(candidate for candidate in sorted(candidates) if candidate.endswith(MANIFEST_EXTENSIONS))
+
+    return sorted(set(found), key=found.index)
+
+
+class ParsedManifest(NamedTuple):
+    data: Dict[str, Any]
+    problems: List[str]
+
+
+def problems(manifest: Dict[str, Any]) -> List[str]:
+    manifest_kind = kind(manifest)
+    if manifest_kind == 'job':
+        return job_problems(manifest)
+    if manifest_kind == 'group':
+        return group_problems(manifest)
+    return [f"unknown kind '{manifest_kind}', it should be one of {', '.join(KINDS)}"]
+
+
+class ManifestCache:
+    """Parsed and checked manifests keyed by a hash of the file content, so unchanged files are never parsed again"""
+
+    def __init__(self, directory: str):
+        self.directory = os.path.join(directory, 'manifests')
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest + '.json')
+
+    def get(self, digest: str) -> Optional[List[ParsedManifest]]:
+        try:
+            with open(self.path(digest), 'r') as document:
+                return [ParsedManifest(**entry) for entry in json.load(document)]
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def put(self, digest: str, documents: List[ParsedManifest]):
+        entries = [document._asdict() for document in documents]
+        # Documents JSON cannot hold as they are, such as dates or numbers as keys, are parsed every time
+        try:
+            content = json.dumps(entries)
+        except (TypeError, ValueError):
+            return
+        if [entry['data'] for entry in json.loads(content)] != [document.data for document in documents]:
+            return
+
+        path = self.path(digest)
+        try:
+            os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+            temporary = f'{path}.{os.getpid()}.tmp'
+            with open(temporary, 'w') as document:
+                document.write(content)
+            os.replace(temporary, path)
+        except OSError:
+            pass
+
+
+def current_cache() -> Optional[ManifestCache]:
+    ctx = click.get_current_context(silent=True)
+    directory = ctx.meta.get('kron.manifest_cache_dir') if ctx else None
+    return ManifestCache(directory) if directory else None
+
+
+def parse_documents(path: str, cache: Optional[ManifestCache] = None) -> List[ParsedManifest]:
+    """Every document of a manifest file with its problems, a file may hold many jobs separated with '---'"""
+    with open(path, 'rb') as document:
+        content = document.read()
+
+    digest = hashlib.sha256(CACHE_VERSION + content).hexdigest()
+    documents = cache.get(digest) if cache else None
+    if documents is not None:
+        return documents
+
+    documents = []
+    with trace.span(path, 'yaml', bytes=len(content)):
+        for data in yaml.load_all(content, Loader=SafeLoader):
+            if data is None:
+                continue
+            if not isinstance(data, dict):
+                raise ManifestError(path, 'manifest should be a YAML mapping')
+            documents.append(ParsedManifest(data, problems(data)))
+
+    if not documents:
+        raise ManifestError(path, 'manifest should be a YAML mapping')
+
+    if cache:
+        cache.put(digest, documents)
+    return documents
+
+
+def parse(path: str, cache: Optional[ManifestCache] = None) -> ParsedManifest:
+    documents = parse_documents(path, cache)
+    if len(documents) > 1:
+        raise ManifestError(path, f'expected a single manifest, found {len(documents)}')
+    return documents[0]
+
+
+def load(path: str, cache: Optional[ManifestCache] = None) -> Dict[str, Any]:
+    return parse(path, cache).data
+
+
+def dump(data: Dict[str, Any]) -> str:
+    return yaml.dump(data, Dumper=SafeDumper, default_flow_style=False)
+
+
+def dump_all(documents: Iterable[Dict[str, Any]]) -> str:
+    return yaml.dump_all(documents, Dumper=SafeDumper, default_flow_style=False, explicit_start=True)
+
+
+def split_image(image: str) -> Tuple[str, str]:
+    name, _, tag = image.partition(':')
+    return name, tag or 'latest'
+
+
+def kind(manifest: Dict[str, Any]) -> str:
+    """Manifests describe jobs unless they say 'kind: group'"""
+    return str(manifest.get('kind') or 'job').lower()
+
+
+def _field_problems(manifest: Dict[str, Any], fields: Dict[str, type], required: Iterable[str]) -> List[str]:
+    problems = [f"missing required field '{field}'" for field in required if manifest.get(field) in (None, '')]
+
+    for field, value in manifest.items():
+        if field not in fields:
+            problems.append(f"unknown field '{field}'")
+        elif value is not None and not isinstance(value, fields[field]):
+            problems.append(f"field '{field}' should be {TYPE_NAMES[fields[field]]}")
+
+    environment = manifest.get('environment')
+    if isinstance(environment, dict):
+        for name, value in environment.items():
+            if not isinstance(name, str) or isinstance(value, (dict, list)):
+                problems.append(f"environment variable '{name}' should be a name with a plain value")
+
+    return problems
+
+
+def _check(problems: List[str], field: str, value: Any, check: Callable[..., Any], *args):
+    if isinstance(value, str):
+        try:
+            check(value, *args)
+        except validation.ValidationError as err:
+            problems.append(f"invalid {field} '{value}', {err}")
+
+
+def job_problems(manifest: Dict[str, Any]) -> List[str]:
+    """Everything wrong in a job manifest, without contacting the server"""
+    problems = _field_problems(manifest, JOB_FIELDS, ('name', 'image', 'schedule'))
+
+    cron_type = manifest.get('crontype') or 'UNIX'
+    if isinstance(cron_type, str) and cron_type.upper() not in CRON_TYPES:
+        problems.append(f"invalid crontype '{cron_type}', it should be one of {', '.join(CRON_TYPES)}")
+        cron_type = None
+
+    if isinstance(manifest.get('image'), str):
+        image, tag = split_image(manifest['image'])
+        _check(problems, 'image', image, validation.validate_image)
+        _check(problems, 'tag', tag, validation.validate_tag)
+
+    _check(problems, 'schedule', manifest.get('schedule'), validation.validate_cron,
+           cron_type.upper() if isinstance(cron_type, str) else None)
+    _check(problems, 'alias', manifest.get('alias'), validation.validate_alias)
+    _check(problems, 'timezone', manifest.get('timezone'), validation.validate_timezone)
+
+    groups = manifest.get('groups')
+    if isinstance(groups, list) and not all(isinstance(group, str) for group in groups):
+        problems.append("field 'groups' should be a list of group names")
+
+    return problems
+
+
+def group_problems(manifest: Dict[str, Any]) -> List[str]:
+    return _field_problems(manifest, GROUP_FIELDS, ('name',))
+
+
+def to_job(path: str, manifest: Dict[str, Any], known_problems: Optional[List[str]] = None) -> Dict[str, Any]:
+    if kind(manifest) != 'job':
+        raise ManifestError(path, f"'{kind(manifest)}' manifests do not describe jobs")
+
+    found = job_problems(manifest) if known_problems is None else known_problems
+    if found:
+        raise ManifestError(path, found[0])
+
+    image, tag = split_image(manifest['image'])
+    cron_type = str(manifest.get('crontype') or 'UNIX').upper()
+    schedule = validation.validate_cron(manifest['schedule'], cron_type)
+
+    return {'name': manifest['name'],
+            'alias': manifest.get('alias'),
+            'image': image,
+            'tag': tag,
+            'schedule': schedule,
+            'cronType': cron_type,
+            'timeZone': manifest.get('timezone') or 'UTC',
+            'entryPoint': manifest.get('entrypoint'),
+            'groups': list(manifest.get('groups') or []),
+            'environment': manifest.get('environment') or {}}
+
+
+def from_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    data = {
+        'name': job['name'],
+        'image': f"{job['image']}:{job['tag']}",
+        'schedule': job['schedule'],
+        'timezone': job['timeZone']
+    }
+    if 'alias' in job:
+        data['alias'] = job['alias']
+    if 'entryPoint' in job and job['entryPoint']:
+        data['entrypoint'] = job['entryPoint']
+
+    if 'environment' in job:
+        data['environment'] = job['environment']
+
+    if 'groups' in job:
+        data['groups'] = job['groups']
+
+    # UNIX is the default, Quartz schedules would not be understood without it
+    if job.get('cronType') and job['cronType'].upper() != 'UNIX':
+        data['crontype'] = job['cronType']
+
+    return data
+
+
+def from_group(group: Dict[str, Any]) -> Dict[str, Any]:
+    return {'kind': 'group', 'name': group['name'], 'environment': group.get('environment') or {}}
+
+
+def find_job(data: Dict[str, Any], jobs: Iterable[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Existing job for a manifest, matched by alias when the manifest has one, otherwise by name"""
+    key, value = ('alias', data['alias']) if data.get('alias') else ('name', data['name'])
+    return next((job for job in jobs if job.get(key) == value), None)
+
+
+def job_changes(data: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Tuple[Any, Any]]:
+    """Fields that differ between a manifest and an existing job, fields unknown to the existing job are skipped"""
+    changes = {}
+    for field, value in data.items():
+        if field not in current or (value is None and not current[field]):
+            continue
+
+        existing = current[field]
+        if field == 'groups':
+            existing, value = sorted(existing or []), sorted(value)
+        elif field == 'environment':
+            # The server keeps variables as strings, YAML numbers and booleans would otherwise never match
+            existing = {key: str(item) for key, item in (existing or {}).items()}
+            value = {key: str(item) for key, item in value.items()}
+        elif field == 'cronType':
+            existing = str(existing or 'UNIX').upper()
+
+        if existing != value:
+            changes[field] = (current[field], data[field])
+
+    return changes
@@ -0,0 +1,71 @@
+import csv
+import json
+import sys
+from typing import Iterable, Dict, Any, Sequence, TextIO, Optional
+
+import click
+
+OUTPUT_FORMATS = ['table', 'json', 'jsonl', 'csv']
+
+
+def current_format() -> str:
+    ctx = click.get_current_context(silent=True)
+    return ctx.meta.get('kron.output', 'table') if ctx else 'table'
+
+
+def is_table() -> bool:
+    return current_format() == 'table'
+
+
+def _csv_value(value: Any) -> Any:
+    return json.dumps(value) if isinstance(value, (dict, list)) else value
+
+
+class RecordWriter:
+    """Writes records as soon as they are given, json output is a single array written item by item"""
+
+    def __init__(self, output_format: str, fields: Sequence[str], stream: Optional[TextIO] = None):
+        self.output_format = output_format
+        self.fields = fields
+        self.stream = stream or sys.stdout
+        self.count = 0
+        self.csv = None
+
+    def write(self, record: Dict[str, Any]):
+        if self.output_format == 'jsonl':
+            self.stream.write(json.dumps(record) + '\n')
+
+        elif self.output_format == 'json':
+            self.stream.write(('[\n' if self.count == 0 else ',\n') + json.dumps(record))
+
+        elif self.output_format == 'csv':
+            if self.csv is None:
+                self.csv = csv.writer(self.stream, lineterminator='\n')
+                self.csv.writerow(self.fields)
+            self.csv.writerow([_csv_value(record.get(field)) for field in self.fields])
+
+        self.count += 1
+
+    def close(self):
+        if self.output_format == 'json':
+            self.stream.write('[]\n' if self.count == 0 else '\n]\n')
+
+        elif self.output_format == 'csv' and self.csv is None:
+            csv.writer(self.stream, lineterminator='\n').writerow(self.fields)
+
+        self.stream.flush()
+
+
+def write_records(records: Iterable[Dict[str, Any]], fields: Sequence[str]):
+    writer = RecordWriter(current_format(), fields)
+    for record in records:
+        writer.write(record)
+    writer.close()
+
+
+def write_record(record: Dict[str, Any], fields: Sequence[str]):
+    """Single entity output, json is the object itself instead of an array"""
+    if current_format() == 'json':
+        click.echo(json.dumps(record, indent=2))
+    else:
+        write_records([record], fields)
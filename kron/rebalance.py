@@ -0,0 +1,157 @@
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional, NamedTuple
+
+from .cron import QUARTZ, CronSyntaxError, expand_macro, to_quartz, detect_type
+from .forecast import Forecast, ScheduleKey
+
+SLOTS = 60
+
+
+class Move(NamedTuple):
+    job: Dict[str, Any]
+    current: str
+    proposed: str
+
+
+class Movable(NamedTuple):
+    job: Dict[str, Any]
+    key: ScheduleKey
+    fields: List[str]
+    minute_index: int
+    second_index: Optional[int]
+
+
+def movable(job: Dict[str, Any]) -> Optional[Movable]:
+    """Jobs firing at a single fixed minute can be moved to another minute of the hour without changing anything
+    else, Quartz ones with a fixed second can get another second as well"""
+    expression = job.get('schedule') or ''
+    cron_type = (job.get('cronType') or detect_type(expression)).upper()
+
+    expanded = expand_macro(expression)
+    if expanded:
+        expression = to_quartz(expanded) if cron_type == QUARTZ else expanded
+
+    fields = expression.split()
+    minute_index = 1 if cron_type == QUARTZ else 0
+    if len(fields) <= minute_index or not fields[minute_index].isdigit():
+        return None
+
+    second_index = 0 if cron_type == QUARTZ and fields[0].isdigit() else None
+    key = ScheduleKey(job.get('schedule') or '', job.get('cronType'), job.get('timeZone') or 'UTC')
+    return Movable(job, key, fields, minute_index, second_index)
+
+
+def _slot_masks(minutes: int) -> List[int]:
+    """Minutes of a window starting at the top of an hour falling in every minute of the hour"""
+    every_hour = sum(1 << position for position in range(0, minutes, SLOTS))
+    return [every_hour << slot for slot in range(SLOTS)]
+
+
+def _pick_second(used: Dict[int, int]) -> int:
+    """Least used second, as far as possible from the seconds already taken"""
+    taken = [second for second, count in used.items() if count]
+    if not taken:
+        return 0
+
+    least = min(used.get(second, 0) for second in range(SLOTS))
+    candidates = [second for second in range(SLOTS) if used.get(second, 0) == least]
+    return max(candidates, key=lambda second: (min(min(abs(second - other), SLOTS - abs(second - other))
+                                                   for other in taken), -second))
+
+
+class Rebalance:
+    """Spreads the starts of jobs over the minutes of the hour, in UTC so jobs in every time zone are compared, by
+    moving the jobs in the busiest minutes greedily to the least busy ones"""
+
+    def __init__(self, start: datetime, minutes: int):
+        self.forecast = Forecast(start.replace(minute=0), minutes)
+        self.slot_masks = _slot_masks(minutes)
+        self.profiles: Dict[ScheduleKey, Dict[int, int]] = {}
+        self.loads = [0] * SLOTS
+
+    def profile(self, key: ScheduleKey) -> Dict[int, int]:
+        """Starts of a schedule over the window in every minute of the hour"""
+        if key not in self.profiles:
+            mask, fires = self.forecast.schedules[key]
+            counts = {slot: bin(mask & slot_mask).count('1') * fires for slot, slot_mask in enumerate(self.slot_masks)}
+            self.profiles[key] = {slot: count for slot, count in counts.items() if count}
+        return self.profiles[key]
+
+    def plan(self, jobs: Iterable[Dict[str, Any]], include_paused: bool = False,
+             max_starts: Optional[int] = None, max_moves: Optional[int] = None) -> List[Move]:
+        jobs = list(jobs)
+        self.forecast.add_jobs(jobs, include_paused)
+
+        candidates = []
+        for job in jobs:
+            if job.get('paused') and not include_paused:
+                continue
+
+            key = ScheduleKey(job.get('schedule') or '', job.get('cronType'), job.get('timeZone') or 'UTC')
+            if key not in self.forecast.schedules:
+                continue
+
+            for slot, count in self.profile(key).items():
+                self.loads[slot] += count
+
+            try:
+                candidate = movable(job)
+            except CronSyntaxError:
+                candidate = None
+            if candidate is not None and self.profile(key):
+                candidates.append(candidate)
+
+        # The busiest minutes are emptied first, frequent jobs move first as they weigh the most
+        target = max_starts or -(-sum(self.loads) // SLOTS)
+        candidates.sort(key=lambda item: (-max(self.loads[slot] for slot in self.profile(item.key)),
+                                          -sum(self.profile(item.key).values()), str(item.job.get('id'))))
+
+        seconds: Dict[int, Dict[int, int]] = {slot: {} for slot in range(SLOTS)}
+        for candidate in candidates:
+            if candidate.second_index is not None:
+                used = seconds[min(self.profile(candidate.key))]
+                second = int(candidate.fields[candidate.second_index])
+                used[second] = used.get(second, 0) + 1
+
+        moves = []
+        for candidate in candidates:
+            if max_moves is not None and len(moves) >= max_moves:
+                break
+            move = self._move(candidate, target, seconds)
+            if move is not None:
+                moves.append(move)
+        return moves
+
+    def _move(self, candidate: Movable, target: int, seconds: Dict[int, Dict[int, int]]) -> Optional[Move]:
+        profile = self.profile(candidate.key)
+        if max(self.loads[slot] for slot in profile) <= target:
+            return None
+
+        for slot, count in profile.items():
+            self.loads[slot] -= count
+
+        def cost(shift: int):
+            loads = [self.loads[(slot + shift) % SLOTS] + count for slot, count in profile.items()]
+            return max(loads), sum(loads), min(shift, SLOTS - shift)
+
+        shift = min(range(SLOTS), key=cost)
+        if cost(shift)[0] >= cost(0)[0]:
+            shift = 0
+
+        for slot, count in profile.items():
+            self.loads[(slot + shift) % SLOTS] += count
+
+        if not shift:
+            return None
+
+        fields = list(candidate.fields)
+        fields[candidate.minute_index] = str((int(fields[candidate.minute_index]) + shift) % SLOTS)
+        if candidate.second_index is not None:
+            second = int(fields[candidate.second_index])
+            seconds[min(profile)][second] -= 1
+            used = seconds[(min(profile) + shift) % SLOTS]
+            second = _pick_second(used)
+            used[second] = used.get(second, 0) + 1
+            fields[candidate.second_index] = str(second)
+
+        return Move(candidate.job, candidate.job.get('schedule'), ' '.join(fields))
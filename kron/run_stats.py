@@ -0,0 +1,158 @@
+from datetime import datetime
+from typing import Dict, Any, Optional, Iterable, List, Tuple, Sequence
+
+from .kronbute.timestamps import parse_timestamp
+from .sketch import DurationSketch
+
+GROUPINGS = ('job', 'image', 'hour', 'day', 'week')
+FINISHED = ('SUCCESS', 'FAILED')
+# Kronbute versions name the start and the end of a run differently, the first one present is used
+START_FIELDS = ('startedOn', 'startedAt', 'createdOn')
+FINISH_FIELDS = ('finishedOn', 'endedOn', 'on')
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _first(run: Dict[str, Any], fields: Sequence[str]) -> Optional[datetime]:
+    for field in fields:
+        if run.get(field) is not None:
+            return parse_timestamp(run[field])
+    return None
+
+
+def bucket(grouping: str, moment: Optional[datetime]) -> str:
+    if moment is None:
+        return 'unknown'
+    if grouping == 'hour':
+        return moment.strftime('%Y-%m-%d %H:00')
+    if grouping == 'day':
+        return moment.strftime('%Y-%m-%d')
+    year, week, _ = moment.isocalendar()
+    return f'{year}-W{week:02d}'
+
+
+class GroupStats:
+    """Counts, failure streaks and duration sketch of the runs of a group, in the order the server sends them"""
+
+    __slots__ = ('runs', 'success', 'failed', 'leading', 'trailing', 'longest', 'first_id', 'last_id', 'sketch')
+
+    def __init__(self, relative_accuracy: float):
+        self.runs = 0
+        self.success = 0
+        self.failed = 0
+        # Failures before the first success and since the last one, which is the current streak depends on the
+        # order of the history
+        self.leading: Optional[int] = None
+        self.trailing = 0
+        self.longest = 0
+        self.first_id = None
+        self.last_id = None
+        self.sketch = DurationSketch(relative_accuracy)
+
+    def add(self, run_id: Any, status: str, duration: Optional[float]):
+        self.runs += 1
+        if self.first_id is None:
+            self.first_id = run_id
+        self.last_id = run_id
+
+        if status == 'FAILED':
+            self.failed += 1
+            self.trailing += 1
+            self.longest = max(self.longest, self.trailing)
+        elif status == 'SUCCESS':
+            self.success += 1
+            if self.leading is None:
+                self.leading = self.trailing
+            self.trailing = 0
+
+        if duration is not None:
+            self.sketch.add(duration)
+
+    @property
+    def current_streak(self) -> int:
+        """Failures since the last success, the history comes newest first when ids go down"""
+        try:
+            newest_first = self.first_id is not None and self.last_id < self.first_id
+        except TypeError:
+            newest_first = False
+        if newest_first:
+            return self.trailing if self.leading is None else self.leading
+        return self.trailing
+
+    @property
+    def failure_rate(self) -> Optional[float]:
+        finished = self.success + self.failed
+        return self.failed / finished if finished else None
+
+
+class RunStats:
+    """Statistics of a run history read in a single pass, memory grows with the number of groups, not of runs"""
+
+    def __init__(self, by: Sequence[str] = ('job',), images: Optional[Dict[Any, str]] = None,
+                 relative_accuracy: float = 0.01):
+        unknown = [grouping for grouping in by if grouping not in GROUPINGS]
+        if unknown:
+            raise ValueError(f"unknown groupings {', '.join(unknown)}")
+
+        self.by = tuple(by)
+        self.images = images or {}
+        self.relative_accuracy = relative_accuracy
+        self.groups: Dict[Tuple[str, ...], GroupStats] = {}
+        self.job_names: Dict[Any, str] = {}
+        self.runs = 0
+
+    def _key(self, run: Dict[str, Any], moment: Optional[datetime]) -> Tuple[str, ...]:
+        key = []
+        for grouping in self.by:
+            if grouping == 'job':
+                key.append(str(run.get('jobId')))
+            elif grouping == 'image':
+                key.append(self.images.get(run.get('jobId'), 'unknown'))
+            else:
+                key.append(bucket(grouping, moment))
+        return tuple(key)
+
+    def add(self, run: Dict[str, Any]):
+        self.runs += 1
+        if run.get('jobName'):
+            self.job_names[str(run.get('jobId'))] = run['jobName']
+
+        status = str(run.get('status') or '').upper()
+        finished_on = _first(run, FINISH_FIELDS)
+        started_on = _first(run, START_FIELDS) if status in FINISHED else None
+        duration = (finished_on - started_on).total_seconds() if started_on and finished_on else None
+
+        key = self._key(run, finished_on or started_on)
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = GroupStats(self.relative_accuracy)
+        group.add(run.get('id'), status, duration)
+
+    def add_runs(self, runs: Iterable[Dict[str, Any]]):
+        for run in runs:
+            self.add(run)
+
+    def label(self, key: Tuple[str, ...]) -> List[str]:
+        """Group values for people, jobs by their name"""
+        labels = []
+        for grouping, value in zip(self.by, key):
+            if grouping == 'job':
+                name = self.job_names.get(value)
+                labels.append(f'{name} ({value})' if name else value)
+            else:
+                labels.append(value)
+        return labels
+
+    def records(self) -> List[Dict[str, Any]]:
+        records = []
+        # Job ids in numeric order, everything else as text
+        for key, group in sorted(self.groups.items(), key=lambda item: tuple(
+                (0, int(value), '') if value.isdigit() else (1, 0, value) for value in item[0])):
+            record: Dict[str, Any] = dict(zip(self.by, self.label(key)))
+            record.update({'runs': group.runs, 'success': group.success, 'failed': group.failed,
+                           'failure_rate': group.failure_rate, 'current_streak': group.current_streak,
+                           'longest_streak': group.longest})
+            for quantile in QUANTILES:
+                record[f'p{int(quantile * 100)}'] = group.sketch.quantile(quantile)
+            record['max'] = group.sketch.maximum
+            records.append(record)
+        return records
@@ -1,8 +1,17 @@
+import time
+from datetime import datetime
+from typing import Optional, Union, Tuple
+
 import click
-from terminaltables import AsciiTable
 
-from .. import util
-from ..kronbute import BaseServer, RunsServer
+from .. import util, output, completion
+from ..kronbute import BaseServer, RunsServer, JobServer
+from ..run_stats import RunStats, GROUPINGS
+
+
+LIST_FIELDS = ['id', 'jobId', 'jobName', 'status', 'on']
+STATS_FIELDS = ['runs', 'success', 'failed', 'failure_rate', 'current_streak', 'longest_streak', 'p50', 'p90', 'p99',
+                'max']
 
 
 @click.group(help='Group for all the commands related to job runs')
@@ -11,13 +20,122 @@ def runs(ctx):
     ctx.obj = RunsServer(ctx.obj)
 
 
-@runs.command('list', help='List all the jobs in the server')
+@runs.command('list', help='List the job runs in the server, rows are printed as they arrive')
+@click.option('--limit', help='Maximum number of runs to list', type=click.IntRange(min=1))
+@click.option('--since', help='Only runs updated on or after this date (UTC)', type=click.DateTime())
+@click.option('--job', 'job_id', help='Only runs of this job id or alias', type=util.INT_ALIAS,
+              autocompletion=completion.complete_jobs)
+@click.option('--page-size', help='Number of runs requested to the server at once', default=500,
+              type=click.IntRange(min=1))
 @click.pass_obj
-def list_runs(server: RunsServer):
-    job_runs = server.list()
-    data = [['Id', 'Job id', 'Job name', 'Last Status', 'Updated on']]
+def list_runs(server: RunsServer, limit: Optional[int], since: Optional[datetime], job_id: Optional[Union[int, str]],
+              page_size: int):
+    if isinstance(job_id, str):
+        job_id = JobServer(server.server).view(job_id)['id']
+
+    job_runs = server.iterate(limit=limit, since=since, job_id=job_id, page_size=page_size)
+    if not output.is_table():
+        output.write_records(job_runs, LIST_FIELDS)
+        return
+
+    table = util.StreamingTable(['Id', 'Job id', 'Job name', 'Last Status', 'Updated on'], [10, 8, 40, 11, 26])
     for job_run in job_runs:
-        data.append([job_run['id'], job_run['jobId'], job_run['jobName'], util.format_status(job_run['status']), job_run['on']])
+        table.echo([job_run['id'], job_run['jobId'], job_run['jobName'], job_run['status'], job_run['on']],
+                   styles={3: util.format_status})
+    table.close()
+
+
+@runs.command('watch', help='Watch the latest job runs, only the rows that change are redrawn')
+@click.option('--limit', help='Number of runs to show', default=20, type=click.IntRange(min=1))
+@click.option('--job', 'job_id', help='Only runs of this job id or alias', type=util.INT_ALIAS,
+              autocompletion=completion.complete_jobs)
+@click.option('--interval', help='Seconds between checks with the server', default=2.0,
+              type=click.FloatRange(min=0.1))
+@click.pass_obj
+def watch_runs(server: RunsServer, limit: int, job_id: Optional[Union[int, str]], interval: float):
+    if isinstance(job_id, str):
+        job_id = JobServer(server.server).view(job_id)['id']
+
+    table = util.LiveTable(['Id', 'Job id', 'Job name', 'Last Status', 'Updated on'], [10, 8, 40, 11, 26])
+
+    try:
+        while True:
+            job_runs = server.poll(limit=limit, job_id=job_id)
+            if job_runs is not None:
+                table.update({job_run['id']: ([job_run['id'], job_run['jobId'], job_run['jobName'], job_run['status'],
+                                               job_run['on']], {3: util.format_status})
+                              for job_run in job_runs})
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+
+
+STATS_SORTS = ['group', 'runs', 'failed', 'failure_rate', 'current_streak', 'p50', 'p90', 'p99', 'max']
+
+
+def _duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return '-'
+    if seconds < 60:
+        return f'{seconds:.1f}s'
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    if minutes < 60:
+        return f'{minutes}m {seconds:02d}s'
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours}h {minutes:02d}m'
+
+
+@runs.command('stats', help='Runs, failures, failure streaks and duration percentiles by job, image or time, '
+                            'reading the run history once')
+@click.option('--by', 'groupings', multiple=True, type=click.Choice(GROUPINGS),
+              help='Group the runs by job (the default), image, hour, day or week, can be repeated')
+@click.option('--since', help='Only runs updated on or after this date (UTC)', type=click.DateTime())
+@click.option('--job', 'job_id', help='Only runs of this job id or alias', type=util.INT_ALIAS,
+              autocompletion=completion.complete_jobs)
+@click.option('--limit', help='Maximum number of runs to read', type=click.IntRange(min=1))
+@click.option('--sort', help='Order of the groups, the largest first but for group', default='group',
+              type=click.Choice(STATS_SORTS))
+@click.option('--top', help='Only show this number of groups', type=click.IntRange(min=1))
+@click.option('--page-size', help='Number of runs requested to the server at once', default=500,
+              type=click.IntRange(min=1))
+@click.pass_obj
+def run_stats(server: RunsServer, groupings: Tuple[str], since: Optional[datetime],
+              job_id: Optional[Union[int, str]], limit: Optional[int], sort: str, top: Optional[int], page_size: int):
+    groupings = groupings or ('job',)
+    jobs = JobServer(server.server)
+    if isinstance(job_id, str):
+        job_id = jobs.view(job_id)['id']
+
+    images = {}
+    if 'image' in groupings:
+        images = {job['id']: f"{job['image']}:{job['tag']}" for job in jobs.list()}
+
+    stats = RunStats(groupings, images)
+    stats.add_runs(server.iterate(limit=limit, since=since, job_id=job_id, page_size=page_size))
+
+    records = stats.records()
+    if sort != 'group':
+        records.sort(key=lambda record: -1 if record[sort] is None else record[sort], reverse=True)
+    if top:
+        records = records[:top]
+
+    if not output.is_table():
+        output.write_records(records, list(groupings) + STATS_FIELDS)
+        return
+
+    from terminaltables import AsciiTable
 
-    table = AsciiTable(data)
+    rows = [[record[grouping] for grouping in groupings] +
+            [record['runs'], record['success'], record['failed'],
+             '-' if record['failure_rate'] is None else f"{record['failure_rate']:.1%}",
+             click.style(str(record['current_streak']), fg='red' if record['current_streak'] else None),
+             record['longest_streak']] + [_duration(record[field]) for field in ('p50', 'p90', 'p99', 'max')]
+            for record in records]
+    headers = [grouping.capitalize() for grouping in groupings] + \
+              ['Runs', 'Success', 'Failed', 'Failure rate', 'Streak', 'Longest streak', 'p50', 'p90', 'p99', 'Max']
+    table = AsciiTable([headers] + rows)
+    for column in range(len(groupings), len(headers)):
+        table.justify_columns[column] = 'right'
     click.echo(table.table)
+    click.echo(f'{stats.runs} runs in {len(stats.groups)} groups, durations within '
+               f'{stats.relative_accuracy:.0%}')
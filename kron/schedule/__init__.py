@@ -0,0 +1,3 @@
+from .command_group import schedule as schedule_group
+
+__all__ = ['schedule_group']
@@ -0,0 +1,14 @@
+import click
+
+from .. import util
+from ..kronbute import JobServer
+
+
+@click.group(help='Group for the commands looking at the schedules of all the jobs', cls=util.LazyGroup,
+             lazy_commands={
+                 'forecast': 'kron.schedule.forecast:forecast',
+                 'rebalance': 'kron.schedule.rebalance:rebalance'
+             })
+@click.pass_context
+def schedule(ctx):
+    ctx.obj = JobServer(ctx.obj)
@@ -0,0 +1,66 @@
+from datetime import datetime
+from typing import Optional, Dict, List, Tuple
+
+import click
+
+from .. import output
+from ..forecast import Forecast
+from ..kronbute import JobServer
+
+FORECAST_FIELDS = ['time', 'starts']
+
+
+def buckets(histogram: Dict[int, int]) -> List[Tuple[str, int]]:
+    """Histogram grouped in powers of two, a week has thousands of minutes but a handful of buckets"""
+    grouped: Dict[Tuple[int, int], int] = {}
+    for starts, minutes in histogram.items():
+        low = 1 << (starts.bit_length() - 1) if starts else 0
+        high = low * 2 - 1 if low else 0
+        grouped[(low, high)] = grouped.get((low, high), 0) + minutes
+
+    return [(str(low) if low == high else f'{low}-{high}', minutes) for (low, high), minutes in sorted(grouped.items())]
+
+
+@click.command(help='Forecast the number of jobs starting every minute and show the worst hotspots')
+@click.option('--start', type=click.DateTime(), help='Start of the forecast (UTC), by default now')
+@click.option('--days', type=click.IntRange(1, 31), default=7, show_default=True, help='Days to forecast')
+@click.option('--top', type=click.IntRange(min=1), default=10, show_default=True, help='Number of hotspots to show')
+@click.option('--include-paused', is_flag=True, default=False, help='Count paused jobs as if they were running')
+@click.pass_obj
+def forecast(server: JobServer, start: Optional[datetime], days: int, top: int, include_paused: bool):
+    result = Forecast(start or datetime.utcnow(), days * 24 * 60)
+    result.add_jobs(server.list(), include_paused)
+
+    for job, reason in result.invalid:
+        click.secho(f"[WARNING] Job {job.get('id')} ({job.get('name')}) is not forecast: {reason}", err=True,
+                    fg='yellow')
+
+    counts = result.counts()
+    if not output.is_table():
+        output.write_records(({'time': result.time(minute).isoformat(), 'starts': starts}
+                              for minute, starts in enumerate(counts)), FORECAST_FIELDS)
+        return
+
+    from terminaltables import AsciiTable
+
+    skipped = f', {result.paused} paused jobs skipped' if result.paused else ''
+    click.echo(f'Forecast of {result.jobs} jobs from {result.time(0):%Y-%m-%d %H:%M} to '
+               f'{result.time(result.minutes):%Y-%m-%d %H:%M} UTC{skipped}')
+
+    histogram = buckets(result.histogram())
+    widest = max(minutes for _, minutes in histogram)
+    data = [['Starts per minute', 'Minutes', '']]
+    for label, minutes in histogram:
+        data.append([label, minutes, '#' * max(1, round(40 * minutes / widest))])
+    click.echo(AsciiTable(data).table)
+
+    hotspots = [hotspot for hotspot in result.hotspots(top) if hotspot.starts > 1]
+    if not hotspots:
+        click.echo('No minute has more than one job starting')
+        return
+
+    data = [['Time (UTC)', 'Starts', 'Schedules']]
+    for hotspot in hotspots:
+        schedules = '\n'.join(f'{jobs} x {key.expression} ({key.timezone})' for key, jobs in hotspot.contributors)
+        data.append([f'{result.time(hotspot.minute):%Y-%m-%d %H:%M}', hotspot.starts, schedules])
+    click.echo(AsciiTable(data, 'Hotspots').table)
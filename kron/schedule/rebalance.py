@@ -0,0 +1,92 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional, List
+
+import click
+
+from .. import util, output
+from ..forecast import Forecast
+from ..rebalance import Rebalance, Move
+from ..kronbute import JobServer, ServerError, NotFoundError, ArgumentValidationError, AliasAlreadyExistsError, \
+    ConflictError
+
+PLAN_FIELDS = ['id', 'alias', 'name', 'timeZone', 'current', 'proposed']
+
+
+def peak(jobs, start: datetime, minutes: int, include_paused: bool) -> int:
+    forecast = Forecast(start, minutes)
+    forecast.add_jobs(jobs, include_paused)
+    return max(forecast.counts(), default=0)
+
+
+@click.command(help='Propose new minutes (and seconds for Quartz) for the jobs starting in the busiest minutes so '
+                    'starts are spread over the hour, and apply them after confirmation')
+@click.option('--days', type=click.IntRange(1, 31), default=7, show_default=True, help='Days of schedules compared')
+@click.option('--max-starts', type=click.IntRange(min=1),
+              help='Starts in a minute of the hour over the window considered busy, by default an even spread')
+@click.option('--max-moves', type=click.IntRange(min=1), help='Maximum number of jobs to move')
+@click.option('--include-paused', is_flag=True, default=False, help='Count and move paused jobs as well')
+@click.option('--workers', help='Number of concurrent requests to the server', default=8, type=click.IntRange(min=1))
+@click.option('--dry-run', help='Only show the proposed schedules', is_flag=True)
+@click.option('--yes', '-y', help='Apply the proposed schedules without asking', is_flag=True)
+@click.pass_context
+def rebalance(ctx, days: int, max_starts: Optional[int], max_moves: Optional[int], include_paused: bool,
+              workers: int, dry_run: bool, yes: bool):
+    server: JobServer = ctx.obj
+    jobs = server.list()
+
+    start = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    minutes = days * 24 * 60
+    moves = Rebalance(start, minutes).plan(jobs, include_paused, max_starts, max_moves)
+
+    if not output.is_table():
+        output.write_records(({'id': move.job['id'], 'alias': move.job.get('alias'), 'name': move.job.get('name'),
+                               'timeZone': move.job.get('timeZone'), 'current': move.current,
+                               'proposed': move.proposed} for move in moves), PLAN_FIELDS)
+    elif moves:
+        from terminaltables import AsciiTable
+
+        data = [['Id', 'Alias', 'Name/Description', 'Time Zone', 'Current', 'Proposed']]
+        for move in moves:
+            data.append([move.job['id'], util.format_none(move.job.get('alias') or ''), move.job.get('name'),
+                         move.job.get('timeZone'), move.current, click.style(move.proposed, fg='green')])
+        click.echo(AsciiTable(data).table)
+
+    if not moves:
+        click.echo('The schedules are already spread, nothing to move', err=not output.is_table())
+        return
+
+    proposed = {move.job['id']: move.proposed for move in moves}
+    after = [{**job, 'schedule': proposed[job['id']]} if job['id'] in proposed else job for job in jobs]
+    click.echo(f'Busiest minute of the next {days} days: {peak(jobs, start, minutes, include_paused)} starts now, '
+               f'{peak(after, start, minutes, include_paused)} with the {len(moves)} proposed schedules',
+               err=not output.is_table())
+
+    if dry_run:
+        return
+
+    if not yes:
+        click.confirm(f'Apply the {len(moves)} proposed schedules?', abort=True, err=True)
+
+    def apply_move(move: Move) -> List[str]:
+        job = move.job
+        try:
+            server.edit(job['id'], None, None, None, move.proposed, None, None, None, (), None, None, current_job=job)
+            return [job['id'], job.get('alias') or job.get('name'), click.style('updated', fg='green'), move.proposed]
+        except (ServerError, NotFoundError, ArgumentValidationError, AliasAlreadyExistsError, ConflictError) as ex:
+            message = getattr(ex, 'message', None) or getattr(ex, 'body', None) or type(ex).__name__
+            return [job['id'], job.get('alias') or job.get('name'), click.style('failed', fg='red'), message]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        report = list(executor.map(apply_move, moves))
+
+    failed = [row for row in report if click.unstyle(row[2]) == 'failed']
+    if failed:
+        from terminaltables import AsciiTable
+
+        click.echo(AsciiTable([['Id', 'Job', 'Result', 'Details']] + failed).table, err=True)
+        click.secho(f'\n[ERROR] {len(moves) - len(failed)} schedules updated, {len(failed)} failed', err=True,
+                    fg='red')
+        ctx.exit(1)
+
+    click.echo(util.success(f'{len(moves)} schedules updated'), err=not output.is_table())
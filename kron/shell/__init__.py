@@ -0,0 +1,3 @@
+from .command import shell
+
+__all__ = ['shell']
@@ -0,0 +1,224 @@
+"""Interactive session running kron commands one after the other in the same process
+
+Every command of the session uses the server of the session, so connections to Kronbute stay open, and its cached
+answers are also kept in memory, a command costs its requests only. Lines are split like a shell would, history and
+Tab completion of commands, options, job aliases and group names come from readline where it is available.
+"""
+import os
+import shlex
+import sys
+import traceback
+from typing import List, Optional, Tuple
+
+import click
+
+from .. import util
+from ..kronbute import MemoryResponseCache
+
+PROMPT = 'kron> '
+# Commands of the session itself, not sent to the kron commands
+EXIT_COMMANDS = frozenset(['exit', 'quit'])
+HELP_COMMAND = 'help'
+# kron commands not available inside the session
+HIDDEN_COMMANDS = frozenset(['shell'])
+HISTORY_LENGTH = 1000
+
+
+class SessionContext(click.Context):
+    """Context of the session, hidden from the usage of the commands as they are typed without it"""
+
+    @property
+    def command_path(self):
+        return self.parent.command_path
+
+
+class SessionCommands(click.MultiCommand):
+    """kron commands run with the context of the kron command starting the session, so they get its server, output
+    format and options"""
+
+    def __init__(self, root: click.Context):
+        super().__init__(root.info_name, help=f'Type a kron command, {HELP_COMMAND} COMMAND for its options or '
+                                              f'{" or ".join(sorted(EXIT_COMMANDS))} to leave, Tab completes. '
+                                              f'Options of kron such as -o json or --no-cache before a command '
+                                              f'apply to that command only')
+        self.root = root
+
+    def list_commands(self, ctx):
+        return [name for name in self.root.command.list_commands(self.root) if name not in HIDDEN_COMMANDS]
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in HIDDEN_COMMANDS:
+            return None
+        return self.root.command.get_command(self.root, cmd_name)
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        # click 7 has no way to choose the class of the context, this is what click.Command.make_context does
+        extra = dict(self.context_settings, **extra)
+        ctx = SessionContext(self, info_name=info_name, parent=parent or self.root, **extra)
+        with ctx.scope(cleanup=False):
+            self.parse_args(ctx, args)
+        return ctx
+
+    def line_root(self, args: List[str]) -> Tuple[click.Context, List[str]]:
+        """Context of kron for a line starting with its options, the options left out keep the values the session
+        started with, and so does its server when only the output format changes"""
+        command = self.root.command
+        # Only the options given in the line, environment variables were already read when the session started
+        opts, args, order = command.make_parser(self.root).parse_args(list(args))
+        params = dict(self.root.params)
+        for param in order:
+            if param.expose_value:
+                params[param.name] = param.type_cast_value(self.root, opts[param.name])
+
+        root = click.Context(command, info_name=self.root.info_name)
+        root.params = params
+        if all(params[name] == value for name, value in self.root.params.items() if name != 'output'):
+            root.obj = self.root.obj
+            root.meta.update(self.root.meta, **{'kron.output': params['output']})
+        else:
+            with root.scope(cleanup=False):
+                root.invoke(command.callback, **params)
+        return root, args
+
+    def run(self, args: List[str]) -> int:
+        """Exit code of the command, errors are printed as they would be by kron but never leave the session"""
+        root = self.root
+        try:
+            if args[0].startswith('-') and args[0] not in self.get_help_option_names(self.root):
+                root, args = self.line_root(args)
+            with self.make_context(None, args, parent=root) as ctx:
+                self.invoke(ctx)
+            return 0
+        except click.exceptions.Exit as ex:
+            return ex.exit_code
+        except click.ClickException as ex:
+            ex.show()
+            return ex.exit_code
+        except click.Abort:
+            click.echo('Aborted!', err=True)
+            return 1
+        except KeyboardInterrupt:
+            click.echo(err=True)
+            return 130
+        except SystemExit as ex:
+            return ex.code if isinstance(ex.code, int) else 1
+        except Exception as ex:
+            code = util.report_error(ex)
+            if code is None:
+                traceback.print_exc()
+                return 1
+            return code
+        finally:
+            if root is not self.root:
+                root.close()
+
+    def complete(self, line: str, incomplete: str) -> List[str]:
+        # click 7 only exposes the completion of the command line through its bash completion module
+        from click._bashcomplete import get_choices
+
+        try:
+            args = shlex.split(line)
+        except ValueError:
+            return []
+        if args[:1] == ['kron']:
+            args = args[1:]
+
+        choices = [name for name, _ in get_choices(self, None, args, incomplete)]
+        if not args:
+            choices.extend(sorted(name for name in EXIT_COMMANDS | {HELP_COMMAND} if name.startswith(incomplete)))
+        return choices
+
+
+def _readline(commands: SessionCommands, history: Optional[str]):
+    """Enables history and completion, readline is not available on every platform"""
+    try:
+        import readline
+    except ImportError:
+        return None
+
+    if history:
+        try:
+            readline.read_history_file(history)
+        except OSError:
+            pass
+        readline.set_history_length(HISTORY_LENGTH)
+
+    matches: List[str] = []
+
+    def complete(text: str, state: int) -> Optional[str]:
+        if state == 0:
+            line = readline.get_line_buffer()[:readline.get_begidx()]
+            # Python leaves the space after a completed word to the completer
+            matches[:] = [f'{match} ' for match in commands.complete(line, text)]
+        return matches[state] if state < len(matches) else None
+
+    readline.set_completer_delims(' \t\n')
+    readline.set_completer(complete)
+    # macOS ships libedit instead of GNU readline, with another syntax for key bindings
+    if 'libedit' in (readline.__doc__ or ''):
+        readline.parse_and_bind('bind ^I rl_complete')
+    else:
+        readline.parse_and_bind('tab: complete')
+    return readline
+
+
+@click.command(help='Run kron commands one after the other, sharing the connections to the server and the cache')
+@click.option('--history', envvar='KRONBUTE_SHELL_HISTORY', type=click.Path(dir_okay=False),
+              default=lambda: os.path.join(os.path.expanduser('~'), '.kron_history'),
+              help='File keeping the commands typed, empty to keep none')
+@click.pass_context
+def shell(ctx, history: str):
+    root = ctx.find_root()
+    server = root.obj
+    # Listings read by one command are kept in memory for the next one, the file is only read again when changed
+    if server.cache is not None and not isinstance(server.cache, MemoryResponseCache):
+        server.cache = MemoryResponseCache(server.cache.directory, server.cache.ttl)
+
+    commands = SessionCommands(root)
+    interactive = sys.stdin.isatty()
+    readline = _readline(commands, history) if interactive else None
+    if interactive:
+        click.echo(f'Kron shell for {server.url}, {HELP_COMMAND} lists the commands, '
+                   f'{" or ".join(sorted(EXIT_COMMANDS))} or Ctrl+D leaves')
+
+    code = 0
+    try:
+        while True:
+            try:
+                line = input(PROMPT if interactive else '')
+            except EOFError:
+                if interactive:
+                    click.echo()
+                break
+            except KeyboardInterrupt:
+                click.echo()
+                continue
+
+            try:
+                args = shlex.split(line, comments=True)
+            except ValueError as ex:
+                click.secho(f'[ERROR] {ex}', err=True, fg='red')
+                code = 2
+                continue
+
+            # Commands copied from scripts or the documentation keep working
+            if args[:1] == ['kron']:
+                args = args[1:]
+            if not args:
+                continue
+            if args[0] in EXIT_COMMANDS:
+                break
+            if args[0] == HELP_COMMAND:
+                args = args[1:] + ['--help']
+
+            code = commands.run(args)
+    finally:
+        if readline is not None and history:
+            try:
+                readline.write_history_file(history)
+                # Commands may have secrets in their environment variables
+                os.chmod(history, 0o600)
+            except OSError:
+                pass
+
+    ctx.exit(code)
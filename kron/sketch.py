@@ -0,0 +1,96 @@
+import math
+from typing import Dict, Optional, Iterable
+
+
+class DurationSketch:
+    """Quantiles of durations with a bounded relative error and bounded memory, two sketches with the same accuracy
+    are merged by adding their counts
+
+    Every value falls in a bucket growing geometrically by gamma, so any quantile is known within the relative
+    accuracy given, 1% by default. When there are more buckets than max_buckets the smallest ones are collapsed,
+    only the lowest quantiles lose accuracy then.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError('relative accuracy should be between 0 and 1')
+
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.minimum: Optional[float] = None
+        self.maximum: Optional[float] = None
+
+    def add(self, value: float, count: int = 1):
+        """Adds a duration in seconds, negative durations from clock skew count as zero"""
+        value = max(value, 0.0)
+        if value == 0:
+            self.zeros += count
+        else:
+            index = math.ceil(math.log(value) / self.log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + count
+            if len(self.buckets) > self.max_buckets:
+                self._collapse()
+
+        self.count += count
+        self.total += value * count
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+    def update(self, values: Iterable[float]):
+        for value in values:
+            self.add(value)
+
+    def _collapse(self):
+        indexes = sorted(self.buckets)
+        extra = len(indexes) - self.max_buckets
+        target = indexes[extra]
+        self.buckets[target] += sum(self.buckets.pop(index) for index in indexes[:extra])
+
+    def merge(self, other: 'DurationSketch'):
+        if other.gamma != self.gamma:
+            raise ValueError('only sketches with the same relative accuracy can be merged')
+
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        if other.minimum is not None:
+            self.minimum = other.minimum if self.minimum is None else min(self.minimum, other.minimum)
+            self.maximum = other.maximum if self.maximum is None else max(self.maximum, other.maximum)
+
+    def quantile(self, quantile: float) -> Optional[float]:
+        """Smallest duration with at least the given fraction of the durations at or under it, the nearest rank, so
+        the p99 of a few runs is their slowest one, None when there are none"""
+        if not self.count:
+            return None
+        if not 0 <= quantile <= 1:
+            raise ValueError('quantile should be between 0 and 1')
+
+        # Ranks count from 1, the tolerance keeps 0.9 * 10 from becoming the 10th value
+        rank = max(math.ceil(quantile * self.count - 1e-9), 1)
+        if rank <= self.zeros:
+            return 0.0
+
+        seen = self.zeros
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                # Middle of the bucket in relative terms, within the accuracy from any value in it
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.minimum), self.maximum)
+
+        return self.maximum
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
@@ -0,0 +1,3 @@
+from .command import export_snapshot, import_snapshot
+
+__all__ = ['export_snapshot', 'import_snapshot']
@@ -0,0 +1,189 @@
+import io
+import json
+import os
+import re
+import sys
+import tarfile
+import time
+from typing import Dict, Any, List, Optional, NamedTuple
+
+import yaml
+
+from .. import manifest, trace
+
+TAR_EXTENSIONS = ('.tar', '.tar.gz', '.tgz')
+JSONL_EXTENSIONS = ('.jsonl',)
+
+
+class SnapshotEntry(NamedTuple):
+    source: str
+    data: Optional[Dict[str, Any]]
+    problems: List[str]
+
+
+def snapshot_format(location: str) -> str:
+    """Format of a snapshot from its location, '-' is JSONL on standard input or output"""
+    if location == '-' or location.endswith(JSONL_EXTENSIONS):
+        return 'jsonl'
+    if location.endswith(TAR_EXTENSIONS):
+        return 'tar'
+    return 'directory'
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r'[^\w.-]+', '_', name).strip('._') or 'unnamed'
+
+
+def job_file(job: Dict[str, Any]) -> str:
+    return f"jobs/{_safe_name(job['alias']) if job.get('alias') else 'job-' + str(job['id'])}.yml"
+
+
+def group_file(group: Dict[str, Any]) -> str:
+    return f"groups/{_safe_name(group['name'])}.yml"
+
+
+def _private_file(path: str, mode: str):
+    """File only the current user can read, snapshots carry the environment of every job"""
+    descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    # An existing file keeps its mode when opened
+    os.fchmod(descriptor, 0o600)
+    return os.fdopen(descriptor, mode)
+
+
+class SnapshotWriter:
+    """Writes manifests as soon as they are given, so nothing waits for the whole snapshot"""
+
+    def __init__(self, location: str):
+        self.location = location
+        self.count = 0
+
+    def write(self, name: str, data: Dict[str, Any]):
+        self.count += 1
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class DirectoryWriter(SnapshotWriter):
+    def __init__(self, location: str):
+        super().__init__(location)
+        # makedirs only gives the mode to the last directory it creates
+        os.makedirs(location, mode=0o700, exist_ok=True)
+
+    def write(self, name: str, data: Dict[str, Any]):
+        path = os.path.join(self.location, name)
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        with _private_file(path, 'w') as document:
+            document.write(manifest.dump(data))
+        super().write(name, data)
+
+
+class TarWriter(SnapshotWriter):
+    def __init__(self, location: str):
+        super().__init__(location)
+        self.file = _private_file(location, 'wb')
+        # Stream mode, members are compressed and written one after the other
+        self.archive = tarfile.open(fileobj=self.file, mode='w|gz' if location.endswith(('.gz', '.tgz')) else 'w|')
+
+    def write(self, name: str, data: Dict[str, Any]):
+        content = manifest.dump(data).encode('utf-8')
+        member = tarfile.TarInfo(name)
+        member.size = len(content)
+        member.mtime = int(time.time())
+        member.mode = 0o600
+        self.archive.addfile(member, io.BytesIO(content))
+        super().write(name, data)
+
+    def close(self):
+        try:
+            self.archive.close()
+        finally:
+            self.file.close()
+
+
+class JsonlWriter(SnapshotWriter):
+    def __init__(self, location: str):
+        super().__init__(location)
+        self.stream = sys.stdout if location == '-' else _private_file(location, 'w')
+
+    def write(self, name: str, data: Dict[str, Any]):
+        self.stream.write(json.dumps(data) + '\n')
+        super().write(name, data)
+
+    def close(self):
+        self.stream.flush()
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+WRITERS = {'directory': DirectoryWriter, 'tar': TarWriter, 'jsonl': JsonlWriter}
+
+
+def open_writer(location: str) -> SnapshotWriter:
+    return WRITERS[snapshot_format(location)](location)
+
+
+def _documents(source: str, content: bytes) -> List[SnapshotEntry]:
+    try:
+        with trace.span(source, 'yaml', bytes=len(content)):
+            documents = [data for data in yaml.load_all(content, Loader=manifest.SafeLoader) if data is not None]
+    except yaml.YAMLError as err:
+        return [SnapshotEntry(source, None, [f'invalid YAML, {err}'])]
+
+    entries = []
+    for index, data in enumerate(documents):
+        name = source if len(documents) == 1 else f'{source}#{index + 1}'
+        if not isinstance(data, dict):
+            entries.append(SnapshotEntry(name, None, ['manifest should be a YAML mapping']))
+        else:
+            entries.append(SnapshotEntry(name, data, manifest.problems(data)))
+    return entries
+
+
+def read_snapshot(location: str, cache: Optional[manifest.ManifestCache] = None) -> List[SnapshotEntry]:
+    snapshot = snapshot_format(location)
+    entries: List[SnapshotEntry] = []
+
+    if snapshot == 'jsonl':
+        stream = sys.stdin if location == '-' else open(location, 'r')
+        try:
+            for number, line in enumerate(stream, 1):
+                if not line.strip():
+                    continue
+                source = f'{location}:{number}'
+                try:
+                    data = json.loads(line)
+                except ValueError as err:
+                    entries.append(SnapshotEntry(source, None, [f'invalid JSON, {err}']))
+                    continue
+                if not isinstance(data, dict):
+                    entries.append(SnapshotEntry(source, None, ['line should be a JSON object']))
+                else:
+                    entries.append(SnapshotEntry(source, data, manifest.problems(data)))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+    elif snapshot == 'tar':
+        with tarfile.open(location, 'r|*') as archive:
+            for member in archive:
+                if member.isfile() and member.name.endswith(manifest.MANIFEST_EXTENSIONS):
+                    entries.extend(_documents(f'{location}:{member.name}', archive.extractfile(member).read()))
+
+    else:
+        for path in manifest.find_manifests([location]):
+            try:
+                documents = manifest.parse_documents(path, cache)
+            except (manifest.ManifestError, yaml.YAMLError, OSError) as err:
+                entries.append(SnapshotEntry(path, None, [str(err)]))
+                continue
+            entries.extend(SnapshotEntry(path if len(documents) == 1 else f'{path}#{index + 1}', data, problems)
+                           for index, (data, problems) in enumerate(documents))
+
+    return entries
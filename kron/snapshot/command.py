@@ -0,0 +1,159 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Union, Dict, Any, List
+
+import click
+
+from .. import util, manifest, completion
+from ..kronbute import BaseServer, JobServer, GroupsServer, ServerError, NotFoundError, ArgumentValidationError, \
+    AliasAlreadyExistsError, ConflictError
+from ..kronbute.job_server import EDIT_FIELDS
+from .archive import open_writer, read_snapshot, job_file, group_file
+
+SERVER_ERRORS = (ServerError, NotFoundError, ArgumentValidationError, AliasAlreadyExistsError, ConflictError)
+
+
+def _message(ex: Exception) -> str:
+    return getattr(ex, 'message', None) or getattr(ex, 'body', None) or type(ex).__name__
+
+
+@click.command('export', help='Export jobs and groups to a directory of manifests, a tar archive (.tar, .tar.gz) '
+                              'or a JSONL file (.jsonl, - for standard output)')
+@click.argument('destination')
+@click.option('--all', 'export_all', is_flag=True, help='Export every job and group in the server')
+@click.option('--job', 'job_ids', type=util.INT_ALIAS, multiple=True, autocompletion=completion.complete_jobs,
+              help='Job to export with its groups, can be repeated')
+@click.option('--workers', help='Number of concurrent requests to the server', default=8,
+              type=click.IntRange(min=1))
+@click.pass_obj
+def export_snapshot(server: BaseServer, destination: str, export_all: bool, job_ids: Tuple[Union[str, int]],
+                    workers: int):
+    if not export_all and not job_ids:
+        raise click.UsageError('Use --all or give the jobs to export with --job')
+
+    jobs_server, groups_server = JobServer(server), GroupsServer(server)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        jobs = jobs_server.list() if export_all else list(executor.map(jobs_server.view, job_ids))
+        groups = groups_server.list()
+        if not export_all:
+            used = {name for job in jobs for name in job.get('groups') or []}
+            groups = [group for group in groups if group['name'] in used]
+
+        # Listings may leave details out, only those entities are fetched again
+        def complete_group(group: Dict[str, Any]) -> Dict[str, Any]:
+            return group if 'environment' in group else groups_server.view(group['id'])
+
+        def complete_job(job: Dict[str, Any]) -> Dict[str, Any]:
+            return job if EDIT_FIELDS.issubset(job) else jobs_server.view(job['id'])
+
+        # Groups first, so archives can be imported in order
+        with open_writer(destination) as writer:
+            for group in executor.map(complete_group, groups):
+                writer.write(group_file(group), manifest.from_group(group))
+            written = set()
+            for job in executor.map(complete_job, jobs):
+                name = job_file(job)
+                # Aliases are unique in the server, but being a backup nothing is ever overwritten
+                name = name if name not in written else f"{name[:-len('.yml')]}-{job['id']}.yml"
+                written.add(name)
+                writer.write(name, manifest.from_job(job))
+
+    click.echo(util.success(f'{len(groups)} groups and {len(jobs)} jobs exported to {destination}'),
+               err=destination == '-')
+
+
+@click.command('import', help='Create or update the jobs and groups of a snapshot made with kron export, groups '
+                              'first so jobs can use them')
+@click.argument('source')
+@click.option('--workers', help='Number of concurrent requests to the server', default=8,
+              type=click.IntRange(min=1))
+@click.option('--dry-run', help='Only report what would change', is_flag=True)
+@click.pass_context
+def import_snapshot(ctx, source: str, workers: int, dry_run: bool):
+    # Jobs are planned as kron job plan does, which reads snapshots through this package
+    from ..job.apply import apply_job
+    from ..job.plan import FIELD_NAMES, JobPlan, plan_jobs
+
+    server: BaseServer = ctx.obj
+    jobs_server, groups_server = JobServer(server), GroupsServer(server)
+
+    entries = read_snapshot(source, manifest.current_cache())
+    if not entries:
+        raise click.UsageError(f'No manifests found in {source}')
+
+    report: List[List[str]] = []
+    invalid = [[entry.source, '', click.style('invalid', fg='red'), problem]
+               for entry in entries for problem in entry.problems[:1]]
+    if invalid:
+        # Nothing is changed when part of the snapshot cannot be restored
+        from terminaltables import AsciiTable
+
+        click.echo(AsciiTable([['Source', 'Name', 'Action', 'Details']] + invalid).table)
+        click.secho(f'\n[ERROR] {len(invalid)} of {len(entries)} manifests are invalid, nothing was imported',
+                    err=True, fg='red')
+        ctx.exit(1)
+
+    group_entries = [entry for entry in entries if manifest.kind(entry.data) == 'group']
+    job_entries = [entry for entry in entries if manifest.kind(entry.data) == 'job']
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        existing = {group['name']: group for group in groups_server.list()}
+
+        def restore_group(entry) -> List[str]:
+            name, environment = entry.data['name'], entry.data.get('environment') or {}
+            current = existing.get(name)
+            try:
+                if current is not None and 'environment' not in current:
+                    current = groups_server.view(current['id'])
+                if current is not None and (current.get('environment') or {}) == environment:
+                    return [entry.source, name, 'unchanged', '']
+
+                action, detail = ('update', 'environment') if current is not None else ('create', '')
+                if dry_run:
+                    return [entry.source, name, action, detail]
+
+                if current is not None:
+                    groups_server.edit(current['id'], name, environment, existing_group=current)
+                else:
+                    detail = f'created with id {groups_server.create(name, environment)}'
+                return [entry.source, name, click.style(action, fg='green'), detail]
+            except SERVER_ERRORS as ex:
+                return [entry.source, name, click.style('failed', fg='red'), _message(ex)]
+
+        report.extend(executor.map(restore_group, group_entries))
+
+        def restore_job(item: JobPlan) -> List[str]:
+            # An alias or name used by several jobs, creating one more would only make it worse
+            if item.action == 'invalid':
+                return [item.source, item.name, click.style('failed', fg='red'), item.problem]
+            if item.action == 'unchanged':
+                return [item.source, item.name, 'unchanged', '']
+            detail = ', '.join(sorted({FIELD_NAMES[field] for field in item.changes}))
+            if dry_run:
+                return [item.source, item.name, item.action, detail]
+            try:
+                detail = apply_job(jobs_server, item.data, item.current)
+                if detail == 'unchanged':
+                    return [item.source, item.name, 'unchanged', '']
+                return [item.source, item.name, click.style(item.action, fg='green'), detail]
+            except SERVER_ERRORS as ex:
+                return [item.source, item.name, click.style('failed', fg='red'), _message(ex)]
+
+        report.extend(executor.map(restore_job, plan_jobs(jobs_server, job_entries, workers)))
+
+    from terminaltables import AsciiTable
+
+    click.echo(AsciiTable([['Source', 'Name', 'Action', 'Details']] + report).table)
+
+    actions = [click.unstyle(row[2]) for row in report]
+    failed = actions.count('failed')
+    summary = f"{len(group_entries)} groups and {len(job_entries)} jobs: {actions.count('create')} created, " \
+              f"{actions.count('update')} updated, {actions.count('unchanged')} unchanged, {failed} failed"
+    if dry_run:
+        summary = f"{summary} (dry run)"
+
+    if failed:
+        click.secho(f'\n[ERROR] {summary}', err=True, fg='red')
+        ctx.exit(1)
+
+    click.echo(util.success(summary))
@@ -0,0 +1,199 @@
+"""Spans of the phases of a command for --trace and the profile of the whole command for --profile
+
+Traces are written in the Chrome trace event format, open them in chrome://tracing or https://ui.perfetto.dev. There
+are spans for the start up of the interpreter, the import of the command, every request to the server, manifest
+parsing and table rendering, each thread of the bulk commands gets its own row. Nothing is recorded unless a trace
+was started, span() then returns a shared object doing nothing.
+"""
+import json
+import os
+import sys
+import threading
+import time
+import urllib.parse
+from typing import Optional, Dict, Any, List
+
+import click
+
+# Categories summarized after the command, in the order they happen
+CATEGORIES = ['startup', 'import', 'http', 'yaml', 'render']
+
+
+def process_age() -> Optional[float]:
+    """Seconds since the interpreter started, only known on Linux, with the 10 ms resolution of the kernel clock"""
+    try:
+        with open('/proc/self/stat') as stat:
+            # The command name may have spaces, fields are counted from the parenthesis closing it
+            fields = stat.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as uptime:
+            since_boot = float(uptime.read().split()[0])
+        return max(since_boot - int(fields[19]) / os.sysconf('SC_CLK_TCK'), 0.0)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class Span:
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start')
+
+    def __init__(self, tracer: 'Tracer', name: str, category: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0.0
+
+    def update(self, **args):
+        self.args.update(args)
+
+    def __enter__(self) -> 'Span':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, kind, value, traceback):
+        if kind is not None:
+            self.args['error'] = kind.__name__
+        self.tracer.record(self.name, self.category, self.start, time.perf_counter(), self.args)
+
+
+class NoSpan:
+    def update(self, **args):
+        pass
+
+    def __enter__(self) -> 'NoSpan':
+        return self
+
+    def __exit__(self, kind, value, traceback):
+        pass
+
+
+NO_SPAN = NoSpan()
+
+
+class Tracer:
+    def __init__(self, path: str, startup: bool = True):
+        self.path = path
+        self.started = time.perf_counter()
+        self.events: List[Dict[str, Any]] = []
+        self.threads: Dict[int, str] = {}
+
+        # Times are counted from the start of the interpreter when it is known, from now otherwise
+        age = process_age() if startup else None
+        self.origin = self.started - (age or 0.0)
+        if age is not None:
+            self.record('start up', 'startup', self.origin, self.started, {'argv': sys.argv})
+
+    def record(self, name: str, category: str, start: float, end: float, args: Dict[str, Any]):
+        thread = threading.get_ident()
+        if thread not in self.threads:
+            self.threads[thread] = threading.current_thread().name
+        # Appending to a list is atomic, spans of the worker threads need no lock
+        self.events.append({'name': name, 'cat': category, 'ph': 'X', 'pid': os.getpid(), 'tid': thread,
+                            'ts': round((start - self.origin) * 1e6, 1), 'dur': round((end - start) * 1e6, 1),
+                            'args': args})
+
+    def summary(self) -> str:
+        """Time by category, requests of different threads overlap so their time can exceed the total"""
+        totals = {category: 0.0 for category in CATEGORIES}
+        requests = 0
+        for event in self.events:
+            if event['cat'] in totals:
+                totals[event['cat']] += event['dur'] / 1000
+            requests += event['cat'] == 'http'
+        total = (time.perf_counter() - self.origin) * 1000
+        parts = [f'{category} {totals[category]:.1f} ms' for category in CATEGORIES]
+        parts[CATEGORIES.index('http')] += f' in {requests} requests'
+        return f"{total:.1f} ms: {', '.join(parts)}"
+
+    def write(self):
+        self.record('kron', 'command', self.started, time.perf_counter(), {'argv': sys.argv})
+        names = [{'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': thread, 'args': {'name': name}}
+                 for thread, name in self.threads.items()]
+        with open(self.path, 'w') as file:
+            json.dump({'traceEvents': names + sorted(self.events, key=lambda event: event['ts']),
+                       'displayTimeUnit': 'ms'}, file)
+
+
+_tracer: Optional[Tracer] = None
+_profiler = None
+
+
+def tracing() -> bool:
+    return _tracer is not None
+
+
+def span(name: str, category: str, **args):
+    return Span(_tracer, name, category, args) if _tracer is not None else NO_SPAN
+
+
+def start(path: str, startup: bool = True):
+    global _tracer
+    _tracer = Tracer(path, startup)
+    _instrument_tables()
+
+
+def finish():
+    global _tracer
+    if _tracer is None:
+        return
+
+    tracer, _tracer = _tracer, None
+    tracer.write()
+    click.echo(f'[TRACE] {tracer.summary()}, written to {tracer.path}', err=True)
+
+
+def instrument_session(session):
+    """Records every request of a requests session, with its status and size, until the end of the trace"""
+    # Sessions kept by kron daemon are instrumented by the first traced command
+    if getattr(session, 'kron_traced', False):
+        return
+    send = session.request
+
+    def request(method, url, *args, **kwargs):
+        with span(f'{method} {urllib.parse.urlsplit(url).path}', 'http', method=method, url=url) as current:
+            res = send(method, url, *args, **kwargs)
+            # Streamed bodies are read later, their size is the one announced by the server
+            size = res.headers.get('Content-Length') if kwargs.get('stream') else len(res.content)
+            current.update(url=res.url, status=res.status_code, bytes=None if size is None else int(size),
+                           streamed=bool(kwargs.get('stream')))
+            return res
+
+    session.request = request
+    session.kron_traced = True
+
+
+def _instrument_tables():
+    """Tables are rendered when their text is asked for, every terminaltables table shares the property"""
+    try:
+        from terminaltables.base_table import BaseTable
+    except ImportError:
+        return
+
+    render = BaseTable.table.fget
+    if getattr(render, 'kron_traced', False):
+        return
+
+    def table(self):
+        with span(type(self).__name__, 'render', rows=len(self.table_data)):
+            return render(self)
+
+    table.kron_traced = True
+    BaseTable.table = property(table)
+
+
+def start_profile():
+    global _profiler
+    import cProfile
+
+    _profiler = cProfile.Profile()
+    _profiler.enable()
+
+
+def finish_profile(path: str):
+    global _profiler
+    if _profiler is None:
+        return
+
+    profiler, _profiler = _profiler, None
+    profiler.disable()
+    profiler.dump_stats(path)
+    click.echo(f'[PROFILE] Written to {path}, read it with python -m pstats {path}', err=True)
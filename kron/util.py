@@ -1,15 +1,13 @@
-import re
+import importlib
 import sys
 from enum import Enum
 
-import yaml
 import click
-from typing import Optional, Any, Union, Callable, Tuple, TextIO, Dict
+from typing import Optional, Any, Union, Callable, Tuple, TextIO, Dict, List, Sequence
 
-import requests
-import pytz
-
-from .kronbute import ServerError, NotFoundError, ArgumentValidationError, AliasAlreadyExistsError
+from . import cron, validation, trace
+from .kronbute import ServerError, NotFoundError, ArgumentValidationError, AliasAlreadyExistsError, ConflictError, \
+    AmbiguousAliasError
 
 
 def success(text: str) -> str:
@@ -22,172 +20,218 @@ def error(text: str, err: ServerError) -> str:
     return f'{msg_type} {text}, code: {err.code}, message: {err.body}'
 
 
-cron_regex = re.compile(r'^(\*|([0-9]|1[0-9]|2[0-9]|3[0-9]|4[0-9]|5[0-9])|\*\/([0-9]|1[0-9]|2[0-9]|3[0-9]|4[0-9]|5[0-9])) (\*|([0-9]|1[0-9]|2[0-3])|\*\/([0-9]|1[0-9]|2[0-3])) (\*|([1-9]|1[0-9]|2[0-9]|3[0-1])|\*\/([1-9]|1[0-9]|2[0-9]|3[0-1])) (\*|([1-9]|1[0-2])|\*\/([1-9]|1[0-2])) (\*|([0-6])|\*\/([0-6]))$')
-quartz_regex = re.compile(r'^\s*($|#|\w+\s*=|(\?|\*|(?:[0-5]?\d)(?:(?:-|\/|\,)(?:[0-5]?\d))?(?:,(?:[0-5]?\d)(?:(?:-|\/|\,)(?:[0-5]?\d))?)*)\s+(\?|\*|(?:[0-5]?\d)(?:(?:-|\/|\,)(?:[0-5]?\d))?(?:,(?:[0-5]?\d)(?:(?:-|\/|\,)(?:[0-5]?\d))?)*)\s+(\?|\*|(?:[01]?\d|2[0-3])(?:(?:-|\/|\,)(?:[01]?\d|2[0-3]))?(?:,(?:[01]?\d|2[0-3])(?:(?:-|\/|\,)(?:[01]?\d|2[0-3]))?)*)\s+(\?|\*|(?:0?[1-9]|[12]\d|3[01])(?:(?:-|\/|\,)(?:0?[1-9]|[12]\d|3[01]))?(?:,(?:0?[1-9]|[12]\d|3[01])(?:(?:-|\/|\,)(?:0?[1-9]|[12]\d|3[01]))?)*)\s+(\?|\*|(?:[1-9]|1[012])(?:(?:-|\/|\,)(?:[1-9]|1[012]))?(?:L|W)?(?:,(?:[1-9]|1[012])(?:(?:-|\/|\,)(?:[1-9]|1[012]))?(?:L|W)?)*|\?|\*|(?:JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)(?:(?:-)(?:JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC))?(?:,(?:JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)(?:(?:-)(?:JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC))?)*)\s+(\?|\*|(?:[0-6])(?:(?:-|\/|\,|#)(?:[0-6]))?(?:L)?(?:,(?:[0-6])(?:(?:-|\/|\,|#)(?:[0-6]))?(?:L)?)*|\?|\*|(?:MON|TUE|WED|THU|FRI|SAT|SUN)(?:(?:-)(?:MON|TUE|WED|THU|FRI|SAT|SUN))?(?:,(?:MON|TUE|WED|THU|FRI|SAT|SUN)(?:(?:-)(?:MON|TUE|WED|THU|FRI|SAT|SUN))?)*)(|\s)+(\?|\*|(?:|\d{4})(?:(?:-|\/|\,)(?:|\d{4}))?(?:,(?:|\d{4})(?:(?:-|\/|\,)(?:|\d{4}))?)*))$')
-meta_regex = re.compile(r'(@hourly|@daily|@weekly|@monthly)', re.IGNORECASE)
-
-
-meta = {
-    '@hourly': '0 * * * *',
-    '@daily': '0 0 * * *',
-    '@weekly': '0 0 * * 0',
-    '@monthly': '0 0 1 * *'
-}
-
-
-# NOTE: This is a poor man evaluator, but it has the potential, with time, to fully transform into a good evaluator
-# for example, support '@hourly at 23' or '@daily at 3:45pm', feel free to submit the patch
 class CronEvaluator:
     def __init__(self, value: str):
         self.value = value
 
-    def parse(self) -> Optional[str]:
-        if cron_regex.match(self.value):
-            return self.value
-
-        if quartz_regex.match(self.value):
-            return self.value
+    def compile(self, cron_type: Optional[str] = None) -> cron.CronSchedule:
+        """Schedule able to compute fire times, raises cron.CronSyntaxError for invalid expressions"""
+        return cron.compile_cron(self.value, cron_type)
 
-        if meta_regex.match(self.value):
-            return meta[self.value.strip().lower()]
+    def parse(self) -> Optional[str]:
+        """Expression with macros expanded, including offsets such as '@hourly at 23' or '@daily at 3:45pm', None
+        when it is not a cron expression"""
+        try:
+            return validation.validate_cron(self.value)
+        except validation.ValidationError:
+            return None
 
-        return None
 
+class ValidatorParamType(click.ParamType):
+    """Parameter checked by one of the functions in kron.validation"""
 
-class CronParamType(click.ParamType):
-    name = 'cron'
+    def __init__(self, name: str, validator: Callable[[str], Any]):
+        self.name = name
+        self.validator = validator
 
     def convert(self, value, param, ctx):
-        if value is None:
-            self.fail("Cron expression cannot be null")
-
-        parsed = CronEvaluator(value).parse()
-        if parsed is None:
-            self.fail(f"'{value}' is not a cron expression", ctx=ctx)
-
-        return parsed
-
-
-CRON = CronParamType()
+        try:
+            return self.validator(value)
+        except validation.ValidationError as err:
+            self.fail(str(err), param, ctx)
 
-alias_regex = re.compile(r'^[A-Za-z][A-Za-z\d_]*$')
-image_regex = re.compile(r"^[\w][\w\-.]+/?[\w][\w\-.]+$")
-tag_regex = re.compile(r"")
 
+def _validate_cron(value: str) -> str:
+    if value is None:
+        raise validation.ValidationError('Cron expression cannot be null', value)
+    try:
+        return validation.validate_cron(value)
+    except validation.ValidationError as err:
+        raise validation.ValidationError(f"'{value}' is not a cron expression, {err}", value)
 
-class AliasParamType(click.ParamType):
-    name = 'alias'
 
-    def convert(self, value, param, ctx):
-        if not alias_regex.match(value):
-            self.fail(f'Alias supports only letters and underscores', ctx=ctx)
-        return value
+CRON = ValidatorParamType('cron', _validate_cron)
+ALIAS = ValidatorParamType('alias', validation.validate_alias)
+INT_ALIAS = ValidatorParamType('IdOrAlias', validation.parse_id_or_alias)
+TIMEZONE = ValidatorParamType('TimeZoneName', validation.validate_timezone)
+DOCKER_IMAGE = ValidatorParamType('DockerImageName', validation.validate_image)
+DOCKER_TAG = ValidatorParamType('DockerTagName', validation.validate_tag)
 
 
-ALIAS = AliasParamType()
+def format_status(status: str) -> str:
+    colors = {
+        "FAILED": 'red',
+        "SUCCESS": 'green',
+        "RUNNING": 'yellow'
+    }
+    return click.style(status, fg=(colors[status] if status in colors else None))
 
 
-class IntOrAliasParamType(click.ParamType):
-    name = 'IdOrAlias'
+class StreamingTable:
+    """Table printed row by row with fixed column widths, so nothing waits for the whole listing"""
 
-    def convert(self, value, param, ctx) -> Union[int, str]:
-        parsed = None
-        try:
-            parsed = click.INT.convert(value, param, ctx)
-        except click.exceptions.BadParameter:
-            pass
+    def __init__(self, headers: Sequence[str], widths: Sequence[int]):
+        self.headers = headers
+        self.widths = widths
+        self.started = False
 
-        try:
-            parsed = ALIAS.convert(value, param, ctx)
-        except click.exceptions.BadParameter:
-            pass
-
-        if not parsed:
-            self.fail("Neither a valid id or valid alias")
+    @property
+    def border(self) -> str:
+        return '+' + '+'.join('-' * (width + 2) for width in self.widths) + '+'
+
+    def format_row(self, row: Sequence[Any], styles: Optional[Dict[int, Callable[[str], str]]] = None) -> str:
+        cells = []
+        for index, (value, width) in enumerate(zip(row, self.widths)):
+            text = '' if value is None else str(value)
+            text = text if len(text) <= width else text[:width - 3] + '...'
+            cell = text.ljust(width)
+            if styles and index in styles:
+                cell = cell.replace(text, styles[index](text), 1)
+            cells.append(cell)
+        return '| ' + ' | '.join(cells) + ' |'
+
+    def header(self) -> List[str]:
+        return [self.border, self.format_row(self.headers), self.border]
+
+    def echo(self, row: Sequence[Any], styles: Optional[Dict[int, Callable[[str], str]]] = None):
+        if not self.started:
+            click.echo('\n'.join(self.header()))
+            self.started = True
+        click.echo(self.format_row(row, styles))
+
+    def close(self):
+        if not self.started:
+            click.echo('\n'.join(self.header()))
+        click.echo(self.border)
+
+
+class LiveTable(StreamingTable):
+    """Table kept on screen, only the rows that changed are redrawn, terminals without cursor movement get the
+    changed rows appended instead"""
+
+    def __init__(self, headers: Sequence[str], widths: Sequence[int]):
+        super().__init__(headers, widths)
+        self.lines: Dict[Any, str] = {}
+        self.interactive = sys.stdout.isatty()
+
+    def update(self, rows: Dict[Any, Tuple[Sequence[Any], Optional[Dict[int, Callable[[str], str]]]]]):
+        lines = {key: self.format_row(row, styles) for key, (row, styles) in rows.items()}
+
+        if list(lines) != list(self.lines):
+            if self.interactive and self.lines:
+                # Move to the top of the previous table and clear everything below
+                click.echo(f'\x1b[{len(self.lines) + 4}F\x1b[J', nl=False)
+            elif self.lines:
+                click.echo()
+            click.echo('\n'.join(self.header() + list(lines.values()) + [self.border]))
+
+        elif self.interactive:
+            for index, (key, line) in enumerate(lines.items()):
+                if self.lines[key] != line:
+                    distance = len(lines) - index + 1
+                    click.echo(f'\x1b[{distance}A\r\x1b[2K{line}\x1b[{distance}B\r', nl=False)
 
-        return parsed
+        else:
+            for key, line in lines.items():
+                if self.lines[key] != line:
+                    click.echo(line)
 
+        self.lines = lines
 
-INT_ALIAS = IntOrAliasParamType()
 
+class AtLeastOneParameterError(Exception):
+    pass
 
-class TimeZoneNameParamType(click.ParamType):
-    name = 'TimeZoneName'
 
-    def convert(self, value, param, ctx) -> str:
-        if value not in pytz.all_timezones:
-            self.fail(f"TimeZone does not exist", param, ctx=ctx)
-        return value
+class LazyGroup(click.Group):
+    """Group importing its subcommands, given as 'module:attribute', only when they are used"""
 
+    def __init__(self, *args, lazy_commands: Optional[Dict[str, str]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
 
-TIMEZONE = TimeZoneNameParamType()
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
 
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_commands and cmd_name not in self.commands:
+            module_name, attribute = self.lazy_commands[cmd_name].split(':')
+            with trace.span(f'import {module_name}', 'import'):
+                self.add_command(getattr(importlib.import_module(module_name), attribute), cmd_name)
 
-class DockerImageName(click.ParamType):
-    name = 'DockerImageName'
+        return super().get_command(ctx, cmd_name)
 
-    def convert(self, value, param, ctx) -> str:
-        if not image_regex.match(value):
-            self.fail(f"Invalid docker image name", ctx=ctx)
-        return value
 
+def report_error(ex: Exception) -> Optional[int]:
+    """Prints the message for an error of the server or of the connection to it and returns the exit code for it,
+    None for any other error"""
+    if isinstance(ex, AtLeastOneParameterError):
+        click.secho("[ERROR] You should provide at least one parameter", err=True, fg='red')
+        return 11
 
-DOCKER_IMAGE = DockerImageName()
+    if isinstance(ex, AliasAlreadyExistsError):
+        click.secho(f"[ERROR] This alias/name is already taken", err=True, fg='red')
+        return 12
 
+    if isinstance(ex, NotFoundError):
+        click.secho(f"[ERROR] {ex.entity} with query {ex.query} not found", err=True, fg='red')
+        return 13
 
-class DockerTagName(click.ParamType):
-    name = 'DockerTagName'
+    if isinstance(ex, AmbiguousAliasError):
+        click.secho(f"[ERROR] {ex.entity} alias {ex.query} is used by "
+                    f"{', '.join(str(job_id) for job_id in ex.ids)}, use the id instead",
+                    err=True, fg='red')
+        return 17
 
-    def convert(self, value, param, ctx):
-        if not tag_regex.match(value):
-            self.fail("Invalid docker tag name", ctx=ctx)
-        return value
+    if isinstance(ex, ConflictError):
+        click.secho(f"[ERROR] {ex.entity} {ex.query} was modified by someone else, try again",
+                    err=True, fg='red')
+        return 16
 
+    if isinstance(ex, ArgumentValidationError):
+        click.secho(f"[ERROR] Invalid argument(s): {ex.message}", err=True, fg='red')
+        return 14
 
-DOCKER_TAG = DockerTagName()
+    if isinstance(ex, ServerError):
+        click.secho(f"[ERROR] Server returned unexpected code {ex.code}", err=True, fg='red')
+        return 15
 
+    # requests is only imported by commands talking to the server, otherwise the error is not from it
+    requests = sys.modules.get('requests')
+    if requests is None:
+        return None
 
-def format_status(status: str) -> str:
-    colors = {
-        "FAILED": 'red',
-        "SUCCESS": 'green',
-        "RUNNING": 'yellow'
-    }
-    return click.style(status, fg=(colors[status] if status in colors else None))
+    if isinstance(ex, requests.exceptions.ConnectionError):
+        click.secho("[ERROR] Problem when trying to connect to Kronbute server", err=True, fg='red')
+        return 10
 
+    if isinstance(ex, requests.exceptions.Timeout):
+        click.secho("[ERROR] Kronbute server took too long to answer", err=True, fg='red')
+        return 10
 
-class AtLeastOneParameterError(Exception):
-    pass
+    return None
 
 
-class KronbuteExceptionHandler(click.Group):
+class KronbuteExceptionHandler(LazyGroup):
     def __call__(self, *args, **kwargs):
         try:
             self.main(*args, **kwargs)
 
-        except requests.exceptions.ConnectionError:
-            click.secho("[ERROR] Problem when trying to connect to Kronbute server", err=True, fg='red')
-            sys.exit(10)
-
-        except AtLeastOneParameterError:
-            click.secho("[ERROR] You should provide at least one parameter", err=True, fg='red')
-            sys.exit(11)
-
-        except AliasAlreadyExistsError:
-            click.secho(f"[ERROR] This alias/name is already taken", err=True, fg='red')
-            sys.exit(12)
-
-        except NotFoundError as not_found:
-            click.secho(f"[ERROR] {not_found.entity} with query {not_found.query} not found", err=True, fg='red')
-            sys.exit(13)
-
-        except ArgumentValidationError as validation:
-            click.secho(f"[ERROR] Invalid argument(s): {validation.message}", err=True, fg='red')
-            sys.exit(14)
-
-        except ServerError as ex:
-            click.secho(f"[ERROR] Server returned unexpected code {ex.code}", err=True, fg='red')
-            sys.exit(15)
+        except Exception as ex:
+            code = report_error(ex)
+            if code is None:
+                raise
+            sys.exit(code)
 
 
 def at_least_one(*args: Optional[Any]) -> bool:
@@ -201,8 +245,13 @@ def format_none(value: Optional[Any]) -> str:
 class SetImportFile(click.Option):
     @staticmethod
     def fill_context(ctx, value):
-        with open(value, 'r') as document:
-            ctx.file_defaults = yaml.load(document)
+        import yaml
+        from . import manifest
+
+        try:
+            ctx.file_defaults = manifest.load(value, manifest.current_cache())
+        except (manifest.ManifestError, yaml.YAMLError) as err:
+            raise click.BadParameter(str(err), ctx=ctx, param_hint='--import')
 
     def full_process_value(self, ctx, value):
         file_name = super().full_process_value(ctx, value)
@@ -0,0 +1,78 @@
+import functools
+import re
+from typing import Optional, Union, FrozenSet
+
+from . import cron
+
+alias_regex = re.compile(r'[A-Za-z][A-Za-z\d_]*')
+# None of the parts can match a '/', so there is a single way to match any name and no backtracking
+image_regex = re.compile(r'\w[\w.-]*(?:/\w[\w.-]*)?')
+tag_regex = re.compile(r'\w[\w.-]{0,127}')
+
+
+class ValidationError(ValueError):
+    def __init__(self, message: str, value: str, position: Optional[int] = None):
+        super().__init__(message if position is None else f'{message} at position {position + 1}')
+        self.message = message
+        self.value = value
+        self.position = position
+
+
+def validate_cron(value: str, cron_type: Optional[str] = None) -> str:
+    """Expression to send to the server, macros such as '@daily at 3:45pm' are expanded"""
+    try:
+        cron.compile_cron(value, cron_type)
+    except cron.CronSyntaxError as err:
+        raise ValidationError(err.message, value, err.position)
+
+    expanded = cron.expand_macro(value)
+    if expanded and (cron_type or cron.UNIX).upper() == cron.QUARTZ:
+        return cron.to_quartz(expanded)
+    return expanded or value
+
+
+def validate_alias(value: str) -> str:
+    if not alias_regex.fullmatch(value):
+        raise ValidationError('Alias supports only letters, digits and underscores, starting with a letter', value)
+    return value
+
+
+def validate_image(value: str) -> str:
+    if not image_regex.fullmatch(value):
+        raise ValidationError('Invalid docker image name', value)
+    return value
+
+
+def validate_tag(value: str) -> str:
+    if not tag_regex.fullmatch(value):
+        raise ValidationError('Invalid docker tag name', value)
+    return value
+
+
+@functools.lru_cache(maxsize=None)
+def timezone_names() -> FrozenSet[str]:
+    import pytz
+
+    return frozenset(pytz.all_timezones)
+
+
+def validate_timezone(value: str) -> str:
+    if value not in timezone_names():
+        raise ValidationError(f"TimeZone '{value}' does not exist", value)
+    return value
+
+
+def parse_id_or_alias(value: Union[int, str]) -> Union[int, str]:
+    """Job or group id as a number, aliases as they are"""
+    if isinstance(value, int):
+        return value
+
+    try:
+        return int(value)
+    except ValueError:
+        pass
+
+    if alias_regex.fullmatch(value):
+        return value
+
+    raise ValidationError('Neither a valid id or valid alias', value)
@@ -25,8 +25,11 @@ setup(name='kron',
           'pyyaml',
           'pytz'
       ],
+      extras_require={
+          'async': ['aiohttp']
+      },
       package_data={},
       entry_points={
-          'console_scripts': ['kron = kron.main:cli']
+          'console_scripts': ['kron = kron.client:main']
       }
 )
@@ -0,0 +1,31 @@
+import pytest
+from click.testing import CliRunner
+
+from benchmarks.fake_kronbute import FakeKronbute
+from kron.main import cli
+
+
+@pytest.fixture
+def fake():
+    """Stand-in Kronbute with jobs job_1 to job_5 and groups group-1 and group-2"""
+    with FakeKronbute(jobs=5, runs=20, groups=2) as server:
+        yield server
+
+
+@pytest.fixture
+def kron(fake, tmp_path):
+    """Runs a kron command against the fake server, with a cache of its own"""
+    def run(*args, input=None):
+        env = {'KRONBUTE_SERVER': fake.url, 'KRONBUTE_CACHE_DIR': str(tmp_path / 'cache')}
+        return CliRunner(mix_stderr=False).invoke(cli, list(args), input=input, env=env, catch_exceptions=False)
+    return run
+
+
+def add_job(fake, **fields):
+    """Job added to the fake server behind the back of kron"""
+    job = dict(fake.jobs.entities[1], id=fake.jobs.next_id, alias=None)
+    job.update(fields)
+    fake.jobs.entities[job['id']] = job
+    fake.jobs.next_id += 1
+    fake.jobs.changed(job['id'])
+    return job
@@ -0,0 +1,47 @@
+from kron.kronbute import AmbiguousAliasError, ConflictError, JobServer
+
+
+def manifest(path, name, alias, tag='latest'):
+    path.write_text(f'name: {name}\nalias: {alias}\nimage: team/cleanup:{tag}\nschedule: "0 1 * * *"\n')
+    return str(path)
+
+
+def test_a_conflict_is_a_failed_row(fake, kron, tmp_path, monkeypatch):
+    def edit(self, job_id, *args, **kwargs):
+        raise ConflictError(job_id)
+
+    monkeypatch.setattr(JobServer, 'edit', edit)
+    changed = manifest(tmp_path / 'changed.yml', 'Benchmark job 2', 'job_2', tag='2.0')
+    created = manifest(tmp_path / 'created.yml', 'New job', 'new_job')
+
+    result = kron('job', 'apply', changed, created)
+
+    assert result.exit_code == 1
+    assert 'modified by someone else, try again' in result.stdout
+    assert '2 manifests: 1 created, 0 updated, 0 unchanged, 1 failed' in result.stderr
+    assert any(job.get('alias') == 'new_job' for job in fake.jobs.entities.values())
+
+
+def test_an_ambiguous_alias_is_a_failed_row(fake, kron, tmp_path, monkeypatch):
+    def edit(self, job_id, *args, **kwargs):
+        raise AmbiguousAliasError('job_2', [2, 9])
+
+    monkeypatch.setattr(JobServer, 'edit', edit)
+    changed = manifest(tmp_path / 'changed.yml', 'Benchmark job 2', 'job_2', tag='2.0')
+
+    result = kron('job', 'apply', changed)
+
+    assert result.exit_code == 1
+    assert "alias 'job_2' is used by jobs 2, 9" in result.stdout
+    assert '1 failed' in result.stderr
+
+
+def test_a_skipped_edit_is_unchanged(fake, kron, tmp_path, monkeypatch):
+    monkeypatch.setattr(JobServer, 'edit', lambda self, job_id, *args, **kwargs: False)
+    changed = manifest(tmp_path / 'changed.yml', 'Benchmark job 2', 'job_2', tag='2.0')
+
+    result = kron('job', 'apply', changed)
+
+    assert result.exit_code == 0
+    assert 'update' not in result.stdout.replace('updated', '')
+    assert '1 manifests: 0 created, 0 updated, 1 unchanged, 0 failed' in result.stdout
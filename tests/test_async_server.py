@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from kron.kronbute import AsyncBaseServer, AsyncJobServer, AsyncRunsServer, BaseServer, RunsServer, \
+    NotFoundError, AliasAlreadyExistsError, ArgumentValidationError, ConflictError
+from kron.kronbute.errors import JobAlreadyPausedError
+
+pytest.importorskip('aiohttp')
+
+
+def run(fake, scenario):
+    async def main():
+        async with AsyncBaseServer(fake.url, retries=0) as server:
+            return await scenario(server)
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize('call, error', [
+    (lambda jobs: jobs.view(99), NotFoundError),
+    (lambda jobs: jobs.delete(99), NotFoundError),
+    (lambda jobs: jobs.create('Backup', 'busybox', 'latest', '0 1 * * *', {}, None, 'job_1', (), 'UTC', 'UNIX'),
+     AliasAlreadyExistsError),
+    (lambda jobs: jobs.server.create('api/jobs', {'image': 'busybox'}), ArgumentValidationError),
+    (lambda jobs: jobs.pause(1), JobAlreadyPausedError),
+])
+def test_answers_map_to_the_errors_of_the_synchronous_client(fake, call, error):
+    async def scenario(server):
+        jobs = AsyncJobServer(server)
+        await jobs.pause(1)
+        await call(jobs)
+
+    with pytest.raises(error):
+        run(fake, scenario)
+
+
+def test_stale_edits_conflict(fake):
+    async def scenario(server):
+        jobs = AsyncJobServer(server)
+        job = await jobs.view(2)
+        fake.jobs.changed(2)
+        await jobs.edit(2, None, None, '2.0', None, None, None, None, (), None, None, current_job=job)
+
+    with pytest.raises(ConflictError):
+        run(fake, scenario)
+
+
+@pytest.mark.parametrize('filters', [{}, {'job_id': 3}, {'limit': 7}, {'job_id': 1, 'limit': 2}])
+def test_runs_are_paged_as_the_synchronous_client_does(fake, filters):
+    async def scenario(server):
+        return [run['id'] async for run in AsyncRunsServer(server).iterate(page_size=3, **filters)]
+
+    expected = [run['id'] for run in RunsServer(BaseServer(fake.url)).iterate(page_size=3, **filters)]
+    requests = fake.requests
+    assert run(fake, scenario) == expected
+    # One request per page
+    assert fake.requests - requests == len(expected) // 3 + 1
+
+
+def test_jobs_listed_at_once(fake):
+    async def scenario(server):
+        return [job['id'] async for job in AsyncJobServer(server).iterate()]
+
+    assert run(fake, scenario) == [1, 2, 3, 4, 5]
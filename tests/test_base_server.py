@@ -0,0 +1,78 @@
+import json
+from typing import Any, Callable, Dict, List
+
+from kron.kronbute import BaseServer
+
+
+class StubResponse:
+    def __init__(self, status_code: int, body: Any = None, headers: Dict[str, str] = None):
+        self.status_code = status_code
+        self.text = body if isinstance(body, str) else json.dumps(body) if body is not None else ''
+        self.headers = headers or {}
+
+    @property
+    def content(self) -> bytes:
+        return self.text.encode()
+
+    def json(self):
+        return json.loads(self.text)
+
+    def iter_content(self, chunk_size):
+        return (self.content[start:start + chunk_size] for start in range(0, len(self.content), chunk_size))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+class StubSession:
+    """Answers every request with a function of the method, endpoint and keyword arguments, and records them"""
+
+    def __init__(self, answer: Callable[..., StubResponse]):
+        self.answer = answer
+        self.requests: List[tuple] = []
+
+    def request(self, method, url, **kwargs):
+        endpoint = url[len('http://kronbute/'):]
+        self.requests.append((method, endpoint, kwargs))
+        return self.answer(method, endpoint, **kwargs)
+
+
+def server(answer, **kwargs) -> BaseServer:
+    session = StubSession(answer)
+    return BaseServer('http://kronbute/', session=session, **kwargs)
+
+
+def runs(start, end):
+    return [{'id': run_id} for run_id in range(start, end)]
+
+
+def test_iterate_pages_until_the_last_one():
+    def answer(method, endpoint, params, **kwargs):
+        page = params['page']
+        return StubResponse(200, {'content': runs(page * 2, page * 2 + 2), 'last': page == 2})
+
+    paged = server(answer)
+    assert [run['id'] for run in paged.iterate('api/runs', page_size=2)] == list(range(6))
+    assert len(paged.session.requests) == 3
+
+
+def test_iterate_follows_cursors():
+    pages = {None: ({'items': runs(0, 2), 'next': 'b'}), 'b': {'items': runs(2, 4), 'next': 'c'},
+             'c': {'items': runs(4, 5)}}
+    paged = server(lambda method, endpoint, params, **kwargs: StubResponse(200, pages[params.get('cursor')]))
+    assert [run['id'] for run in paged.iterate('api/runs', page_size=2)] == list(range(5))
+
+
+def test_iterate_stops_when_the_server_ignores_paging():
+    ignoring = server(lambda method, endpoint, **kwargs: StubResponse(200, {'content': runs(0, 3)}))
+    assert [run['id'] for run in ignoring.iterate('api/runs', page_size=3)] == [0, 1, 2]
+    assert len(ignoring.session.requests) == 2
+
+
+def test_iterate_streams_plain_arrays():
+    whole = server(lambda method, endpoint, **kwargs: StubResponse(200, runs(0, 1000)))
+    assert len(list(whole.iterate('api/runs', page_size=10))) == 1000
+    assert len(whole.session.requests) == 1
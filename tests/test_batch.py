@@ -0,0 +1,96 @@
+import json
+import re
+
+import click
+import pytest
+
+from kron.job.batch import JobSelector, select_jobs, single_job
+
+from .conftest import add_job
+
+JOBS = [
+    {'id': 1, 'alias': 'backup', 'name': 'Nightly backup', 'image': 'ops/backup', 'tag': '1.2', 'groups': ['ops'],
+     'paused': False, 'lastStatus': 'SUCCESS'},
+    {'id': 2, 'alias': 'report', 'name': 'Weekly report', 'image': 'team/reports', 'tag': 'latest',
+     'groups': ['team', 'ops'], 'paused': True, 'lastStatus': 'FAILED'},
+    {'id': 3, 'alias': 'shared', 'name': 'Cleanup', 'image': 'team/cleanup', 'tag': 'latest', 'groups': [],
+     'paused': False, 'lastStatus': None},
+    {'id': 4, 'alias': 'shared', 'name': 'Reports archive', 'image': 'team/reports', 'tag': '2.0', 'groups': None,
+     'paused': False, 'lastStatus': 'RUNNING'},
+]
+
+
+class StubServer:
+    def list(self):
+        return JOBS
+
+
+def selected(groups=(), image=None, status=None, name=None):
+    selector = JobSelector(tuple(groups), image, status, re.compile(name) if name else None)
+    return [job['id'] for job in JOBS if selector.matches(job)]
+
+
+@pytest.mark.parametrize('selector, expected', [
+    ({'groups': ['ops']}, [1, 2]),
+    ({'groups': ['team', 'nobody']}, [2]),
+    ({'image': 'team/*'}, [2, 3, 4]),
+    ({'image': 'team/reports:2.0'}, [4]),
+    ({'status': 'paused'}, [2]),
+    ({'status': 'active'}, [1, 3, 4]),
+    ({'status': 'running'}, [4]),
+    ({'name': '^Week|^backup$'}, [1, 2]),
+    ({'name': '(?i)report', 'image': 'team/*', 'status': 'active'}, [4]),
+    ({'groups': ['nobody']}, []),
+])
+def test_every_selector_has_to_match(selector, expected):
+    assert selected(**selector) == expected
+
+
+def test_select_jobs_by_id_alias_and_selectors():
+    empty = JobSelector((), None, None, None)
+
+    jobs, unknown = select_jobs(StubServer(), (3, 'backup', 'missing', 'shared'), empty)
+    assert [job['id'] for job in jobs] == [1, 3]
+    assert unknown == {'missing': 'not found', 'shared': 'alias used by 3, 4, use the id instead'}
+
+    jobs, unknown = select_jobs(StubServer(), ('report',), JobSelector(('ops',), None, None, None))
+    # In listing order and once, even when given and selected
+    assert [job['id'] for job in jobs] == [1, 2]
+    assert unknown == {}
+
+
+def test_single_job():
+    empty = JobSelector((), None, None, None)
+    assert single_job(('backup',), empty) == 'backup'
+    assert single_job(('backup', 2), empty) is None
+    assert single_job(('backup',), JobSelector(('ops',), None, None, None)) is None
+    with pytest.raises(click.UsageError):
+        single_job((), empty)
+
+
+def test_pause_reports_every_job(fake, kron):
+    add_job(fake, alias='twin', name='Twin 1')
+    add_job(fake, alias='twin', name='Twin 2')
+
+    result = kron('-o', 'jsonl', 'job', 'pause', 'twin', 'job_404', '--name', 'job [12]$', '--yes')
+
+    results = {record['job']: record for record in map(json.loads, result.stdout.splitlines())}
+    assert {job: record['result'] for job, record in results.items()} == {
+        'twin': 'failed', 'job_404': 'failed', 'job_1': 'paused', 'job_2': 'paused'}
+    assert results['twin']['message'] == 'alias used by 6, 7, use the id instead'
+    assert result.exit_code == 1
+    assert fake.jobs.entities[1]['paused'] and fake.jobs.entities[2]['paused']
+
+
+def test_nothing_selected(fake, kron):
+    result = kron('job', 'resume', '--group', 'nobody', '--yes')
+
+    assert result.exit_code == 1
+    assert 'No jobs match the selection' in result.stderr
+
+
+def test_invalid_name_pattern(kron):
+    result = kron('job', 'run', '--name', '(', '--yes')
+
+    assert result.exit_code == 2
+    assert 'is not a regular expression' in result.stderr
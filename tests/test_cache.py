@@ -0,0 +1,87 @@
+import os
+
+from kron.kronbute import JobServer, ResponseCache
+from kron.kronbute.index import INDEX_ENDPOINT
+
+from .test_base_server import StubResponse, server
+
+JOBS = [{'id': 1, 'alias': 'backup', 'name': 'Backup'}, {'id': 2, 'alias': 'report', 'name': 'Report'}]
+
+
+def versions(*answers):
+    """Answers the listing with the given (status, body, ETag) one after the other"""
+    pending = list(answers)
+
+    def answer(method, endpoint, **kwargs):
+        status, body, etag = pending.pop(0)
+        return StubResponse(status, body, {'ETag': etag} if etag else {})
+    return answer
+
+
+def test_fresh_entries_are_used_without_asking(tmp_path):
+    cached = server(versions((200, JOBS, '"1"')), cache=ResponseCache(str(tmp_path), ttl=60))
+
+    assert cached.list('api/jobs') == JOBS
+    assert cached.list('api/jobs') == JOBS
+    assert len(cached.session.requests) == 1
+    assert cached.etags['api/jobs'] == '"1"'
+
+
+def test_stale_entries_are_revalidated(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl=0)
+    cached = server(versions((200, JOBS, '"1"'), (304, None, '"1"')), cache=cache)
+    cached.list('api/jobs')
+    stored_at = cache.load(cached.url, 'api/jobs').stored_at
+
+    assert cached.list('api/jobs') == JOBS
+    _, _, kwargs = cached.session.requests[1]
+    assert kwargs['headers'] == {'If-None-Match': '"1"'}
+    # Revalidated entries are fresh again
+    assert cache.load(cached.url, 'api/jobs').stored_at >= stored_at
+
+
+def test_changed_entries_are_replaced(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl=0)
+    cached = server(versions((200, JOBS, '"1"'), (200, JOBS[:1], '"2"')), cache=cache)
+    cached.list('api/jobs')
+
+    assert cached.list('api/jobs') == JOBS[:1]
+    assert cache.load(cached.url, 'api/jobs').etag == '"2"'
+    assert cached.etags['api/jobs'] == '"2"'
+
+
+def test_revalidate_asks_even_for_fresh_entries(tmp_path):
+    cached = server(versions((200, JOBS, '"1"'), (304, None, '"1"')), cache=ResponseCache(str(tmp_path), ttl=60))
+    cached.list('api/jobs')
+
+    assert cached.list('api/jobs', revalidate=True) == JOBS
+    assert len(cached.session.requests) == 2
+
+
+def test_writes_invalidate_the_endpoint_but_the_index(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl=60)
+
+    def answer(method, endpoint, **kwargs):
+        if method == 'GET':
+            return StubResponse(200, JOBS if endpoint == 'api/jobs' else JOBS[0], {'ETag': '"1"'})
+        return StubResponse(200)
+
+    cached = server(answer, cache=cache)
+    jobs = JobServer(cached)
+    jobs.list()
+    cached.get('api/jobs', 1)
+    cache.store(cached.url, 'api/groups', '[]')
+    cache.store(cached.url, 'api/runs', '[]')
+
+    jobs.pause(1)
+
+    def kept():
+        return sorted(endpoint for endpoint in ('api/jobs', 'api/jobs/1', INDEX_ENDPOINT, 'api/groups', 'api/runs')
+                      if os.path.exists(cache.path(cached.url, endpoint)))
+
+    # Pausing changes neither ids nor aliases
+    assert kept() == ['api/groups', INDEX_ENDPOINT, 'api/runs']
+
+    cache.store(cached.url, 'api/jobs', '[]')
+    cached.invalidate('api/jobs')
+    assert kept() == ['api/groups', 'api/runs']
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+
+from kron.cron import compile_cron, expand_macro, to_quartz, CronSyntaxError, UNIX, QUARTZ
+
+START = datetime(2024, 1, 30, 22, 0)
+NAMES = {'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4, 'MAY': 5, 'JUN': 6, 'JUL': 7, 'AUG': 8, 'SEP': 9, 'OCT': 10,
+         'NOV': 11, 'DEC': 12, 'SUN': 0, 'MON': 1, 'TUE': 2, 'WED': 3, 'THU': 4, 'FRI': 5, 'SAT': 6}
+
+
+def values(text, low, high):
+    """Values of a UNIX cron field, written independently of kron.cron"""
+    found = set()
+    for item in text.split(','):
+        item, _, step = item.partition('/')
+        if item == '*':
+            start, end = low, high
+        else:
+            first, _, last = item.partition('-')
+            start = int(NAMES.get(first, first))
+            end = int(NAMES.get(last, last)) if last else (high if step else start)
+        span = list(range(start, end + 1)) if start <= end else list(range(start, high + 1)) + list(range(low, end + 1))
+        found.update(span[::int(step or 1)])
+    return found
+
+
+def brute_force(expression, start, minutes):
+    minute, hour, day, month, weekday = expression.split()
+    allowed = (values(minute, 0, 59), values(hour, 0, 23), values(day, 1, 31), values(month, 1, 12),
+               {value % 7 for value in values(weekday, 0, 7)})
+    times = []
+    for offset in range(1, minutes + 1):
+        moment = start + timedelta(minutes=offset)
+        day_of_month = moment.day in allowed[2]
+        day_of_week = (moment.weekday() + 1) % 7 in allowed[4]
+        if day == '*' or weekday == '*':
+            day_matches = day_of_month and day_of_week
+        else:
+            day_matches = day_of_month or day_of_week
+        if moment.minute in allowed[0] and moment.hour in allowed[1] and moment.month in allowed[3] and day_matches:
+            times.append(moment)
+    return times
+
+
+@pytest.mark.parametrize('expression', [
+    '* * * * *', '*/7 * * * *', '0 9-17 * * MON-FRI', '15 */2 * * *', '0 0 1,15 * *', '30 22-2 * * *',
+    '0 12 * * FRI-MON', '5,10,55 3 29-31 * *', '0 0 13 * 5', '0 6 * FEB,MAR SUN', '*/20 1 1 1 *', '0 0 * * 7',
+])
+def test_next_fire_times_match_brute_force(expression):
+    minutes = 60 * 24 * 45
+    expected = brute_force(expression, START, minutes)
+    schedule = compile_cron(expression, UNIX)
+
+    found = []
+    current = START
+    while True:
+        current = schedule.next_local(current)
+        if current is None or current > START + timedelta(minutes=minutes):
+            break
+        found.append(current)
+
+    assert found == expected
+
+
+@pytest.mark.parametrize('expression, after, expected', [
+    ('0 0 12 L * ?', datetime(2024, 2, 1), datetime(2024, 2, 29, 12)),
+    ('0 0 12 L-2 * ?', datetime(2023, 2, 1), datetime(2023, 2, 26, 12)),
+    ('0 0 12 LW * ?', datetime(2024, 3, 1), datetime(2024, 3, 29, 12)),
+    ('0 0 12 15W * ?', datetime(2024, 6, 1), datetime(2024, 6, 14, 12)),
+    ('0 0 12 1W * ?', datetime(2024, 6, 1), datetime(2024, 6, 3, 12)),
+    ('0 0 12 ? * 6L', datetime(2024, 1, 1), datetime(2024, 1, 26, 12)),
+    ('0 0 12 ? * 2#1', datetime(2024, 9, 3), datetime(2024, 10, 7, 12)),
+    ('0 0 12 ? * 1#5', datetime(2024, 1, 1), datetime(2024, 3, 31, 12)),
+    ('30 15 10 * * ? 2030', datetime(2024, 1, 1), datetime(2030, 1, 1, 10, 15, 30)),
+    ('*/15 * * * * ?', datetime(2024, 1, 1, 0, 0, 50), datetime(2024, 1, 1, 0, 1)),
+    ('0 0 0 30 2 ?', datetime(2024, 1, 1), None),
+])
+def test_quartz_known_values(expression, after, expected):
+    assert compile_cron(expression, QUARTZ).next_local(after) == expected
+
+
+def test_unix_day_fields_are_ored_when_both_are_restricted():
+    schedule = compile_cron('0 0 13 * FRI')
+    times = [schedule.next_local(datetime(2024, 9, 1))]
+    times.append(schedule.next_local(times[-1]))
+    # Friday the 6th, then the 13th
+    assert times == [datetime(2024, 9, 6), datetime(2024, 9, 13)]
+
+
+def test_daylight_saving_changes():
+    schedule = compile_cron('30 2 * * *')
+    spring = schedule.next_times(2, pytz.utc.localize(datetime(2024, 3, 9, 12)), 'America/New_York')
+    # 2:30 does not exist on March 10th
+    assert [time.date().day for time in spring] == [11, 12]
+
+    hourly = compile_cron('30 * * * *')
+    autumn = hourly.next_times(3, pytz.utc.localize(datetime(2024, 11, 3, 4, 45)), 'America/New_York')
+    # 1:30 happens twice on November 3rd and fires once
+    assert [time.strftime('%H:%M%z') for time in autumn] == ['01:30-0400', '02:30-0500', '03:30-0500']
+
+
+@pytest.mark.parametrize('macro, expected', [
+    ('@daily', '0 0 * * *'),
+    ('@daily at 3:45pm', '45 15 * * *'),
+    ('@daily at 12am', '0 0 * * *'),
+    ('@hourly at 23', '23 * * * *'),
+    ('@weekly', '0 0 * * 0'),
+    ('@hourly at 75', None),
+    ('@nightly', None),
+])
+def test_macros(macro, expected):
+    assert expand_macro(macro) == expected
+
+
+def test_macros_compile_to_quartz():
+    assert to_quartz('0 9 * * 1,5') == '0 0 9 ? * 2,6'
+    assert compile_cron('@daily at 6am', QUARTZ).next_local(datetime(2024, 1, 1, 7)) == datetime(2024, 1, 2, 6)
+
+
+@pytest.mark.parametrize('expression, position', [
+    ('61 * * * *', 0),
+    ('* * * *', 7),
+    ('*/0 * * * *', 2),
+    ('* * 1,,2 * *', 6),
+    ('0 0 12 ? * 2#6', 13),
+])
+def test_syntax_errors_point_at_the_field(expression, position):
+    with pytest.raises(CronSyntaxError) as error:
+        compile_cron(expression)
+    assert error.value.position == position
+
+
+def test_fires_per_minute():
+    assert compile_cron('*/15 * * * * ?').fires_per_minute == 4
+    assert compile_cron('* * * * *').fires_per_minute == 1
@@ -0,0 +1,104 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from kron import client
+from kron.daemon import server
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason='the daemon needs Unix sockets')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    """Socket of a daemon started as kron daemon start does, stopped after the test"""
+    path = str(tmp_path / 'daemon' / 'daemon.sock')
+    server.check_directory(path)
+    process = subprocess.Popen([sys.executable, '-m', 'kron.daemon.server', path, '60'], cwd=ROOT,
+                               stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 20
+        while not (client.request(path, {'status': True}) or {}).get('status'):
+            assert process.poll() is None and time.monotonic() < deadline, 'the daemon did not start'
+            time.sleep(0.05)
+        yield path
+    finally:
+        client.request(path, {'stop': True})
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def forward(fake, path, *args):
+    """kron run as a terminal would, from the client module"""
+    env = dict(os.environ, KRONBUTE_SERVER=fake.url, KRONBUTE_DAEMON_SOCKET=path, KRONBUTE_NO_CACHE='1',
+               PYTHONPATH=ROOT)
+    env.pop('KRONBUTE_NO_DAEMON', None)
+    return subprocess.run([sys.executable, '-c', 'import sys; from kron.client import main; sys.argv[0] = "kron"; '
+                                                 'main()'] + list(args),
+                          env=env, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True, timeout=30)
+
+
+def commands(path):
+    return client.request(path, {'status': True})['status']['commands']
+
+
+def test_commands_run_in_the_daemon(fake, daemon):
+    result = forward(fake, daemon, '-o', 'jsonl', 'job', 'view', 'job_2')
+    assert result.returncode == 0
+    assert '"alias": "job_2"' in result.stdout
+    assert commands(daemon) == 1
+
+    # Exit codes and errors come back as the command gave them
+    missing = forward(fake, daemon, 'job', 'view', '99')
+    assert missing.returncode == 13
+    assert 'not found' in missing.stderr
+    usage = forward(fake, daemon, 'job', 'view', '--bogus')
+    assert usage.returncode == 2
+    assert 'no such option: --bogus' in usage.stderr
+    assert commands(daemon) == 3
+
+
+def test_clients_only_use_private_directories(fake, daemon):
+    os.chmod(os.path.dirname(daemon), 0o755)
+    try:
+        assert client.connect(daemon) is None
+        # The command still runs, in the client
+        result = forward(fake, daemon, 'job', 'view', 'job_2')
+        assert result.returncode == 0
+    finally:
+        os.chmod(os.path.dirname(daemon), 0o700)
+    assert commands(daemon) == 0
+
+
+def test_peer_credentials():
+    first, second = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    with first, second:
+        assert client.peer_uid(first) in (None, os.getuid())
+        assert server._same_user(first)
+
+
+def test_other_users_are_refused(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, 'peer_uid', lambda connection: os.getuid() + 1)
+    first, second = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    with first, second:
+        client.Channel(second).send({'version': client.PROTOCOL, 'status': True})
+        assert server.Daemon(str(tmp_path / 'daemon.sock')).receive(first) is False
+        # Nothing was answered
+        second.settimeout(0.2)
+        with pytest.raises(socket.timeout):
+            second.recv(1)
+
+
+def test_daemons_of_other_users_are_ignored(daemon, monkeypatch):
+    assert client.connect(daemon) is not None
+    monkeypatch.setattr(client, 'peer_uid', lambda connection: os.getuid() + 1)
+    assert client.connect(daemon) is None
+    assert client.request(daemon, {'status': True}) is None
@@ -0,0 +1,68 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+
+from kron.cron import compile_cron
+from kron.forecast import Forecast, MinuteCounter, minute_mask
+
+
+def brute_force_mask(schedule, timezone, start, minutes):
+    """Fire times of the schedule one by one, placed at their minute of the window"""
+    end = start + timedelta(minutes=minutes)
+    mask = 0
+    first = pytz.utc.localize(start - timedelta(seconds=1))
+    for fire_time in schedule.iterate(first, timezone):
+        moment = fire_time.astimezone(pytz.utc).replace(tzinfo=None)
+        if moment >= end:
+            break
+        mask |= 1 << int((moment - start).total_seconds()) // 60
+    return mask
+
+
+@pytest.mark.parametrize('expression', ['*/5 * * * *', '30 2 * * *', '0 1-3 * * SUN', '15 9 1,31 * *', '0 0 L * ?'])
+@pytest.mark.parametrize('timezone', ['UTC', 'America/New_York', 'Europe/London', 'Australia/Lord_Howe',
+                                      'Asia/Kolkata'])
+@pytest.mark.parametrize('start', [datetime(2024, 3, 8, 17, 13), datetime(2024, 10, 25, 23, 59)])
+def test_minute_mask_matches_fire_times(expression, timezone, start):
+    minutes = 60 * 24 * 10
+    schedule = compile_cron(expression)
+    assert minute_mask(schedule, timezone, start, minutes) == brute_force_mask(schedule, timezone, start, minutes)
+
+
+def test_minute_counter_matches_sums():
+    generator = random.Random(7)
+    minutes = 500
+    counter = MinuteCounter(minutes)
+    expected = [0] * minutes
+    for _ in range(200):
+        mask = generator.getrandbits(minutes)
+        weight = generator.randint(1, 40)
+        counter.add(mask, weight)
+        for minute in range(minutes):
+            if (mask >> minute) & 1:
+                expected[minute] += weight
+    assert counter.counts() == expected
+
+
+def test_forecast_counts_histogram_and_hotspots():
+    forecast = Forecast(datetime(2024, 1, 1, 0, 0, 30), 60)
+    forecast.add_jobs([
+        {'id': 1, 'schedule': '*/15 * * * *'},
+        {'id': 2, 'schedule': '*/15 * * * *'},
+        {'id': 3, 'schedule': '0 * * * *', 'paused': True},
+        {'id': 4, 'schedule': '*/30 * * * * ?', 'cronType': 'QUARTZ'},
+        {'id': 5, 'schedule': '0 * * * *', 'timeZone': 'Nowhere/Void'},
+        {'id': 6, 'schedule': '99 * * * *'},
+    ])
+
+    assert (forecast.jobs, forecast.paused, len(forecast.invalid)) == (3, 1, 2)
+    counts = forecast.counts()
+    assert [minute for minute, starts in enumerate(counts) if starts == 4] == [0, 15, 30, 45]
+    assert sum(counts) == 4 * 4 + 2 * 56
+    assert forecast.histogram() == {2: 56, 4: 4}
+
+    hotspots = forecast.hotspots(top=2)
+    assert [(hotspot.minute, hotspot.starts) for hotspot in hotspots] == [(0, 4), (15, 4)]
+    assert [starts for _, starts in hotspots[0].contributors] == [2, 2]
@@ -0,0 +1,80 @@
+import random
+import string
+
+import pytest
+
+from kron.kronbute import JobIndex
+from kron.kronbute.errors import NotFoundError, AmbiguousAliasError
+
+JOBS = [{'id': 1, 'alias': 'backup-db', 'name': 'Nightly backup'},
+        {'id': 2, 'alias': 'report', 'name': 'Weekly report'},
+        {'id': 3, 'alias': 'shared', 'name': 'First'},
+        {'id': 4, 'alias': 'shared', 'name': 'Second'},
+        {'id': 12, 'alias': None, 'name': 'Cleanup'}]
+
+
+def random_jobs(count, seed):
+    generator = random.Random(seed)
+    words = ['backup', 'report', 'sync', 'clean', 'db', 'mail', 'etl', 'x']
+    return [{'id': number, 'alias': '-'.join(generator.sample(words, 2)) + str(number) if number % 5 else None,
+             'name': ' '.join(generator.sample(words, 3)).title()} for number in range(1, count + 1)]
+
+
+def is_subsequence(characters, text):
+    remaining = iter(text.lower())
+    return all(character in remaining for character in characters.lower())
+
+
+def test_find_and_resolve():
+    index = JobIndex.from_jobs(JOBS)
+
+    assert index.resolve('report') == 2
+    assert index.resolve(12) == 12
+    assert index.resolve('12') == 12
+    assert [entry.id for entry in index.find('shared')] == [3, 4]
+    assert [entry.id for entry in index.named('Cleanup')] == [12]
+
+    with pytest.raises(NotFoundError):
+        index.resolve('missing')
+    with pytest.raises(AmbiguousAliasError) as error:
+        index.resolve('shared')
+    assert error.value.ids == [3, 4]
+
+
+@pytest.mark.parametrize('prefix', ['', 'b', 'back', 'sync-', '1', 'clean-db', 'zzz'])
+def test_complete_prefix_matches_brute_force(prefix):
+    jobs = random_jobs(300, 1)
+    index = JobIndex.from_jobs(jobs)
+    keys = sorted({job['alias'] for job in jobs if job['alias']} | {str(job['id']) for job in jobs})
+
+    expected = [key for key in keys if key.startswith(prefix)][:100]
+    if expected or not prefix:
+        assert index.complete(prefix) == expected
+
+
+@pytest.mark.parametrize('characters', ['bkp', 'NIGHT', 'rpt', 'sdb', 'ee', 'up2', '.*', 'x*', 'q'])
+def test_complete_falls_back_to_characters_in_order(characters):
+    jobs = random_jobs(300, 2) + [{'id': 1000, 'alias': 'c.u*', 'name': 'Night x*'}]
+    index = JobIndex.from_jobs(jobs)
+    assert not any(key.startswith(characters) for key in index.keys)
+
+    expected = [str(job['alias'] or job['id']) for job in jobs
+                if is_subsequence(characters, f"{job['alias'] or job['id']}\t{job['name']}")]
+    assert index.complete(characters, limit=len(jobs)) == expected
+    assert index.complete(characters, limit=3) == expected[:3]
+
+
+def test_complete_never_backtracks():
+    long_name = ''.join(random.Random(3).choice(string.ascii_lowercase) for _ in range(5000))
+    index = JobIndex.from_jobs([{'id': 1, 'alias': 'a', 'name': long_name}])
+    assert index.complete('!' * 50) == []
+
+
+def test_json_round_trip():
+    index = JobIndex.from_jobs(JOBS)
+    copy = JobIndex.from_json(index.to_json())
+
+    assert copy.entries == index.entries
+    assert copy.keys == index.keys
+    assert copy.resolve('backup-db') == 1
+    assert copy.complete('s') == ['shared']
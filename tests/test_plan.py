@@ -0,0 +1,68 @@
+from kron import manifest
+from kron.job.plan import plan_jobs, plan_record, read_job_entries
+from kron.snapshot.archive import SnapshotEntry
+
+JOBS = [
+    {'id': 1, 'name': 'backup', 'alias': 'backup', 'image': 'busybox', 'tag': 'latest', 'schedule': '0 1 * * *',
+     'cronType': 'UNIX', 'timeZone': 'UTC', 'entryPoint': None, 'groups': ['ops'], 'environment': {'LEVEL': '1'}},
+    {'id': 2, 'name': 'report', 'alias': 'report', 'image': 'busybox', 'tag': 'latest', 'schedule': '0 2 * * *',
+     'cronType': 'UNIX', 'timeZone': 'UTC', 'entryPoint': None, 'groups': [], 'environment': {}},
+    {'id': 3, 'name': 'twin', 'alias': None},
+    {'id': 4, 'name': 'twin', 'alias': None},
+]
+
+
+class StubServer:
+    """Job listing leaving the details of the report job out, as the server does for large listings"""
+
+    def __init__(self):
+        self.viewed = []
+
+    def list(self):
+        return [{'id': job['id'], 'name': job['name'], 'alias': job['alias']} if job['id'] == 2 else dict(job)
+                for job in JOBS]
+
+    def view(self, job_id):
+        self.viewed.append(job_id)
+        return dict(next(job for job in JOBS if job['id'] == job_id))
+
+
+def entry(source, **data):
+    return SnapshotEntry(source, data, manifest.problems(data))
+
+
+def test_plan_jobs_actions():
+    server = StubServer()
+    entries = [
+        entry('backup.yaml', name='backup', alias='backup', image='busybox', schedule='0 1 * * *', groups=['ops'],
+              environment={'LEVEL': 1}),
+        entry('report.yaml', name='report', alias='report', image='busybox:1.36', schedule='0 2 * * *'),
+        entry('new.yaml', name='new', alias='new', image='busybox', schedule='0 3 * * *'),
+        entry('twin.yaml', name='twin', image='busybox', schedule='0 4 * * *'),
+        entry('broken.yaml', name='broken', image='busybox', schedule='0 25 * * *'),
+        SnapshotEntry('unreadable.yaml', None, ['invalid YAML']),
+    ]
+
+    plans = {plan.source: plan for plan in plan_jobs(server, entries, workers=2)}
+
+    assert {source: plan.action for source, plan in plans.items()} == {
+        'backup.yaml': 'unchanged', 'report.yaml': 'update', 'new.yaml': 'create', 'twin.yaml': 'invalid',
+        'broken.yaml': 'invalid', 'unreadable.yaml': 'invalid'}
+    # Only the matched job the listing left details out of is fetched again
+    assert server.viewed == [2]
+    assert plans['report.yaml'].changes == {'tag': ('latest', '1.36')}
+    assert plans['twin.yaml'].problem == "name 'twin' is used by jobs 3, 4"
+    assert plan_record(plans['report.yaml']) == {'source': 'report.yaml', 'job': 'report', 'id': 2,
+                                                 'action': 'update', 'changes': {'tag': ['latest', '1.36']}}
+    assert plan_record(plans['unreadable.yaml'])['changes'] == {'problem': 'invalid YAML'}
+
+
+def test_read_job_entries_skips_groups(tmp_path):
+    (tmp_path / 'job.yaml').write_text('name: backup\nimage: busybox\nschedule: "0 1 * * *"\n')
+    (tmp_path / 'group.yaml').write_text('kind: group\nname: ops\nenvironment:\n  LEVEL: "1"\n')
+    (tmp_path / 'both.yml').write_text('kind: Group\nname: dev\n---\nname: report\nimage: busybox\n'
+                                       'schedule: "0 2 * * *"\n')
+
+    entries = read_job_entries([str(tmp_path)])
+
+    assert sorted(entry.data['name'] for entry in entries) == ['backup', 'report']
@@ -0,0 +1,15 @@
+import json
+
+
+def test_options_of_kron_apply_to_one_line(kron):
+    result = kron('shell', '--history', '', input='-o json job view 2\njob view 2\n--bogus job view 2\n'
+                                                  '--no-cache -o jsonl job list\n')
+
+    job, end = json.JSONDecoder().raw_decode(result.stdout)
+    assert job['alias'] == 'job_2'
+    table, _, listing = result.stdout[end:].partition('\n{')
+    # The next line is back to the output format of the session
+    assert 'Alias' in table and 'job_2' in table
+    assert [json.loads(line)['id'] for line in ('{' + listing).splitlines()] == [1, 2, 3, 4, 5]
+    assert 'no such option: --bogus' in result.stderr
+    assert result.exit_code == 0
@@ -0,0 +1,81 @@
+import math
+import random
+
+import pytest
+
+from kron.sketch import DurationSketch
+
+QUANTILES = [0, 0.01, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99, 0.999, 1]
+
+
+def nearest_rank(values, quantile):
+    ordered = sorted(values)
+    return ordered[max(math.ceil(quantile * len(ordered) - 1e-9), 1) - 1]
+
+
+@pytest.mark.parametrize('seed, count', [(1, 1), (2, 7), (3, 100), (4, 10000)])
+def test_quantiles_within_relative_accuracy(seed, count):
+    generator = random.Random(seed)
+    values = [generator.lognormvariate(3, 1.5) for _ in range(count)]
+    sketch = DurationSketch()
+    sketch.update(values)
+
+    for quantile in QUANTILES:
+        expected = nearest_rank(values, quantile)
+        assert sketch.quantile(quantile) == pytest.approx(expected, rel=0.01)
+
+
+def test_p99_of_a_few_runs_is_the_slowest():
+    sketch = DurationSketch()
+    sketch.update([20] * 15 + [98])
+    assert sketch.quantile(0.99) == pytest.approx(98, rel=0.01)
+    assert sketch.quantile(0.5) == pytest.approx(20, rel=0.01)
+
+    pair = DurationSketch()
+    pair.update([2, 20])
+    assert pair.quantile(0.5) == pytest.approx(2, rel=0.01)
+    assert pair.quantile(0.99) == pytest.approx(20, rel=0.01)
+
+
+def test_exact_ranks_are_not_rounded_up():
+    sketch = DurationSketch()
+    sketch.update(range(1, 11))
+    assert sketch.quantile(0.9) == pytest.approx(9, rel=0.01)
+    assert sketch.quantile(0.3) == pytest.approx(3, rel=0.01)
+
+
+def test_zeros_and_negative_durations():
+    sketch = DurationSketch()
+    sketch.update([0, -1, 0, 5])
+    assert sketch.zeros == 3
+    assert sketch.quantile(0.75) == 0.0
+    assert sketch.quantile(0.76) == pytest.approx(5, rel=0.01)
+    assert DurationSketch().quantile(0.5) is None
+
+
+def test_merge_matches_a_single_sketch():
+    generator = random.Random(5)
+    values = [generator.expovariate(0.1) for _ in range(2000)] + [0] * 20
+    whole, first, second = DurationSketch(), DurationSketch(), DurationSketch()
+    whole.update(values)
+    first.update(values[::2])
+    second.update(values[1::2])
+    first.merge(second)
+
+    assert first.count == whole.count
+    assert first.mean == pytest.approx(whole.mean)
+    assert (first.minimum, first.maximum) == (whole.minimum, whole.maximum)
+    assert [first.quantile(quantile) for quantile in QUANTILES] == [whole.quantile(quantile) for quantile in QUANTILES]
+
+    with pytest.raises(ValueError):
+        first.merge(DurationSketch(relative_accuracy=0.02))
+
+
+def test_collapsing_keeps_the_high_quantiles():
+    values = [1.05 ** exponent for exponent in range(1000)]
+    sketch = DurationSketch(max_buckets=100)
+    sketch.update(values)
+
+    assert len(sketch.buckets) <= 100
+    for quantile in (0.95, 0.99, 1):
+        assert sketch.quantile(quantile) == pytest.approx(nearest_rank(values, quantile), rel=0.01)
@@ -0,0 +1,41 @@
+import json
+
+from kron.kronbute import JobServer
+
+from .conftest import add_job
+
+
+def test_import_fails_for_a_name_used_by_several_jobs(fake, kron, tmp_path):
+    add_job(fake, name='dup')
+    add_job(fake, name='dup')
+    snapshot = tmp_path / 'snapshot.jsonl'
+    snapshot.write_text(json.dumps({'name': 'dup', 'image': 'busybox', 'schedule': '0 1 * * *'}) + '\n')
+
+    result = kron('import', str(snapshot))
+
+    assert result.exit_code == 1
+    assert "name 'dup' is used by jobs 6, 7" in result.stdout
+    assert '1 failed' in result.stderr
+    assert [job['id'] for job in fake.jobs.entities.values() if job['name'] == 'dup'] == [6, 7]
+
+
+def test_import_round_trip(fake, kron, tmp_path):
+    snapshot = tmp_path / 'snapshot.tar.gz'
+    assert kron('export', '--all', str(snapshot)).exit_code == 0
+
+    result = kron('import', str(snapshot))
+
+    assert result.exit_code == 0
+    assert '0 created, 0 updated, 7 unchanged, 0 failed' in result.stdout
+
+
+def test_import_counts_a_skipped_edit_as_unchanged(fake, kron, tmp_path, monkeypatch):
+    monkeypatch.setattr(JobServer, 'edit', lambda self, job_id, *args, **kwargs: False)
+    snapshot = tmp_path / 'snapshot.jsonl'
+    snapshot.write_text(json.dumps({'name': 'Benchmark job 2', 'alias': 'job_2', 'image': 'team/cleanup:2.0',
+                                    'schedule': '0 1 * * *'}) + '\n')
+
+    result = kron('import', str(snapshot))
+
+    assert result.exit_code == 0
+    assert '0 created, 0 updated, 1 unchanged, 0 failed' in result.stdout